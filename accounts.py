@@ -0,0 +1,78 @@
+"""
+Lunch Money balances: parsing /v1/assets and /v1/plaid_accounts responses and summing them into net worth.
+"""
+from dataclasses import dataclass
+
+from budgets import _to_float
+
+# Account types whose balances are owed rather than owned
+LIABILITY_TYPES = ('credit', 'loan')
+
+
+def _balance(raw: dict) -> float:
+    balance = raw.get('to_base')
+    if balance is None:
+        balance = raw.get('balance')
+    return _to_float(balance)
+
+
+@dataclass(frozen=True)
+class Asset:
+    id: int | None
+    name: str
+    type_name: str
+    balance: float
+    closed_on: str | None
+
+    @classmethod
+    def from_json(cls, raw: dict) -> 'Asset':
+        return cls(
+            id=raw.get('id'),
+            name=raw.get('display_name') or raw.get('name') or '',
+            type_name=(raw.get('type_name') or '').lower(),
+            balance=_balance(raw),
+            closed_on=raw.get('closed_on'),
+        )
+
+
+@dataclass(frozen=True)
+class PlaidAccount:
+    id: int | None
+    name: str
+    type: str
+    balance: float
+
+    @classmethod
+    def from_json(cls, raw: dict) -> 'PlaidAccount':
+        return cls(
+            id=raw.get('id'),
+            name=raw.get('display_name') or raw.get('name') or '',
+            type=(raw.get('type') or '').lower(),
+            balance=_balance(raw),
+        )
+
+
+def compute_net_worth(assets: list[Asset], plaid_accounts: list[PlaidAccount]) -> dict | None:
+    """
+    Sums current balances across manual assets and Plaid accounts, counting liabilities as debt.
+
+    Mirrors the current-balance part of computeNetWorth in the JS dashboard.
+
+    Returns:
+        A dict with current (net worth) and count (accounts included), or None if there are no accounts.
+    """
+    current = 0.0
+    count = 0
+    for a in assets:
+        if a.closed_on:
+            continue
+        # manually managed liabilities: count as debt regardless of sign entered
+        current += -abs(a.balance) if a.type_name in LIABILITY_TYPES else a.balance
+        count += 1
+    for a in plaid_accounts:
+        # plaid convention for credit/loan: positive balance = amount owed
+        current += -a.balance if a.type in LIABILITY_TYPES else a.balance
+        count += 1
+    if count == 0:
+        return None
+    return {'current': round(current, 2), 'count': count}
@@ -0,0 +1,100 @@
+import bisect
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PAGE_LIMIT = 1000
+
+
+class FakeLunchMoneyServer:
+    """
+    Local stand-in for the Lunch Money /v1/transactions, /v1/budgets, /v1/assets and
+    /v1/plaid_accounts endpoints.
+
+    Serves a fixed list of transactions with the same start_date/end_date filtering
+    and offset/limit pagination as the real API, on a background thread. /v1/budgets
+    returns the given budget records (none by default) whatever the range, and the
+    other two the given assets and Plaid accounts.
+
+    Usage:
+        with FakeLunchMoneyServer(transactions) as server:
+            client = LunchMoneyClient(server.url, 'benchmark')
+    """
+
+    def __init__(self, transactions: list[dict], host: str = '127.0.0.1', port: int = 0,
+                 budgets: list[dict] | None = None, assets: list[dict] | None = None,
+                 plaid_accounts: list[dict] | None = None):
+        self.transactions = sorted(transactions, key=lambda t: t['date'])
+        self.budgets = budgets or []
+        self.assets = assets or []
+        self.plaid_accounts = plaid_accounts or []
+        self._dates = [t['date'] for t in self.transactions]
+        self.request_count = 0
+        self.paths: list[str] = []
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def transactions_between(self, start_date: str, end_date: str) -> list[dict]:
+        lo = bisect.bisect_left(self._dates, start_date)
+        hi = bisect.bisect_right(self._dates, end_date)
+        return self.transactions[lo:hi]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.request_count += 1
+                url = urlparse(self.path)
+                server.paths.append(url.path)
+                if url.path == '/v1/budgets':
+                    self._send(200, server.budgets)
+                    return
+                if url.path == '/v1/assets':
+                    self._send(200, {'assets': server.assets})
+                    return
+                if url.path == '/v1/plaid_accounts':
+                    self._send(200, {'plaid_accounts': server.plaid_accounts})
+                    return
+                if url.path != '/v1/transactions':
+                    self._send(404, {'error': 'not found'})
+                    return
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                matching = server.transactions_between(query.get('start_date', ''), query.get('end_date', '￿'))
+                offset = int(query.get('offset', 0))
+                limit = int(query.get('limit', DEFAULT_PAGE_LIMIT))
+                page = matching[offset:offset + limit]
+                self._send(200, {'transactions': page, 'has_more': offset + limit < len(matching)})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeLunchMoneyServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FakeLunchMoneyServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,277 @@
+"""
+Times every stage of the comparison report against synthetic data served locally.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --memory --memory-budget 512
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from comparison import (
+    build_daily_series,
+    build_report_frames,
+    compute_comparison,
+    concat_transaction_frames,
+    iter_transaction_pages,
+    parse_transactions_page,
+    report_fetch_range,
+    write_report_files,
+)
+from lunchmoney_client import LunchMoneyClient
+from profiling import StageTimer, format_bytes, record_frames, stage
+
+STAGES = ('fetch', 'parse', 'aggregate', 'render', 'html')
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REFERENCE_DATE = '2024-03-15'
+# A stage regresses when its median is this much slower than the baseline's
+DEFAULT_TOLERANCE = 0.25
+# Stages faster than this are too noisy to flag
+MIN_COMPARABLE_SECONDS = 0.005
+MIB = 1024 * 1024
+
+
+@contextmanager
+def timed(timings: dict[str, list[float]], stage_name: str):
+    start = time.perf_counter()
+    try:
+        # Also a profiling stage, so a memory-tracking StageTimer sees the benchmark's stages
+        with stage(stage_name):
+            yield
+    finally:
+        timings.setdefault(stage_name, []).append(time.perf_counter() - start)
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'runs': len(samples),
+    }
+
+
+def run_report_stages(client: LunchMoneyClient, input_date: pd.Timestamp, timings: dict[str, list[float]],
+                      output_dir: str = '') -> int:
+    """
+    Runs one full report against the client, recording the duration of each stage.
+
+    The report's files are written to output_dir.
+
+    Returns:
+        The number of transactions fetched.
+    """
+    start, end = report_fetch_range(input_date)
+    with timed(timings, 'fetch'):
+        pages = list(iter_transaction_pages(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), client))
+    with timed(timings, 'parse'):
+        df = concat_transaction_frames([parse_transactions_page(page) for page in pages])
+    with timed(timings, 'aggregate'):
+        current, last, full = build_report_frames(df, input_date)
+        series = build_daily_series(input_date, current, last, full)
+        comparison = compute_comparison(input_date, series)
+    record_frames(current_month_df=current, last_month_df=last, full_current_month_df=full)
+    # The render cache would serve every run after the warm-up, so each one renders from scratch
+    with timed(timings, 'render'):
+        write_report_files(input_date, comparison, current, series, png=True, html=False, reuse_unchanged=False,
+                           output_dir=output_dir)
+    with timed(timings, 'html'):
+        write_report_files(input_date, comparison, current, series, png=False, html=True, reuse_unchanged=False,
+                           output_dir=output_dir)
+    return sum(len(page) for page in pages)
+
+
+def measure_memory(client: LunchMoneyClient, input_date: pd.Timestamp, output_dir: str = '') -> dict:
+    """
+    Runs one report under a memory-tracking StageTimer and returns its memory figures.
+
+    Kept apart from the timed runs, since tracemalloc slows every allocation down.
+    RSS is process-wide, so it also includes whatever earlier sizes left behind.
+    """
+    timer = StageTimer(track_memory=True)
+    with timer.activate():
+        run_report_stages(client, input_date, {}, output_dir)
+    profile = timer.to_dict()
+    memory = profile['memory']
+    memory['stages'] = {
+        name: {key: profile['stages'][name][key] for key in ('peak_traced_bytes', 'peak_rss_bytes')}
+        for name in STAGES
+    }
+    return memory
+
+
+def benchmark_size(n: int, input_date: pd.Timestamp, repeat: int = 3, seed: int = 0, memory: bool = False) -> dict:
+    """
+    Benchmarks every stage on a synthetic dataset of n transactions.
+
+    The dataset covers the report's fetch range (the previous and current month) and
+    is served by a local fake API, so fetch timings include real HTTP and JSON decoding.
+    The first run is a warm-up (imports, connection setup) and is not recorded.
+    With memory, one more run is made to measure peak memory per stage.
+    """
+    start, end = report_fetch_range(input_date)
+    transactions = generate_transactions(n, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), seed=seed)
+    timings: dict[str, list[float]] = {}
+    with FakeLunchMoneyServer(transactions) as server, \
+            LunchMoneyClient(server.url, 'benchmark') as client, \
+            tempfile.TemporaryDirectory() as out_dir:
+        run_report_stages(client, input_date, {}, out_dir)
+        for _ in range(repeat):
+            fetched = run_report_stages(client, input_date, timings, out_dir)
+        memory_result = measure_memory(client, input_date, out_dir) if memory else None
+    stages = {name: summarize(timings[name]) for name in STAGES}
+    result = {
+        'rows': n,
+        'fetched': fetched,
+        'stages': stages,
+        'total': sum(s['median'] for s in stages.values()),
+    }
+    if memory_result is not None:
+        result['memory'] = memory_result
+    return result
+
+
+def run_benchmarks(sizes: list[int], input_date: pd.Timestamp, repeat: int = 3, seed: int = 0,
+                   memory: bool = False) -> dict:
+    results = {
+        'reference_date': input_date.strftime('%Y-%m-%d'),
+        'repeat': repeat,
+        'seed': seed,
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'sizes': {},
+    }
+    for n in sizes:
+        result = benchmark_size(n, input_date, repeat=repeat, seed=seed, memory=memory)
+        results['sizes'][str(n)] = result
+        print(format_size_result(result))
+    return results
+
+
+def format_size_result(result: dict) -> str:
+    stages = '  '.join(f"{name} {result['stages'][name]['median'] * 1000:8.1f}ms" for name in STAGES)
+    line = f"{result['rows']:>9,} rows  {stages}  total {result['total'] * 1000:8.1f}ms"
+    if 'memory' in result:
+        memory = result['memory']
+        frames = sum(frame['bytes'] for frame in memory['frames'].values())
+        line += (f"\n{'':>15}peak {format_bytes(memory['peak_traced_bytes'])} traced, "
+                 f"{format_bytes(memory['peak_rss_bytes'])} RSS, frames {format_bytes(frames)}")
+    return line
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Lists every stage whose median is more than tolerance slower than the baseline.
+
+    Sizes or stages missing from either side are skipped, as are stages too fast to time reliably.
+    """
+    regressions = []
+    for size, result in results['sizes'].items():
+        base = baseline.get('sizes', {}).get(size)
+        if base is None:
+            continue
+        for name, stats in result['stages'].items():
+            base_stats = base['stages'].get(name)
+            if base_stats is None or base_stats['median'] < MIN_COMPARABLE_SECONDS:
+                continue
+            ratio = stats['median'] / base_stats['median']
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{size} rows {name}: {stats['median'] * 1000:.1f}ms vs "
+                    f"{base_stats['median'] * 1000:.1f}ms baseline ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def check_memory_budget(results: dict, traced_budget: int | None = None, rss_budget: int | None = None) -> list[str]:
+    """
+    Lists every size whose peak traced or resident memory exceeds its budget (in bytes).
+    """
+    violations = []
+    for size, result in results['sizes'].items():
+        memory = result.get('memory')
+        if memory is None:
+            continue
+        for label, peak, budget in (('traced', memory['peak_traced_bytes'], traced_budget),
+                                    ('RSS', memory['peak_rss_bytes'], rss_budget)):
+            if budget is not None and peak is not None and peak > budget:
+                violations.append(f"{size} rows: peak {label} {format_bytes(peak)} exceeds budget {format_bytes(budget)}")
+    return violations
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Benchmark the cumulative spending report on synthetic data.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Transaction counts to benchmark (default: 1000 10000 100000).')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per size (default: 3).')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data.')
+    parser.add_argument('--date', default=DEFAULT_REFERENCE_DATE, help='Report reference date (YYYY-MM-DD).')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', help='Compare against a stored results file; exits 1 on regression.')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown against the baseline, as a fraction (default: 0.25).')
+    parser.add_argument('--memory', action='store_true',
+                        help='Also measure peak memory per stage, allocation sites and DataFrame sizes.')
+    parser.add_argument('--memory-budget', type=float,
+                        help='Fail if peak traced (Python) memory exceeds this many MiB; implies --memory.')
+    parser.add_argument('--rss-budget', type=float,
+                        help='Fail if peak RSS exceeds this many MiB; implies --memory.')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_arg_parser().parse_args(argv)
+    memory = args.memory or args.memory_budget is not None or args.rss_budget is not None
+    results = run_benchmarks(args.sizes, pd.Timestamp(args.date), repeat=args.repeat, seed=args.seed, memory=memory)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved: {args.output}")
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            failed = True
+        else:
+            print("No regressions against baseline.")
+
+    if args.memory_budget is not None or args.rss_budget is not None:
+        violations = check_memory_budget(
+            results,
+            traced_budget=None if args.memory_budget is None else int(args.memory_budget * MIB),
+            rss_budget=None if args.rss_budget is None else int(args.rss_budget * MIB),
+        )
+        if violations:
+            print("Memory budget exceeded:")
+            for line in violations:
+                print(f"  {line}")
+            failed = True
+        else:
+            print("Within memory budget.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
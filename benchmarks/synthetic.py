@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+CATEGORIES = [
+    'Groceries', 'Restaurants', 'Rent', 'Utilities', 'Transport', 'Coffee Shops', 'Shopping',
+    'Entertainment', 'Health', 'Travel', 'Subscriptions', 'Gifts', 'Home', 'Pets', 'Education',
+]
+
+
+def _zipf_weights(n: int, skew: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def generate_transactions(
+    n: int,
+    start_date: str,
+    end_date: str,
+    seed: int = 0,
+    n_payees: int = 500,
+    income_fraction: float = 0.03,
+    excluded_fraction: float = 0.02,
+    uncategorized_fraction: float = 0.05,
+) -> list[dict]:
+    """
+    Generates n realistic-looking raw API transactions spread over [start_date, end_date].
+
+    Categories and payees follow Zipf-like distributions (a few very common, a long tail),
+    amounts are log-normal, and a fraction of rows are income or excluded from totals so
+    the report's filtering is exercised.
+
+    Args:
+        n: Number of transactions.
+        start_date: First day of the range (YYYY-MM-DD).
+        end_date: Last day of the range (YYYY-MM-DD).
+        seed: Random seed, for reproducible datasets.
+        n_payees: Number of distinct payees.
+        income_fraction: Share of rows flagged is_income.
+        excluded_fraction: Share of rows flagged exclude_from_totals.
+        uncategorized_fraction: Share of rows without a category.
+
+    Returns:
+        Transaction dicts shaped like /v1/transactions results, sorted by date.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start_date, end_date, freq='D').strftime('%Y-%m-%d').to_numpy()
+    dates = np.sort(rng.choice(days, size=n))
+    categories = rng.choice(len(CATEGORIES), size=n, p=_zipf_weights(len(CATEGORIES), 1.1))
+    payees = rng.choice(n_payees, size=n, p=_zipf_weights(n_payees, 1.3))
+    amounts = np.round(rng.lognormal(mean=3.0, sigma=1.1, size=n), 2)
+    flags = rng.random(size=n)
+    uncategorized = rng.random(size=n) < uncategorized_fraction
+
+    transactions = []
+    for i in range(n):
+        is_income = flags[i] < income_fraction
+        transactions.append({
+            'id': i + 1,
+            'date': dates[i],
+            'amount': f"{-amounts[i] * 20 if is_income else amounts[i]:.4f}",
+            'currency': 'usd',
+            'payee': f"Payee {payees[i]:04d}",
+            'category_id': None if uncategorized[i] else int(categories[i]) + 1,
+            'category_name': None if uncategorized[i] else CATEGORIES[categories[i]],
+            'is_income': bool(is_income),
+            'exclude_from_totals': bool(income_fraction <= flags[i] < income_fraction + excluded_fraction),
+            'notes': None,
+            'status': 'cleared',
+            'tags': [],
+            'plaid_metadata': None,
+        })
+    return transactions
@@ -0,0 +1,90 @@
+"""
+Lunch Money budgets: parsing /v1/budgets responses and summarising what is left to spend.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(frozen=True)
+class BudgetMonth:
+    budget: float
+    spending: float
+
+    @classmethod
+    def from_json(cls, raw: dict) -> 'BudgetMonth':
+        budget = raw.get('budget_to_base')
+        if budget is None:
+            budget = raw.get('budget_amount')
+        return cls(budget=abs(_to_float(budget)), spending=abs(_to_float(raw.get('spending_to_base'))))
+
+
+@dataclass(frozen=True)
+class Budget:
+    category_id: int | None
+    category_name: str
+    is_group: bool
+    is_income: bool
+    exclude_from_budget: bool
+    archived: bool
+    # Keyed by the first day of the month ('YYYY-MM-01'), as returned by the API
+    months: dict[str, BudgetMonth] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, raw: dict) -> 'Budget':
+        return cls(
+            category_id=raw.get('category_id'),
+            category_name=raw.get('category_name') or '',
+            is_group=bool(raw.get('is_group')),
+            is_income=bool(raw.get('is_income')),
+            exclude_from_budget=bool(raw.get('exclude_from_budget')),
+            archived=bool(raw.get('archived')),
+            months={month: BudgetMonth.from_json(data or {}) for month, data in (raw.get('data') or {}).items()},
+        )
+
+
+def compute_budget_summary(budgets: list[Budget], month_start: date,
+                           spending: dict[str, float] | None = None) -> dict | None:
+    """
+    Sums the unspent budget of every budgeted expense category for a month.
+
+    Mirrors computeBudgetSummary in the JS dashboard.
+
+    Args:
+        budgets: Parsed /v1/budgets response.
+        month_start: First day of the month to summarise.
+        spending: Spending per category name to use instead of the budgets' own
+            (month-to-date as of the fetch), e.g. to summarise a past date.
+
+    Returns:
+        A dict with remainingTotal, remainingCount and totalBudget, or None if nothing is budgeted.
+    """
+    month_key = month_start.replace(day=1).isoformat()
+    remaining_total = 0.0
+    remaining_count = 0
+    total_budget = 0.0
+    for b in budgets:
+        if b.is_group or b.is_income or b.exclude_from_budget or b.archived:
+            continue
+        month = b.months.get(month_key)
+        if month is None or month.budget <= 0:
+            continue
+        total_budget += month.budget
+        spent = month.spending if spending is None else abs(spending.get(b.category_name, 0.0))
+        remaining = max(0.0, month.budget - spent)
+        if remaining > 0.005:
+            remaining_count += 1
+            remaining_total += remaining
+    if total_budget <= 0:
+        return None
+    return {
+        'remainingTotal': round(remaining_total, 2),
+        'remainingCount': remaining_count,
+        'totalBudget': round(total_budget, 2),
+    }
@@ -0,0 +1,184 @@
+"""
+Reusable matplotlib renderer for the cumulative spending chart.
+
+Building and styling the figure (theme, spines, grid, legend, formatters) costs more
+than drawing one report's lines, so ComparisonChart does it once on the Agg canvas and
+each render only swaps in the new line data, fills, annotations and summary text.
+
+Importing this module loads matplotlib; comparison.py only imports it when a chart is
+actually rendered.
+"""
+import os
+import threading
+
+import matplotlib
+import matplotlib.style
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+from matplotlib.ticker import FuncFormatter
+
+STYLE = 'dark_background'
+BACKGROUND = '#1a1a1a'
+COLOR_LAST_MONTH = '#00f2fe' # Cyan/Blue
+COLOR_CURRENT_MONTH = '#43e97b' # Green/Teal
+COLOR_PROJECTED = '#43e97b'
+FIGSIZE = (12, 8)
+DPI = 120
+# Same padding as savefig's bbox_inches='tight'
+PAD_INCHES = 0.1
+CHART_FORMATS = ('png', 'svg')
+
+
+def _currency(x, _pos):
+    return f'${x:,.0f}'
+
+
+class ComparisonChart:
+    """
+    One styled figure, redrawn for every report.
+
+    With fixed_bbox, the tight bounding box is measured on the first render only and
+    reused afterwards, saving the extra layout pass bbox_inches='tight' costs on every
+    save. The reused box spans the full figure width, so wider tick labels or
+    annotations in a later report are never clipped; only the empty margin above the
+    title and below the axis label is trimmed.
+
+    Not thread-safe: use one instance per thread (see shared_chart).
+    """
+
+    def __init__(self, fixed_bbox: bool = True):
+        self.fixed_bbox = fixed_bbox
+        self._bbox: Bbox | None = None
+        self._legend_has_future: bool | None = None
+        self._fills = []
+
+        with matplotlib.style.context(STYLE):
+            self.figure = Figure(figsize=FIGSIZE, facecolor=BACKGROUND)
+            FigureCanvasAgg(self.figure)
+            ax = self.ax = self.figure.add_subplot()
+            ax.set_facecolor(BACKGROUND)
+            # Room at the top for the title and the summary below it
+            self.figure.subplots_adjust(top=0.82)
+            self.figure.suptitle('Cumulative Spending Comparison', fontsize=20, color='#ffffff', fontweight='bold', y=0.96)
+            self.summary = self.figure.text(0.5, 0.89, '', fontsize=12, ha='center', va='top',
+                                            color='#e0e0e0', family='monospace', fontweight='bold')
+
+            self.last_line, = ax.plot([], [], marker='o', label='Last Month',
+                                      linestyle='-', color=COLOR_LAST_MONTH, linewidth=2, markersize=5,
+                                      markerfacecolor=COLOR_LAST_MONTH, markeredgecolor='#ffffff',
+                                      markeredgewidth=0.5, alpha=0.8)
+            self.current_line, = ax.plot([], [], marker='o', label='Current Month',
+                                         linestyle='-', color=COLOR_CURRENT_MONTH, linewidth=3, markersize=7,
+                                         markerfacecolor=COLOR_CURRENT_MONTH, markeredgecolor='#ffffff',
+                                         markeredgewidth=1.5, zorder=5) # Higher zorder to stay on top
+            self.future_line, = ax.plot([], [], marker='', label='Future Spending',
+                                        linestyle='--', color=COLOR_PROJECTED, alpha=0.5, linewidth=2)
+
+            self.last_label = ax.annotate('', xy=(0, 0), xytext=(5, 0), textcoords='offset points',
+                                          color=COLOR_LAST_MONTH, fontsize=9, fontweight='bold', va='center')
+            self.current_label = ax.annotate('', xy=(0, 0), xytext=(5, 5), textcoords='offset points',
+                                             color=COLOR_CURRENT_MONTH, fontsize=10, fontweight='bold', va='bottom',
+                                             bbox=dict(facecolor=BACKGROUND, edgecolor='none', alpha=0.7, pad=1))
+            self.future_label = ax.annotate('', xy=(0, 0), xytext=(5, 0), textcoords='offset points',
+                                            color=COLOR_PROJECTED, fontsize=9, alpha=0.7, va='center')
+
+            ax.set_xlabel('Day of the Month', fontsize=12, color='#cccccc', fontweight='500', labelpad=10)
+            ax.set_ylabel('Cumulative Amount Spent ($)', fontsize=12, color='#cccccc', fontweight='500', labelpad=10)
+            ax.grid(True, linestyle=':', alpha=0.4, color='#666666') # Dotted grid
+            ax.set_axisbelow(True)
+            ax.tick_params(colors='#cccccc', labelsize=10)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.spines['bottom'].set_color('#404040')
+            ax.spines['left'].set_color('#404040')
+            # The x-axis always covers a full month for context
+            ax.set_xlim(1, 31)
+            ax.yaxis.set_major_formatter(FuncFormatter(_currency))
+
+    def _update_legend(self, show_future: bool) -> None:
+        if show_future == self._legend_has_future:
+            return
+        handles = [self.last_line, self.current_line] + ([self.future_line] if show_future else [])
+        with matplotlib.style.context(STYLE):
+            legend = self.ax.legend(handles=handles, loc='upper left', frameon=True, facecolor='#2d2d2d',
+                                    edgecolor='#404040', labelcolor='#ffffff', fontsize=10)
+        legend.get_frame().set_boxstyle('round,pad=0.3')
+        self._legend_has_future = show_future
+
+    def update(self, summary_text: str, last_x: np.ndarray, last_y: np.ndarray, current_y: np.ndarray,
+               future_x: np.ndarray | None = None, future_y: np.ndarray | None = None,
+               current_x: np.ndarray | None = None) -> None:
+        """
+        Swaps in one report's data. The future line is drawn when future_x/future_y are
+        given; current_x defaults to one point per day from the 1st.
+        """
+        if current_x is None:
+            current_x = np.arange(1, len(current_y) + 1)
+        show_future = future_x is not None and future_y is not None and len(future_y) > 1
+
+        self.summary.set_text(summary_text)
+        self.last_line.set_data(last_x, last_y)
+        self.current_line.set_data(current_x, current_y)
+        self.future_line.set_visible(show_future)
+        self.future_label.set_visible(show_future)
+
+        self.last_label.xy = (last_x[-1], last_y[-1])
+        self.last_label.set_text(f'${last_y[-1]:,.0f}')
+        self.current_label.xy = (current_x[-1], current_y[-1])
+        self.current_label.set_text(f'${current_y[-1]:,.0f}')
+        if show_future:
+            self.future_line.set_data(future_x, future_y)
+            self.future_label.xy = (future_x[-1], future_y[-1])
+            self.future_label.set_text(f'Future: ${future_y[-1]:,.0f}')
+
+        # Fills cannot be reshaped in place (before matplotlib 3.10), so they are replaced
+        for fill in self._fills:
+            fill.remove()
+        self.ax.relim(visible_only=True)
+        self._fills = [
+            self.ax.fill_between(last_x, last_y, color=COLOR_LAST_MONTH, alpha=0.1),
+            self.ax.fill_between(current_x, current_y, color=COLOR_CURRENT_MONTH, alpha=0.2),
+        ]
+        self.ax.autoscale_view(scalex=False)
+        self._update_legend(show_future)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the figure to path; the format (png or svg) follows the extension.
+        """
+        chart_format = os.path.splitext(path)[1].lstrip('.').lower()
+        if chart_format not in CHART_FORMATS:
+            raise ValueError(f"unsupported chart format: {path}")
+        # No creation date and fixed element ids, so identical reports produce identical SVGs
+        with matplotlib.style.context(STYLE), matplotlib.rc_context({'svg.hashsalt': 'lunchmoney'}):
+            metadata = {'Date': None} if chart_format == 'svg' else None
+            self.figure.savefig(path, format=chart_format, facecolor=BACKGROUND, dpi=DPI,
+                                bbox_inches=self._bbox_inches(), pad_inches=PAD_INCHES, metadata=metadata)
+
+    def _bbox_inches(self) -> Bbox | str:
+        if not self.fixed_bbox:
+            return 'tight'
+        if self._bbox is None:
+            self.figure.draw_without_rendering()
+            tight = self.figure.get_tightbbox()
+            width, height = self.figure.get_size_inches()
+            self._bbox = Bbox.from_extents(0, max(0, tight.y0 - PAD_INCHES), width, min(height, tight.y1 + PAD_INCHES))
+        return self._bbox
+
+    def close(self) -> None:
+        self.figure.clear()
+
+
+_local = threading.local()
+
+
+def shared_chart() -> ComparisonChart:
+    """
+    Returns this thread's chart, building it on first use.
+    """
+    chart = getattr(_local, 'chart', None)
+    if chart is None:
+        chart = _local.chart = ComparisonChart()
+    return chart
@@ -1,42 +1,26 @@
-from dotenv import load_dotenv
 import os
-import requests
-import math
 import json
+import functools
+import gzip
+import hashlib
+import itertools
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+from pandas.api.types import union_categoricals
 import sys
 import argparse
+from collections.abc import Callable, Iterator
+from datetime import date
+from typing import TYPE_CHECKING, TypeVar
+from profiling import record_frames, stage
+from transaction_cache import DEFAULT_CACHE_PATH, TransactionCache, account_key, month_end, months_in_range
 
-# Load the .env file
-load_dotenv()
+if TYPE_CHECKING:
+    # Imported lazily at runtime: requests (and matplotlib, below) are only loaded by the stages that need them
+    from budgets import Budget
+    from lunchmoney_client import LunchMoneyClient
 
-# Get the value of the 'LM_API' environmental variable
-lm_api = os.getenv('LM_API_KEY')
-lm_hostname = os.getenv('LM_HOSTNAME')
-
-# Set the headers for the request
-headers = {
-    "Authorization": f"Bearer {lm_api}"
-}
-
-# Create an ArgumentParser object
-parser = argparse.ArgumentParser(description="Compare spending with the previous month.")
-# Add an optional argument --date (or -d) that accepts a string
-parser.add_argument("--date", "-d", type=str, help="Specify a date in YYYY-MM-DD format.")
-# Parse the arguments
-args = parser.parse_args()
-
-# Process the date argument
-if args.date:
-    try:
-        input_date = pd.to_datetime(args.date)
-    except ValueError:
-        print("Error: Invalid date format. Please use YYYY-MM-DD.")
-        sys.exit(1)
-else:
-    input_date = pd.to_datetime('today')
+T = TypeVar('T')
 
 def calculate_date_boundaries(current_date: pd.Timestamp) -> tuple[pd.Timestamp, pd.Timestamp, pd.Timestamp]:
     """
@@ -56,139 +40,614 @@ def calculate_date_boundaries(current_date: pd.Timestamp) -> tuple[pd.Timestamp,
     start_of_previous_month = end_of_previous_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     return start_of_this_month, end_of_previous_month, start_of_previous_month
 
-# Calculate key date boundaries using the new function
-start_of_this_month, end_of_previous_month, start_of_previous_month = calculate_date_boundaries(input_date)
+# Number of transactions requested per page; the API caps unpaginated responses.
+TRANSACTIONS_PAGE_SIZE = 1000
+# Stale months fetched ahead of the one being consumed
+MONTH_LOOKAHEAD = 4
+
+def iter_transaction_pages(start_date_str: str, end_date_str: str, client: 'LunchMoneyClient',
+                           page_size: int = TRANSACTIONS_PAGE_SIZE) -> Iterator[list[dict]]:
+    """
+    Yields the raw transaction records for a date range one API page at a time.
+
+    Pages are requested with offset/limit until the API reports no more results
+    (or returns a short page), so only one page of JSON is held in memory at once.
 
-# Define API URL
-api_url = f"{lm_hostname}/v1/transactions"
+    Args:
+        start_date_str: The start date for transactions (YYYY-MM-DD).
+        end_date_str: The end date for transactions (YYYY-MM-DD).
+        client: The shared Lunch Money API client.
+        page_size: Maximum number of transactions per request.
 
-def get_transactions_df(start_date_str: str, end_date_str: str, hostname: str, request_headers: dict) -> pd.DataFrame:
+    Yields:
+        Non-empty lists of transaction dicts.
     """
-    Fetches transactions from the API for a given date range and processes them into a DataFrame.
+    offset = 0
+    while True:
+        params = {
+            "start_date": start_date_str,
+            "end_date": end_date_str,
+            "offset": offset,
+            "limit": page_size,
+        }
+        with stage('fetch'):
+            payload = client.get('/v1/transactions', params)
+        page = payload.get('transactions') or []
+        if page:
+            yield page
+        has_more = payload.get('has_more')
+        if has_more is None:
+            has_more = len(page) >= page_size
+        if not has_more or not page:
+            return
+        offset += len(page)
+
+def fetch_transactions_json(start_date_str: str, end_date_str: str, client: 'LunchMoneyClient') -> list[dict]:
+    """
+    Fetches all raw transaction records for a date range from the API.
 
     Args:
         start_date_str: The start date for transactions (YYYY-MM-DD).
         end_date_str: The end date for transactions (YYYY-MM-DD).
-        hostname: The base URL of the API.
-        request_headers: Headers to include in the API request.
+        client: The shared Lunch Money API client.
 
     Returns:
-        A pandas DataFrame containing the processed transaction data.
-        Exits the script if no transactions are found or if there's an API error.
+        The list of transaction dicts returned by the API (possibly empty).
     """
-    params = {
-        "start_date": start_date_str,
-        "end_date": end_date_str
-    }
-    response = requests.get(f"{hostname}/v1/transactions", headers=request_headers, params=params)
-    response.raise_for_status() # Raises an exception for HTTP errors (4xx or 5xx)
-
-    transactions_data = response.json().get('transactions')
-    if not transactions_data: # Checks for None or empty list
-        print(f"No transaction data found between {start_date_str} and {end_date_str}.")
-        # Depending on requirements, might return empty DF instead of exiting:
-        # return pd.DataFrame()
-        sys.exit()
+    transactions = []
+    for page in iter_transaction_pages(start_date_str, end_date_str, client):
+        transactions.extend(page)
+    return transactions
+
+def iter_cached_transaction_pages(start_date_str: str, end_date_str: str, client: 'LunchMoneyClient',
+                                  cache: TransactionCache, refresh: bool = False) -> Iterator[list[dict]]:
+    """
+    Yields the raw transaction records for a date range one cached calendar month at a time.
+
+    Whole calendar months are fetched and cached; only months that are missing or stale
+    (or every month, when refresh is set) hit the API. Months are loaded as they are
+    yielded: at most MONTH_LOOKAHEAD stale months are fetched ahead of the one being
+    consumed, so memory stays bounded however long the range is.
 
-    df = pd.DataFrame(transactions_data)
+    Args:
+        start_date_str: The start date for transactions (YYYY-MM-DD).
+        end_date_str: The end date for transactions (YYYY-MM-DD).
+        client: The shared Lunch Money API client.
+        cache: The local transaction cache.
+        refresh: Refetch every month, replacing what is cached.
+
+    Yields:
+        Non-empty lists of the transaction dicts of one month dated within the range.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    account = account_key(client.hostname, client.headers)
+    start = pd.Timestamp(start_date_str).date()
+    end = pd.Timestamp(end_date_str).date()
+    months = months_in_range(start, end)
+    with stage('cache'):
+        fresh = set() if refresh else cache.fresh_months(account, months)
+    stale_months = iter([month_start for month_start in months if month_start not in fresh])
+
+    def fetch_month(month_start: date) -> list[dict]:
+        return fetch_transactions_json(
+            month_start.strftime('%Y-%m-%d'), month_end(month_start).strftime('%Y-%m-%d'), client
+        )
+
+    with ThreadPoolExecutor(max_workers=min(client.max_workers, MONTH_LOOKAHEAD)) as executor:
+        # Stale months in flight, oldest first; topped up as each one is consumed
+        pending = {month_start: executor.submit(fetch_month, month_start)
+                   for month_start in itertools.islice(stale_months, MONTH_LOOKAHEAD)}
+        for month_start in months:
+            month_transactions = None
+            if month_start in fresh:
+                with stage('cache'):
+                    month_transactions = cache.get_month(account, month_start)
+            if month_transactions is None:
+                # Expired since fresh_months checked it, the fetch runs here
+                future = pending.pop(month_start, None)
+                month_transactions = future.result() if future else fetch_month(month_start)
+                for next_month in itertools.islice(stale_months, MONTH_LOOKAHEAD - len(pending)):
+                    pending[next_month] = executor.submit(fetch_month, next_month)
+                with stage('cache'):
+                    cache.put_month(account, month_start, month_transactions)
+            # Dates are ISO strings, so lexical comparison trims the partial months at either end
+            page = [t for t in month_transactions if start_date_str <= t.get('date', '') <= end_date_str]
+            del month_transactions
+            if page:
+                yield page
+
+# Columns kept from each API transaction and their compact in-memory dtypes.
+# Everything else the API returns (notes, plaid metadata, tags, ...) is dropped at parse time.
+TRANSACTION_SCHEMA = {
+    'id': 'int64',
+    'date': 'datetime64[ns]',
+    # float32 halves the footprint; aggregations accumulate in float64
+    'amount': 'float32',
+    'payee': 'category',
+    'category_name': 'category',
+    'is_income': 'bool',
+    'exclude_from_totals': 'bool',
+}
+CATEGORICAL_COLUMNS = [col for col, dtype in TRANSACTION_SCHEMA.items() if dtype == 'category']
+
+def parse_transactions_page(transactions_data: list[dict]) -> pd.DataFrame:
+    """
+    Converts one page of raw transaction records into a compact, typed, filtered DataFrame.
+
+    Only the columns in TRANSACTION_SCHEMA are kept (missing keys become nulls), and
+    each is stored in the schema's dtype.
+
+    Args:
+        transactions_data: Transaction dicts as returned by the API.
+
+    Returns:
+        A DataFrame of the page's spending transactions (income and excluded rows removed).
+    """
+    df = pd.DataFrame(transactions_data, columns=list(TRANSACTION_SCHEMA))
 
     # Format the date, amount, and other flags
     df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
-    df['amount'] = df['amount'].astype(float)
-    df['exclude_from_totals'] = df['exclude_from_totals'].astype(bool)
-    df['is_income'] = df['is_income'].astype(bool)
+    df['amount'] = pd.to_numeric(df['amount']).astype(TRANSACTION_SCHEMA['amount'])
+    df['exclude_from_totals'] = df['exclude_from_totals'].fillna(False).astype(bool)
+    df['is_income'] = df['is_income'].fillna(False).astype(bool)
 
     # Remove items that are income or flagged to remove from totals
     df = df[(df["exclude_from_totals"] == False) & (df['is_income'] == False)]
-    return df
+    return df.astype({col: TRANSACTION_SCHEMA[col] for col in ['id', *CATEGORICAL_COLUMNS]})
+
+def concat_transaction_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates parsed transaction frames, keeping the categorical columns categorical.
+
+    pd.concat falls back to object dtype when the frames' categories differ, so the
+    categorical columns are combined separately with union_categoricals.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat([f.drop(columns=CATEGORICAL_COLUMNS) for f in frames], ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        # An all-null page has empty non-string categories; align them before the union
+        parts = [f[col].cat.set_categories(f[col].cat.categories.astype(str)) for f in frames]
+        df[col] = union_categoricals(parts, ignore_order=True)
+    return df[list(frames[0].columns)]
+
+def get_transactions_df(start_date_str: str, end_date_str: str, client: 'LunchMoneyClient',
+                        cache: TransactionCache | None = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Fetches transactions from the API for a given date range and processes them into a DataFrame.
+
+    Each page is parsed as it arrives, so peak memory is bounded by one page of JSON
+    plus the compact parsed frames.
 
-###
-# Get this month's transactions
-###
-current_month_start_str = start_of_this_month.strftime('%Y-%m-%d')
-current_month_end_str = (input_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d') # Includes all of input_date
-current_month_df = get_transactions_df(current_month_start_str, current_month_end_str, lm_hostname, headers)
-# Filter to ensure we don't include transactions from the next month (due to +1 day in end_str)
-if not current_month_df.empty:
-    # Ensure we compare normalized dates (though current_month_df['date'] is already normalized)
-    # Use a normalized input_date for comparison to avoid issues if input_date has time (e.g. 'today')
-    # But wait, if input_date is 'today', we want to include today's transactions.
-    # current_month_df['date'] is 00:00:00.
-    # If input_date is today (with time), df['date'] <= input_date is True for today.
-    # If input_date is args.date (00:00:00), df['date'] <= input_date is True for that date.
-    # So direct comparison is safe.
-    current_month_df = current_month_df[current_month_df['date'] <= input_date]
-
-###
-# Get last month's transactions
-###
-previous_month_start_str = start_of_previous_month.strftime('%Y-%m-%d')
-previous_month_end_str = end_of_previous_month.strftime('%Y-%m-%d')
-last_month_df = get_transactions_df(previous_month_start_str, previous_month_end_str, lm_hostname, headers)
-
-
-# --- Prepare data for "future" spending line (all transactions in current month) ---
-end_of_current_month_for_plot = input_date.replace(day=1) + pd.offsets.MonthEnd(0)
-full_current_month_df = pd.DataFrame() # Initialize as empty
-# Only fetch if the end_of_current_month_for_plot is actually after input_date's effective range for current_month_df
-if end_of_current_month_for_plot.strftime('%Y-%m-%d') >= current_month_end_str: # Compare string dates
-    # Fetch all transactions from the start of the month to the actual end of the month
-    full_current_month_df = get_transactions_df(
-        current_month_start_str, # already defined: start_of_this_month.strftime('%Y-%m-%d')
-        (end_of_current_month_for_plot + pd.Timedelta(days=1)).strftime('%Y-%m-%d'), # include last day
-        lm_hostname,
-        headers
+    Args:
+        start_date_str: The start date for transactions (YYYY-MM-DD).
+        end_date_str: The end date for transactions (YYYY-MM-DD).
+        client: The shared Lunch Money API client.
+        cache: Optional local transaction cache to serve unchanged months from.
+        refresh: Bypass (and repopulate) the cache.
+
+    Returns:
+        A pandas DataFrame containing the processed transaction data (empty, with the
+        schema's columns, when the range has no transactions).
+
+    Raises:
+        requests.RequestException: If the API request fails.
+    """
+    if cache is not None:
+        pages = iter_cached_transaction_pages(start_date_str, end_date_str, client, cache, refresh)
+    else:
+        pages = iter_transaction_pages(start_date_str, end_date_str, client)
+    frames = []
+    for page in pages:
+        with stage('parse'):
+            frames.append(parse_transactions_page(page))
+    if not frames:
+        return parse_transactions_page([])
+
+    with stage('parse'):
+        return concat_transaction_frames(frames)
+
+def plan_fetch_ranges(ranges: list[tuple[pd.Timestamp, pd.Timestamp]]) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Merges the date ranges a report needs into the fewest API requests.
+
+    Ranges are inclusive on both ends. Ranges that overlap, or that touch
+    (one ends the day before the next begins), are combined into one.
+
+    Args:
+        ranges: (start, end) pairs of normalized pandas Timestamps.
+
+    Returns:
+        A sorted list of non-overlapping (start, end) pairs covering every input range.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + pd.Timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def fetch_transactions_for_ranges(ranges: list[tuple[pd.Timestamp, pd.Timestamp]], client: 'LunchMoneyClient',
+                                  cache: TransactionCache | None = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Fetches the union of the given date ranges with as few requests as possible.
+
+    Ranges that cannot be merged are fetched concurrently on the client's thread pool.
+
+    Args:
+        ranges: (start, end) pairs of dates to cover, inclusive on both ends.
+        client: The shared Lunch Money API client.
+        cache: Optional local transaction cache to serve unchanged months from.
+        refresh: Bypass (and repopulate) the cache.
+
+    Returns:
+        A single DataFrame with the transactions of every planned range, sorted by date.
+    """
+    frames = client.map_concurrently(
+        lambda date_range: get_transactions_df(
+            date_range[0].strftime('%Y-%m-%d'), date_range[1].strftime('%Y-%m-%d'), client, cache, refresh
+        ),
+        plan_fetch_ranges(ranges),
     )
-    # Filter to ensure we don't include transactions from the next month
+    return concat_transaction_frames(frames).sort_values(by='date', kind='stable')
+
+def slice_transactions(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Returns the transactions dated between start and end (inclusive) as an independent frame.
+    """
+    return df[(df['date'] >= start) & (df['date'] <= end)].copy()
+
+def prepare_month_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sorts a month of transactions by date and adds the day-of-month column.
+
+    Args:
+        df: One month of transactions (modified in place).
+
+    Returns:
+        The same DataFrame, for chaining.
+    """
+    if df.empty:
+        df['day'] = None
+        return df
+    df.sort_values(by='date', inplace=True, kind='stable')
+    df['day'] = df['date'].dt.day
+    return df
+
+def report_fetch_range(first_date: pd.Timestamp, last_date: pd.Timestamp | None = None) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Returns the date range covering every report dated between first_date and last_date.
+
+    Each report needs the whole month before its date and the whole of its own month,
+    so the range runs from the start of the month before first_date to the end of
+    last_date's month.
+
+    Args:
+        first_date: Date of the earliest report.
+        last_date: Date of the latest report (defaults to first_date).
+
+    Returns:
+        A (start, end) pair of normalized Timestamps, inclusive on both ends.
+    """
+    last_date = first_date if last_date is None else last_date
+    _, _, start_of_previous_month = calculate_date_boundaries(first_date)
+    end_of_last_month = (last_date.replace(day=1) + pd.offsets.MonthEnd(0)).normalize()
+    return start_of_previous_month, end_of_last_month
+
+def build_report_frames(all_transactions_df: pd.DataFrame, input_date: pd.Timestamp) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Slices and prepares the three frames a report is built from.
+
+    Args:
+        all_transactions_df: Transactions covering at least report_fetch_range(input_date).
+        input_date: The reference date of the report.
+
+    Returns:
+        A tuple of (current_month_df, last_month_df, full_current_month_df).
+    """
+    start_of_this_month, end_of_previous_month, start_of_previous_month = calculate_date_boundaries(input_date)
+    end_of_current_month_for_plot = input_date.replace(day=1) + pd.offsets.MonthEnd(0)
+
+    # input_date may carry a time component (e.g. 'today'); transaction dates are midnight,
+    # so comparing against it directly still includes all of input_date.
+    current_month_df = slice_transactions(all_transactions_df, start_of_this_month, input_date)
+    last_month_df = slice_transactions(all_transactions_df, start_of_previous_month, end_of_previous_month)
+
+    # --- Prepare data for "future" spending line (all transactions in current month) ---
+    # Nothing lies beyond input_date when it is already the last day of the month.
+    full_current_month_df = pd.DataFrame() # Initialize as empty
+    if end_of_current_month_for_plot.normalize() > input_date.normalize():
+        full_current_month_df = slice_transactions(all_transactions_df, start_of_this_month, end_of_current_month_for_plot)
+
+    prepare_month_df(current_month_df)
+    prepare_month_df(last_month_df)
     if not full_current_month_df.empty:
-        full_current_month_df = full_current_month_df[full_current_month_df['date'] <= end_of_current_month_for_plot]
-
-if not full_current_month_df.empty:
-    full_current_month_df.sort_values(by='date', inplace=True) # ensure correct order for cumsum
-    full_current_month_df['cumulative'] = full_current_month_df['amount'].cumsum()
-    full_current_month_df['day'] = full_current_month_df['date'].dt.day
-
-
-# Calculate cumulative amounts at the end of each day for the primary DFs
-# Ensure dataframes are not empty before attempting cumsum
-if not last_month_df.empty:
-    last_month_df.sort_values(by='date', inplace=True) # ensure correct order for cumsum
-    last_month_df['cumulative'] = last_month_df['amount'].cumsum()
-else:
-    last_month_df['cumulative'] = 0 # Or handle as per requirements for empty df
-
-if not current_month_df.empty:
-    current_month_df.sort_values(by='date', inplace=True) # ensure correct order for cumsum
-    current_month_df['cumulative'] = current_month_df['amount'].cumsum()
-else:
-    current_month_df['cumulative'] = 0 # Or handle as per requirements
-
-# Create a new column for the day of the month
-if not last_month_df.empty:
-    # 'day' column already added in get_transactions_df if we decide to move it there
-    # For now, adding it here after cumsum if it wasn't added before.
-    # However, 'date' is needed for sort_values, so 'day' should be added after sorting and cumsum.
-    last_month_df['day'] = last_month_df['date'].dt.day
-else:
-    last_month_df['day'] = None # Or handle as per requirements
-
-if not current_month_df.empty:
-    current_month_df['day'] = current_month_df['date'].dt.day
-else:
-    current_month_df['day'] = None # Or handle as per requirements
-
-
-# Find the nearest available day in the last month
-def find_nearest_available_day(df, target_day):
-    # Find the nearest available day or fallback to the previous day.
-    # Ensure the DataFrame is not empty and has 'day' column.
-    if df.empty or 'day' not in df.columns or df['day'].isnull().all():
-        return None # Or a default value like 1, or raise an error
-    available_days = df['day'].dropna().unique()
-    if not available_days.size:
-        return None # No available days
-    nearest_day = min(available_days, key=lambda x: abs(x - target_day)) # Ensure available_days is not empty
-    return nearest_day
+        prepare_month_df(full_current_month_df)
+    return current_month_df, last_month_df, full_current_month_df
+
+def load_report_frames(input_date: pd.Timestamp, client: 'LunchMoneyClient', cache: TransactionCache | None = None,
+                       refresh: bool = False) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Fetches and prepares the three frames a report is built from.
+
+    Every transaction the report needs (the previous month, this month up to input_date,
+    and the rest of this month) is fetched in one planned request and sliced in memory.
+
+    Args:
+        input_date: The reference date of the report.
+        client: The shared Lunch Money API client.
+        cache: Optional local transaction cache to serve unchanged months from.
+        refresh: Bypass (and repopulate) the cache.
+
+    Returns:
+        A tuple of (current_month_df, last_month_df, full_current_month_df).
+    """
+    all_transactions_df = fetch_transactions_for_ranges([report_fetch_range(input_date)], client, cache=cache, refresh=refresh)
+    with stage('aggregate'):
+        return build_report_frames(all_transactions_df, input_date)
+
+def fetch_budgets_json(month_start: date, client: 'LunchMoneyClient') -> list[dict]:
+    """
+    Fetches the raw /v1/budgets records of one calendar month.
+    """
+    payload = client.get('/v1/budgets', params={
+        'start_date': month_start.strftime('%Y-%m-%d'),
+        'end_date': month_end(month_start).strftime('%Y-%m-%d'),
+    })
+    # /v1/budgets returns a bare list; treat an error object as no budgets
+    return payload if isinstance(payload, list) else []
+
+def load_month_budgets(months: list[date], client: 'LunchMoneyClient', cache: TransactionCache | None = None,
+                       refresh: bool = False) -> dict[date, list[dict]]:
+    """
+    Returns the raw budgets of each month, fetching the missing or stale ones concurrently.
+
+    Args:
+        months: First days of the months to load.
+        client: The shared Lunch Money API client.
+        cache: Optional local cache; a closed month's budgets are fetched only once.
+        refresh: Bypass (and repopulate) the cache.
+
+    Returns:
+        A dict mapping each month start to its budget records.
+    """
+    account = account_key(client.hostname, client.headers)
+    with stage('cache'):
+        loaded = {month_start: None if cache is None or refresh else cache.get_budgets(account, month_start)
+                  for month_start in months}
+    stale_months = [month_start for month_start, budgets in loaded.items() if budgets is None]
+    fetched = client.map_concurrently(lambda month_start: fetch_budgets_json(month_start, client), stale_months)
+    with stage('cache'):
+        for month_start, budgets in zip(stale_months, fetched):
+            if cache is not None:
+                cache.put_budgets(account, month_start, budgets)
+            loaded[month_start] = budgets
+    return loaded
+
+def load_report_budgets(first_date: pd.Timestamp, last_date: pd.Timestamp, client: 'LunchMoneyClient',
+                        cache: TransactionCache | None = None, refresh: bool = False) -> dict[date, list['Budget']]:
+    """
+    Loads the budgets of every month with a report dated between first_date and last_date.
+
+    Budgets only refine the projection, so when they cannot be fetched the reports fall
+    back to projecting from the daily average.
+
+    Returns:
+        A dict mapping each month start to its parsed budgets, or an empty dict if the
+        budgets could not be fetched.
+    """
+    import requests
+    from budgets import Budget
+
+    months = months_in_range(first_date.date(), last_date.date())
+    try:
+        raw = load_month_budgets(months, client, cache=cache, refresh=refresh)
+    except requests.RequestException as exc:
+        print(f"Budgets unavailable, projecting from the daily average: {exc}")
+        return {}
+    return {month_start: [Budget.from_json(b) for b in raw[month_start]] for month_start in months}
+
+def report_budget(budgets: dict[date, list['Budget']], input_date: pd.Timestamp, current_month_df: pd.DataFrame,
+                  today: date | None = None) -> dict | None:
+    """
+    Summarises the unspent budget of input_date's month as of input_date.
+
+    The API reports each budget's spending for the whole month as of the fetch. That only
+    matches a report dated today; for any earlier date, even one in this month, each
+    category's spending is summed from current_month_df (the report's transactions up to
+    input_date).
+
+    Args:
+        budgets: A load_report_budgets result.
+        input_date: The reference date of the report.
+        current_month_df: The report's transactions from the start of the month to input_date.
+        today: The current date (defaults to date.today()).
+
+    Returns:
+        compute_budget_summary's result, or None when the month has no budgets.
+    """
+    from budgets import compute_budget_summary
+
+    month_start = input_date.date().replace(day=1)
+    if month_start not in budgets:
+        return None
+    today = date.today() if today is None else today
+    spending = None
+    if input_date.date() != today:
+        spending = {} if current_month_df.empty else {
+            str(category): float(amount)
+            for category, amount in current_month_df.groupby('category_name', observed=True)['amount'].sum().items()
+        }
+    return compute_budget_summary(budgets[month_start], month_start, spending=spending)
+
+def fetch_with_budgets(load: Callable[[], T], first_date: pd.Timestamp, last_date: pd.Timestamp,
+                       client: 'LunchMoneyClient', cache: TransactionCache | None = None,
+                       refresh: bool = False) -> tuple[T, dict[date, list['Budget']]]:
+    """
+    Runs load() (a transaction fetch) while load_report_budgets fetches the same months' budgets.
+
+    The two overlap on the client's thread pool, so budgets add no round-trip of their own.
+    """
+    result, budgets = client.map_concurrently(lambda fn: fn(), [
+        load,
+        lambda: load_report_budgets(first_date, last_date, client, cache=cache, refresh=refresh),
+    ])
+    return result, budgets
+
+def load_net_worth(client: 'LunchMoneyClient', input_date: pd.Timestamp, today: date | None = None) -> dict | None:
+    """
+    Returns the net worth (compute_net_worth's result) for a report dated today.
+
+    Balances are only known as of now, so reports for earlier dates get None, as do
+    accounts without assets or Plaid accounts. When the balances cannot be fetched, the
+    report goes without them.
+    """
+    import httpx
+    import requests
+    from lunchmoney_async import fetch_net_worth
+
+    today = date.today() if today is None else today
+    if input_date.date() != today:
+        return None
+    try:
+        return fetch_net_worth(client)
+    except (httpx.HTTPError, requests.RequestException) as exc:
+        print(f"Net worth unavailable: {exc}")
+        return None
+
+def fetch_with_net_worth(load: Callable[[], T], input_date: pd.Timestamp, client: 'LunchMoneyClient',
+                         today: date | None = None) -> tuple[T, dict | None]:
+    """
+    Runs load() (e.g. a fetch_with_budgets) while load_net_worth fetches the balances.
+    """
+    result, net_worth = client.map_concurrently(lambda fn: fn(), [
+        load,
+        lambda: load_net_worth(client, input_date, today=today),
+    ])
+    return result, net_worth
+
+def daily_cumulative(df: pd.DataFrame, month_start: pd.Timestamp) -> np.ndarray:
+    """
+    Reduces a month of transactions to its end-of-day cumulative spend.
+
+    Days without transactions carry the previous day's total forward, so element
+    i is the amount spent from the 1st up to and including day i + 1.
+
+    Args:
+        df: Transactions dated within the month of month_start.
+        month_start: Any Timestamp in the month (only its year and month are used).
+
+    Returns:
+        A float64 array with one entry per day of the month.
+    """
+    days_in_month = month_start.days_in_month
+    if df.empty:
+        return np.zeros(days_in_month)
+    daily_totals = np.bincount(
+        df['date'].dt.day.to_numpy() - 1,
+        weights=df['amount'].to_numpy(dtype=np.float64),
+        minlength=days_in_month,
+    )
+    return np.cumsum(daily_totals)
+
+def build_daily_series(input_date: pd.Timestamp, current_month_df: pd.DataFrame, last_month_df: pd.DataFrame,
+                       full_current_month_df: pd.DataFrame) -> dict:
+    """
+    Builds the day-level arrays that the console summary, plot and HTML dashboard all read from.
+
+    Each month is reduced once by daily_cumulative; every other view is a slice of those arrays.
+
+    Args:
+        input_date: The reference date of the report.
+        current_month_df: This month's transactions up to input_date.
+        last_month_df: The previous month's transactions.
+        full_current_month_df: All of this month's transactions (empty if input_date is the last day).
+
+    Returns:
+        A dict with:
+            - current: cumulative spend for days 1..input_date.day of this month
+            - future: cumulative spend from input_date.day to the end of this month
+              (empty when nothing lies beyond input_date)
+            - last: cumulative spend for every day of the previous month
+            - last_x: the previous month's days scaled onto this month's length, for plotting
+    """
+    start_of_this_month, _, start_of_previous_month = calculate_date_boundaries(input_date)
+    this_month = daily_cumulative(full_current_month_df if not full_current_month_df.empty else current_month_df,
+                                  start_of_this_month)
+    last = daily_cumulative(last_month_df, start_of_previous_month)
+    return series_from_cumulative(input_date, this_month, last, include_future=not full_current_month_df.empty)
+
+def series_from_cumulative(input_date: pd.Timestamp, this_month: np.ndarray, last: np.ndarray,
+                           include_future: bool = True) -> dict:
+    """
+    Slices both months' end-of-day cumulative arrays into the series build_daily_series returns.
+
+    Args:
+        input_date: The reference date of the report.
+        this_month: Cumulative spend for every day of input_date's month.
+        last: Cumulative spend for every day of the previous month.
+        include_future: Whether to include the rest of this month as the future series.
+    """
+    day = input_date.day
+    return {
+        'current': this_month[:day],
+        'future': this_month[day - 1:] if include_future else np.empty(0),
+        'last': last,
+        # Scale the previous month's days to match the current month's length
+        'last_x': np.arange(1, len(last) + 1) * (len(this_month) / len(last)),
+    }
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a line to max_points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between contributes the point
+    forming the largest triangle with the previously kept point and the next bucket's
+    average, which keeps the line's peaks and turns. Lines already within the budget
+    (or budgets below 3) are returned unchanged.
+    """
+    n = len(x)
+    if max_points < 3 or n <= max_points:
+        return x, y
+    # n - 2 inner points split into max_points - 2 buckets of at least one point each
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return x[kept], y[kept]
+
+def downsample_series(input_date: pd.Timestamp, series: dict, max_points: int | None) -> dict:
+    """
+    Reduces every line of a build_daily_series result to at most max_points points (see lttb).
+
+    Returns the series with explicit 'current_x' and 'future_x' arrays, which both
+    renderers use in place of the implicit day numbers; None returns series as is.
+    """
+    if max_points is None:
+        return series
+    current_x, current = lttb(np.arange(1, len(series['current']) + 1), series['current'], max_points)
+    future_x, future = lttb(np.arange(input_date.day, input_date.day + len(series['future'])), series['future'], max_points)
+    last_x, last = lttb(series['last_x'], series['last'], max_points)
+    return {'current': current, 'current_x': current_x, 'future': future, 'future_x': future_x,
+            'last': last, 'last_x': last_x}
+
+def _series_x(input_date: pd.Timestamp, series: dict, name: str) -> np.ndarray:
+    # Day numbers, unless downsample_series made them explicit
+    if f'{name}_x' in series:
+        return series[f'{name}_x']
+    first_day = 1 if name == 'current' else input_date.day
+    return np.arange(first_day, first_day + len(series[name]))
 
 _DASHBOARD_HTML = r'''<!DOCTYPE html>
 <html lang="en">
@@ -270,6 +729,19 @@ header {
 }
 .sec-title { font-size: 10px; text-transform: uppercase; letter-spacing: .15em; color: var(--accent); }
 .sec-meta { font-size: 10px; color: var(--text-dim); }
+.txn-more {
+  display: block;
+  margin: 14px auto 0;
+  background: none;
+  border: 1px solid var(--border);
+  color: var(--text-mid);
+  cursor: pointer;
+  font-family: inherit;
+  font-size: 10px;
+  padding: 4px 12px;
+  border-radius: 3px;
+}
+.txn-more[hidden] { display: none; }
 .chart-box {
   background: var(--surface);
   border: 1px solid var(--border);
@@ -305,12 +777,14 @@ header {
 .sort-ind { color: var(--accent); }
 .pace-grid {
   display: grid;
-  grid-template-columns: repeat(4, 1fr);
+  grid-auto-flow: column;
+  grid-auto-columns: 1fr;
   gap: 1px;
   background: var(--border);
   border: 1px solid var(--border);
 }
 .pace-card { background: var(--surface); padding: 22px 24px; }
+.pace-card[hidden] { display: none; }
 .pace-lbl { font-size: 10px; text-transform: uppercase; letter-spacing: .13em; color: var(--text-dim); margin-bottom: 10px; }
 .pace-val { font-size: 18px; color: var(--text-bright); font-variant-numeric: tabular-nums; }
 .pace-sub { font-size: 10px; color: var(--text-mid); margin-top: 5px; }
@@ -403,6 +877,7 @@ footer {
     </thead>
     <tbody id="txn-body"></tbody>
   </table>
+  <button id="txn-more" class="txn-more" hidden></button>
 </div>
 
 <div class="sec">
@@ -428,6 +903,11 @@ footer {
       <div class="pace-val" id="p-rem"></div>
       <div class="pace-sub" id="p-rem-sub"></div>
     </div>
+    <div class="pace-card" id="p-nw-card" hidden>
+      <div class="pace-lbl">net worth</div>
+      <div class="pace-val" id="p-nw"></div>
+      <div class="pace-sub" id="p-nw-sub"></div>
+    </div>
   </div>
 </div>
 
@@ -621,6 +1101,8 @@ renderBars('cat-bars', (D.categories || []).map(c => ({ label: c.name, amount: c
 
 // Transactions table
 let txnData = D.recentTransactions ? [...D.recentTransactions] : [];
+// Heavy months embed only the most recent transactions; the rest live in a sidecar JSON file
+const txnTotal = D.transactionCount ?? txnData.length;
 let txnSortCol = 'date';
 let txnSortDir = -1; // -1 desc, 1 asc
 
@@ -644,9 +1126,30 @@ function renderTxns() {
     const el = $('sort-' + col);
     if (el) el.textContent = col === txnSortCol ? (txnSortDir === -1 ? ' ↓' : ' ↑') : '';
   });
-  $('txn-meta').textContent = 'this month · ' + txnData.length + ' transactions';
+  $('txn-meta').textContent = 'this month · ' + txnTotal + ' transactions'
+    + (txnData.length < txnTotal ? ' · showing latest ' + txnData.length : '');
+  const more = $('txn-more');
+  more.hidden = !(D.transactionsUrl && txnData.length < txnTotal);
+  more.textContent = 'show all ' + txnTotal;
 }
 
+$('txn-more').addEventListener('click', async () => {
+  const more = $('txn-more');
+  more.disabled = true;
+  more.textContent = 'loading…';
+  try {
+    const res = await fetch(D.transactionsUrl);
+    if (!res.ok) throw new Error(res.statusText);
+    txnData = await res.json();
+    // re-apply the current sort order to the full list
+    txnSortDir *= -1;
+    sortTable(txnSortCol);
+  } catch (_) {
+    more.disabled = false;
+    more.textContent = 'could not load ' + D.transactionsUrl + ' (serve this folder over http)';
+  }
+});
+
 function sortTable(col) {
   if (txnSortCol === col) {
     txnSortDir *= -1;
@@ -673,19 +1176,90 @@ $('p-proj').textContent = fmt(D.summary.projectedTotal);
 const vsLast = D.summary.lastMonthTotal > 0
   ? ((D.summary.projectedTotal - D.summary.lastMonthTotal) / D.summary.lastMonthTotal * 100)
   : 0;
-$('p-proj-sub').textContent = (vsLast >= 0 ? '+' : '') + vsLast.toFixed(1) + '% vs last month total';
+const vsLastText = (vsLast >= 0 ? '+' : '') + vsLast.toFixed(1) + '% vs last month total';
+if (D.summary.hasBudget) {
+  const n = D.summary.budgetRemainingCount;
+  $('p-proj-sub').textContent = 'incl. ' + fmt(D.summary.budgetRemainingTotal) + ' left in ' + n + ' budget item' + (n === 1 ? '' : 's') + ' · ' + vsLastText;
+} else {
+  $('p-proj-sub').textContent = vsLastText;
+}
 $('p-proj-bar').style.width = clamp(D.summary.lastMonthTotal > 0 ? (D.summary.projectedTotal / D.summary.lastMonthTotal * 100) : 50, 0, 100) + '%';
 const progPct = D.summary.daysInMonth > 0 ? D.summary.daysElapsed / D.summary.daysInMonth : 0;
 $('p-prog').textContent = (progPct * 100).toFixed(0) + '%';
 $('p-prog-bar').style.width = clamp(progPct * 100, 0, 100) + '%';
 $('p-rem').textContent = D.summary.daysRemaining;
 $('p-rem-sub').textContent = 'of ' + D.summary.daysInMonth + ' days';
+if (D.summary.hasNetWorth) {
+  $('p-nw-card').hidden = false;
+  $('p-nw').textContent = fmt(D.summary.netWorth);
+  $('p-nw-sub').textContent = 'across ' + D.summary.netWorthCount + ' account' + (D.summary.netWorthCount === 1 ? '' : 's');
+}
 </script>
 </body>
 </html>'''
 
 
-def generate_html_dashboard(
+# Transactions embedded in the HTML by default; heavier months link the full list from a sidecar file.
+DEFAULT_MAX_EMBEDDED_TRANSACTIONS = 250
+DEFAULT_WATCH_INTERVAL = 300
+# Digests of what each report's files were rendered from, one JSON file per report date
+RENDER_CACHE_DIR = '.render_cache'
+# Bump when the chart's look changes, so cached charts are redrawn
+CHART_VERSION = 1
+
+def _clean_labels(values: pd.Series, default: str) -> pd.Series:
+    """
+    Converts a label column to strings, mapping missing or placeholder values to default.
+    """
+    labels = values.astype(object).where(values.notna(), default).astype(str)
+    return labels.mask(labels.isin(['nan', 'None', '']), default)
+
+def transactions_payload(current_month_df: pd.DataFrame) -> list[dict]:
+    """
+    Builds the dashboard's transaction rows (newest first) with columnar conversions.
+    """
+    if current_month_df.empty:
+        return []
+    df = current_month_df.sort_values('date', ascending=False, kind='stable')
+    n = len(df)
+    return pd.DataFrame({
+        'date': df['date'].dt.strftime('%b %d').to_numpy(),
+        'amount': df['amount'].to_numpy(dtype=np.float64).round(2),
+        'payee': _clean_labels(df['payee'], '').to_numpy() if 'payee' in df.columns else [''] * n,
+        'category': _clean_labels(df['category_name'], '').to_numpy() if 'category_name' in df.columns else [''] * n,
+    }).to_dict('records')
+
+def category_totals_payload(current_month_df: pd.DataFrame) -> list[dict]:
+    """
+    Sums spending per category, largest first.
+
+    The groupby runs on the categorical column's integer codes; only the (few) resulting
+    category names are cleaned, merging blank and missing ones into 'uncategorized'.
+    """
+    if current_month_df.empty or 'category_name' not in current_month_df.columns:
+        return []
+    amounts = current_month_df['amount'].astype(np.float64)
+    grp = amounts.groupby(current_month_df['category_name'], observed=True, dropna=False).sum()
+    names = _clean_labels(grp.index.to_series(), 'uncategorized')
+    grp = pd.Series(grp.to_numpy(), index=names.to_numpy()).groupby(level=0).sum().sort_values(ascending=False, kind='stable')
+    return [{'name': name, 'amount': amount} for name, amount in zip(grp.index, grp.to_numpy().round(2).tolist())]
+
+def daily_totals_payload(current_month_df: pd.DataFrame) -> list[dict]:
+    """
+    Sums spending per day of the month, largest first.
+    """
+    if current_month_df.empty or 'day' not in current_month_df.columns:
+        return []
+    grp = current_month_df['amount'].astype(np.float64).groupby(current_month_df['day']).sum().sort_values(ascending=False)
+    return [{'day': day, 'amount': amount} for day, amount in zip(grp.index.astype(int).tolist(), grp.to_numpy(dtype=np.float64).round(2).tolist())]
+
+def _chart_points(x: np.ndarray, y: np.ndarray) -> list[dict]:
+    """
+    Converts parallel x/y arrays into the [{'x': ..., 'y': ...}] points used by the dashboard charts.
+    """
+    return [{'x': round(float(px), 2), 'y': round(float(py), 2)} for px, py in zip(x, y)]
+
+def dashboard_data(
     input_date: pd.Timestamp,
     this_month_total: float,
     cumulative_amount_on_equivalent_day_last_month_val: float,
@@ -693,71 +1267,50 @@ def generate_html_dashboard(
     diff: float,
     percent_diff: float,
     current_month_df: pd.DataFrame,
-    last_month_df: pd.DataFrame,
-    full_current_month_df: pd.DataFrame,
-) -> str:
+    series: dict,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    transactions: list[dict] | None = None,
+    transactions_url: str | None = None,
+    categories: list[dict] | None = None,
+    daily_totals: list[dict] | None = None,
+    budget: dict | None = None,
+    net_worth: dict | None = None,
+    **_comparison_extras,
+) -> dict:
+    """
+    Builds the data the dashboard renders for one report, as a JSON-serializable dict.
+
+    Args:
+        max_embedded_transactions: Embed at most this many (most recent) transactions; None embeds all.
+        transactions: Precomputed transactions_payload(current_month_df), to avoid building it twice.
+        transactions_url: Relative URL of the sidecar file holding every transaction, if one was written.
+        categories: Precomputed category_totals_payload(current_month_df).
+        daily_totals: Precomputed daily_totals_payload(current_month_df).
+        budget: The month's compute_budget_summary result. When given, the projected total
+            is the spending so far plus the unspent budget, as in the live dashboard;
+            otherwise it extrapolates the daily average.
+        net_worth: The accounts' compute_net_worth result, shown next to the pace figures.
+    """
     days_elapsed = input_date.day
     days_in_month = input_date.days_in_month
     days_remaining = days_in_month - days_elapsed
     avg_daily = this_month_total / days_elapsed if days_elapsed > 0 else 0
     projected_total = avg_daily * days_in_month
-
-    current_chart = []
-    if not current_month_df.empty and 'day' in current_month_df.columns and 'cumulative' in current_month_df.columns:
-        # Group by day, take the final cumulative (max per day) to avoid vertical segments
-        day_groups = current_month_df.groupby('day')['cumulative'].max()
-        for day, cum in day_groups.items():
-            if pd.notna(day) and pd.notna(cum):
-                current_chart.append({'x': int(day), 'y': round(float(cum), 2)})
-        current_chart.sort(key=lambda p: p['x'])
-
-    last_chart = []
-    if not last_month_df.empty and 'normalized_day' in last_month_df.columns and 'cumulative' in last_month_df.columns:
-        # Group by normalized_day, take the final cumulative per day
-        day_groups = last_month_df.groupby('normalized_day')['cumulative'].max()
-        for nday, cum in day_groups.items():
-            if pd.notna(nday) and pd.notna(cum):
-                last_chart.append({'x': round(float(nday), 2), 'y': round(float(cum), 2)})
-        last_chart.sort(key=lambda p: p['x'])
-
-    future_chart = []
-    if not full_current_month_df.empty and 'day' in full_current_month_df.columns and 'cumulative' in full_current_month_df.columns:
-        cutoff = input_date.normalize()
-        future_slice = full_current_month_df[full_current_month_df['date'] > cutoff]
-        if not current_month_df.empty:
-            last_actual = current_month_df.iloc[-1]
-            future_chart.append({'x': int(last_actual['day']), 'y': round(float(last_actual['cumulative']), 2)})
-        if not future_slice.empty:
-            day_groups = future_slice.groupby('day')['cumulative'].max()
-            for day, cum in day_groups.items():
-                if pd.notna(day) and pd.notna(cum):
-                    future_chart.append({'x': int(day), 'y': round(float(cum), 2)})
-
-    has_category = not current_month_df.empty and 'category_name' in current_month_df.columns
-    categories = []
-    if has_category:
-        grp = current_month_df.groupby('category_name', dropna=False)['amount'].sum().sort_values(ascending=False)
-        for cat, amt in grp.items():
-            name = str(cat) if (cat is not None and str(cat) not in ('nan', 'None', '')) else 'uncategorized'
-            categories.append({'name': name, 'amount': round(float(amt), 2)})
-
-    has_payee = not current_month_df.empty and 'payee' in current_month_df.columns
-    recent_txns = []
-    if not current_month_df.empty:
-        for _, row in current_month_df.sort_values('date', ascending=False).iterrows():
-            txn = {
-                'date': row['date'].strftime('%b %d'),
-                'amount': round(float(row['amount']), 2),
-                'payee': str(row['payee']) if has_payee and pd.notna(row.get('payee')) else '',
-                'category': str(row['category_name']) if has_category and pd.notna(row.get('category_name')) and str(row.get('category_name')) not in ('nan', 'None') else '',
-            }
-            recent_txns.append(txn)
-
-    daily_totals = []
-    if not current_month_df.empty and 'day' in current_month_df.columns:
-        grp = current_month_df.groupby('day')['amount'].sum().reset_index().sort_values('amount', ascending=False)
-        for _, row in grp.iterrows():
-            daily_totals.append({'day': int(row['day']), 'amount': round(float(row['amount']), 2)})
+    if budget is not None:
+        projected_total = this_month_total + budget['remainingTotal']
+
+    # One point per day, read from the same end-of-day arrays as the plot and console output
+    current_chart = _chart_points(_series_x(input_date, series, 'current'), series['current'])
+    last_chart = _chart_points(series['last_x'], series['last'])
+    future_chart = _chart_points(_series_x(input_date, series, 'future'), series['future'])
+
+    if categories is None:
+        categories = category_totals_payload(current_month_df)
+    if transactions is None:
+        transactions = transactions_payload(current_month_df)
+    recent_txns = transactions if max_embedded_transactions is None else transactions[:max_embedded_transactions]
+    if daily_totals is None:
+        daily_totals = daily_totals_payload(current_month_df)
 
     data = {
         'summary': {
@@ -773,67 +1326,306 @@ def generate_html_dashboard(
             'projectedTotal': round(projected_total, 2),
             'date': input_date.strftime('%Y-%m-%d'),
             'monthName': input_date.strftime('%B %Y'),
+            'hasBudget': budget is not None,
+            'hasNetWorth': net_worth is not None,
         },
         'currentMonthChart': current_chart,
         'lastMonthChart': last_chart,
         'futureChart': future_chart,
         'categories': categories,
         'recentTransactions': recent_txns,
+        'transactionCount': len(transactions),
+        'transactionsUrl': transactions_url,
         'dailyTotals': daily_totals,
     }
-
+    if budget is not None:
+        data['summary']['budgetRemainingTotal'] = budget['remainingTotal']
+        data['summary']['budgetRemainingCount'] = budget['remainingCount']
+    if net_worth is not None:
+        data['summary']['netWorth'] = net_worth['current']
+        data['summary']['netWorthCount'] = net_worth['count']
+    return data
+
+def render_dashboard_html(data: dict) -> str:
+    """
+    Embeds dashboard_data() output into the self-contained HTML dashboard.
+    """
     return _DASHBOARD_HTML.replace('__DATA_JSON__', json.dumps(data))
 
+@functools.cache
+def dashboard_shell_html() -> str:
+    """
+    Returns the dashboard page without data: it loads '<date>-dashboard.json' for the
+    ?date=YYYY-MM-DD in its URL and then runs the same script as the inline dashboard.
+    """
+    head, script = _DASHBOARD_HTML.split('const D = __DATA_JSON__;\n')
+    script, tail = script.rsplit('</script>', 1)
+    loader = """(async () => {
+const date = new URLSearchParams(location.search).get('date');
+let D;
+try {
+  const res = await fetch(date + '-dashboard.json');
+  if (!res.ok) throw new Error(res.statusText);
+  D = await res.json();
+} catch (err) {
+  document.body.textContent = 'Could not load the dashboard data for ' + date
+    + ' (open this page with ?date=YYYY-MM-DD, served over http).';
+  return;
+}
+"""
+    # The table headers' onclick handlers need sortTable at global scope
+    return head + loader + script + 'window.sortTable = sortTable;\n})();\n</script>' + tail
 
-# This calculation determines a comparable day in the previous month,
-# scaled by the proportion of the current month that has passed.
-equivalent_days_in_previous_month = math.ceil((input_date.day / input_date.days_in_month) * start_of_previous_month.days_in_month)
+def dashboard_shell_name() -> str:
+    """
+    Returns the shell's file name, versioned by the hash of its content.
+    """
+    return f"dashboard-{hashlib.sha1(dashboard_shell_html().encode('utf-8')).hexdigest()[:12]}.html"
 
-# Ensure equivalent_days_in_previous_month does not exceed the number of days in the previous month
-last_month_days = start_of_previous_month.days_in_month
-if equivalent_days_in_previous_month > last_month_days:
-    equivalent_days_in_previous_month = last_month_days
+def write_split_dashboard(output_dir: str, date_str: str, data: dict) -> list[str]:
+    """
+    Writes one report's dashboard as the shared shell plus a compact data file.
 
-# Default value for cumulative spending last month if no data is available
-cumulative_amount_on_equivalent_day_last_month_val = 0.0
+    The shell (dashboard-<hash>.html) is written once per output folder and never
+    changes under its name, so it can be cached indefinitely; each report adds only
+    '<date>-dashboard.json' and a tiny '<date>-dashboard.html' redirecting to the shell.
+    Like the transactions sidecar, the data file is fetched, so the folder has to be
+    served over http.
 
-if not last_month_df.empty:
-    # Find the nearest available day in the last month that had a payment
-    nearest_day_last_month = find_nearest_available_day(last_month_df, equivalent_days_in_previous_month)
+    Returns:
+        The paths of the shell, the data file and the redirect.
+    """
+    shell_name = dashboard_shell_name()
+    shell_path = os.path.join(output_dir, shell_name)
+    if not os.path.exists(shell_path):
+        # Parallel renders may race to create it; the content is identical either way
+        tmp = f"{shell_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(dashboard_shell_html())
+        os.replace(tmp, shell_path)
+
+    data_path = os.path.join(output_dir, f"{date_str}-dashboard.json")
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+    url = f"{shell_name}?date={date_str}"
+    redirect_path = os.path.join(output_dir, f"{date_str}-dashboard.html")
+    with open(redirect_path, 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><meta charset="utf-8"><meta http-equiv="refresh" content="0; url={url}">'
+                f'<a href="{url}">Spending dashboard {date_str}</a>\n')
+    return [shell_path, data_path, redirect_path]
+
+def write_precompressed(path: str, keep_existing: bool = False) -> list[str]:
+    """
+    Writes path.gz and, if the optional brotli package is installed, path.br next to path.
 
-    if nearest_day_last_month is not None:
-        # Find the cumulative amount on the equivalent or nearest available day in the last month
-        cumulative_amount_series = last_month_df.loc[last_month_df['day'] == nearest_day_last_month, 'cumulative']
+    With keep_existing, variants that already exist are not recompressed (for files whose
+    name changes with their content, like the dashboard shell).
+
+    Returns:
+        The paths of the variants.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    # mtime=0 keeps unchanged files' .gz byte-identical
+    variants = [(f"{path}.gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((f"{path}.br", brotli.compress))
+    for variant_path, compress in variants:
+        if keep_existing and os.path.exists(variant_path):
+            continue
+        with open(variant_path, 'wb') as f:
+            f.write(compress(content))
+    return [variant_path for variant_path, _ in variants]
+
+def generate_html_dashboard(
+    input_date: pd.Timestamp,
+    this_month_total: float,
+    cumulative_amount_on_equivalent_day_last_month_val: float,
+    last_month_total_end: float,
+    diff: float,
+    percent_diff: float,
+    current_month_df: pd.DataFrame,
+    series: dict,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    transactions: list[dict] | None = None,
+    transactions_url: str | None = None,
+    categories: list[dict] | None = None,
+    daily_totals: list[dict] | None = None,
+    budget: dict | None = None,
+    net_worth: dict | None = None,
+    **_comparison_extras,
+) -> str:
+    """
+    Renders the self-contained HTML dashboard for one report.
+
+    Takes the same arguments as dashboard_data.
+    """
+    return render_dashboard_html(dashboard_data(
+        input_date, this_month_total, cumulative_amount_on_equivalent_day_last_month_val, last_month_total_end,
+        diff, percent_diff, current_month_df, series, max_embedded_transactions=max_embedded_transactions,
+        transactions=transactions, transactions_url=transactions_url, categories=categories, daily_totals=daily_totals,
+        budget=budget, net_worth=net_worth,
+    ))
+
+
+def equivalent_days(input_date: pd.Timestamp, month_lengths: np.ndarray) -> np.ndarray:
+    """
+    Maps input_date's day onto months of the given lengths, proportionally to how much of its month has passed.
+
+    Args:
+        input_date: The reference date of the report.
+        month_lengths: Number of days in each month to compare against.
+
+    Returns:
+        The 1-based comparable day in each month, never past that month's last day.
+    """
+    return np.minimum(np.ceil((input_date.day / input_date.days_in_month) * month_lengths).astype(np.int64), month_lengths)
+
+def compute_comparison(input_date: pd.Timestamp, series: dict) -> dict:
+    """
+    Compares spending so far this month against the equivalent point of the previous month.
+
+    Args:
+        input_date: The reference date of the report.
+        series: Daily arrays from build_daily_series.
+
+    Returns:
+        A dict with this_month_total, equivalent_day_last_month, cumulative_amount_on_equivalent_day_last_month_val,
+        last_month_total_end, diff and percent_diff.
+    """
+    last = series['last']
+
+    # This calculation determines a comparable day in the previous month,
+    # scaled by the proportion of the current month that has passed.
+    equivalent_days_in_previous_month = int(equivalent_days(input_date, np.array([len(last)]))[0])
+
+    # End-of-day cumulative spend on the equivalent day (forward-filled over days without transactions)
+    cumulative_amount_on_equivalent_day_last_month_val = float(last[equivalent_days_in_previous_month - 1])
+
+    this_month_total = round(float(series['current'][-1]), 2)
+    diff = this_month_total - cumulative_amount_on_equivalent_day_last_month_val
+    diff = round(diff, 2)
+
+    # Calculate percentage difference
+    percent_diff = 0.0
+    if cumulative_amount_on_equivalent_day_last_month_val > 0:
+        percent_diff = (diff / cumulative_amount_on_equivalent_day_last_month_val) * 100
+
+    # Get total spending for the entire last month
+    last_month_total_end = float(last[-1])
+
+    return {
+        'this_month_total': this_month_total,
+        'equivalent_day_last_month': equivalent_days_in_previous_month,
+        'cumulative_amount_on_equivalent_day_last_month_val': cumulative_amount_on_equivalent_day_last_month_val,
+        'last_month_total_end': last_month_total_end,
+        'diff': diff,
+        'percent_diff': percent_diff,
+    }
+
+MAX_DAYS_IN_MONTH = 31
+# Baselines always include the same month last year, so history reaches back at least this far
+SAME_MONTH_LAST_YEAR = 12
+
+def baseline_history_start(input_date: pd.Timestamp, n_months: int) -> pd.Timestamp:
+    """
+    Returns the first day of the oldest month compute_baselines needs for n_months of history.
+    """
+    return input_date.normalize().replace(day=1) - pd.DateOffset(months=max(n_months, SAME_MONTH_LAST_YEAR))
+
+def month_day_matrix(df: pd.DataFrame, first_month: pd.Timestamp, n_months: int) -> np.ndarray:
+    """
+    Reduces transactions to a months x days matrix of end-of-day cumulative spend.
+
+    Row i is the month i months after first_month and column j is day j + 1, with the
+    same forward-filled totals as daily_cumulative. Days a month does not have are NaN.
+
+    Args:
+        df: Transactions; rows outside the n_months starting at first_month are ignored.
+        first_month: Any Timestamp in the first month (only its year and month are used).
+        n_months: Number of consecutive months (rows).
+
+    Returns:
+        A float64 array of shape (n_months, 31).
+    """
+    daily = np.zeros(n_months * MAX_DAYS_IN_MONTH)
+    if not df.empty:
+        dates = df['date'].dt
+        month_index = ((dates.year - first_month.year) * 12 + dates.month - first_month.month).to_numpy()
+        in_range = (month_index >= 0) & (month_index < n_months)
+        daily = np.bincount(
+            month_index[in_range] * MAX_DAYS_IN_MONTH + dates.day.to_numpy()[in_range] - 1,
+            weights=df['amount'].to_numpy(dtype=np.float64)[in_range],
+            minlength=n_months * MAX_DAYS_IN_MONTH,
+        )
+    matrix = np.cumsum(daily.reshape(n_months, MAX_DAYS_IN_MONTH), axis=1)
+    lengths = pd.date_range(first_month.replace(day=1).normalize(), periods=n_months, freq='MS').days_in_month.to_numpy()
+    matrix[np.arange(MAX_DAYS_IN_MONTH) >= lengths[:, None]] = np.nan
+    return matrix
+
+def compute_baselines(input_date: pd.Timestamp, df: pd.DataFrame, n_months: int) -> dict:
+    """
+    Compares spending so far this month against several baselines at once.
+
+    Every month is a row of one month_day_matrix, and the proportional equivalent day of
+    each is found with a single array lookup, so extra baselines cost almost nothing.
+
+    Args:
+        input_date: The reference date of the report.
+        df: Transactions from baseline_history_start(input_date, n_months) through input_date's month.
+        n_months: Number of preceding months to compare against individually and to average.
+
+    Returns:
+        A dict with current (spend up to input_date), previous_months (the last n_months, most
+        recent first), same_month_last_year and trailing_average. Each baseline holds month,
+        equivalent_day, amount (spend up to the equivalent day), total, diff and percent_diff.
+    """
+    n_rows = max(n_months, SAME_MONTH_LAST_YEAR) + 1
+    first_month = baseline_history_start(input_date, n_months)
+    matrix = month_day_matrix(df, first_month, n_rows)
+    months = pd.date_range(first_month, periods=n_rows, freq='MS')
+    lengths = months.days_in_month.to_numpy()
+    eq_days = equivalent_days(input_date, lengths)
+    rows = np.arange(n_rows)
+    amounts = matrix[rows, eq_days - 1]
+    totals = matrix[rows, lengths - 1]
+    current = float(matrix[-1, input_date.day - 1])
+    diffs = current - amounts
+    percent_diffs = np.divide(diffs * 100, amounts, out=np.zeros(n_rows), where=amounts > 0)
+
+    def baseline(i: int, label: str) -> dict:
+        return {
+            'month': label,
+            'equivalent_day': int(eq_days[i]),
+            'amount': round(float(amounts[i]), 2),
+            'total': round(float(totals[i]), 2),
+            'diff': round(float(diffs[i]), 2),
+            'percent_diff': float(percent_diffs[i]),
+        }
+
+    previous = rows[-2:-n_months - 2:-1]
+    average_amount = float(amounts[previous].mean()) if n_months else 0.0
+    average_diff = current - average_amount
+    return {
+        'current': round(current, 2),
+        'previous_months': [baseline(i, months[i].strftime('%Y-%m')) for i in previous],
+        'same_month_last_year': baseline(n_rows - 1 - SAME_MONTH_LAST_YEAR, months[-1 - SAME_MONTH_LAST_YEAR].strftime('%Y-%m')),
+        'trailing_average': {
+            'month': f"{n_months}-month average",
+            'equivalent_day': None,
+            'amount': round(average_amount, 2),
+            'total': round(float(totals[previous].mean()), 2) if n_months else 0.0,
+            'diff': round(average_diff, 2),
+            'percent_diff': average_diff / average_amount * 100 if average_amount > 0 else 0.0,
+        },
+    }
 
-        if not cumulative_amount_series.empty:
-            # Take the latest cumulative amount for that day
-            cumulative_amount_on_equivalent_day_last_month_val = cumulative_amount_series.iloc[-1]
-        else:
-            # Fallback if specific day had no transactions (e.g. if find_nearest_available_day logic changes)
-            # This part might need adjustment based on how find_nearest_available_day handles no data for target.
-            # For now, assumes find_nearest_available_day returns a day that *has* data.
-            # If not, we might need to iterate backwards from nearest_day_last_month.
-            pass # Handled by initialization
-    # else: No suitable day found in last_month_df, use default 0.0
-else:
-    # last_month_df is empty, so no transactions last month.
-    # cumulative_amount_on_equivalent_day_last_month_val remains 0.0
-    pass
-
-this_month_total = current_month_df['cumulative'].max() if not current_month_df.empty else 0
-this_month_total = round(this_month_total, 2)
-diff = this_month_total - cumulative_amount_on_equivalent_day_last_month_val
-diff = round(diff, 2)
-
-# Calculate percentage difference
-percent_diff = 0.0
-if cumulative_amount_on_equivalent_day_last_month_val > 0:
-    percent_diff = (diff / cumulative_amount_on_equivalent_day_last_month_val) * 100
-
-# Get total spending for the entire last month
-last_month_total_end = last_month_df['cumulative'].iloc[-1] if not last_month_df.empty else 0.0
-
-# Prepare Console Output
 # ANSI Color Codes
 GREEN = '\033[92m'
 RED = '\033[91m'
@@ -841,191 +1633,580 @@ BOLD = '\033[1m'
 CYAN = '\033[96m'
 RESET = '\033[0m'
 
-diff_color = RED if diff > 0 else GREEN
-diff_sign = "+" if diff > 0 else ""
-
-console_output = (
-    f"\n{BOLD}{CYAN}--- Spending Comparison ({input_date.strftime('%Y-%m-%d')}) ---{RESET}\n"
-    f"{BOLD}Current Month:{RESET}         ${this_month_total:,.2f}\n"
-    f"{BOLD}Last Month (Same Day):{RESET} ${cumulative_amount_on_equivalent_day_last_month_val:,.2f}\n"
-    f"{BOLD}Difference:{RESET}            {diff_color}${diff:+,.2f} ({percent_diff:+.1f}%){RESET}\n"
-    f"{BOLD}Last Month Total:{RESET}      ${last_month_total_end:,.2f}\n"
-    f"{CYAN}-------------------------------------------{RESET}"
-)
-print(console_output)
-
-# Prepare Plot Summary Text (Keep it concise)
-comparison_summary_text = "NaN"
-if (diff > 0):
-    comparison_summary_text = f"Spending this month: ${this_month_total:,.2f}\n${abs(diff):,.2f} more than last month ({percent_diff:+.1f}%)"
-elif (diff < 0):
-    comparison_summary_text = f"Spending this month: ${this_month_total:,.2f}\n${abs(diff):,.2f} less than last month ({percent_diff:+.1f}%)"
-else:
-    comparison_summary_text = f"Spending this month: ${this_month_total:,.2f}\nSame as last month"
-
-# Set professional dark theme styling
-plt.style.use("dark_background")
-
-# Plotting
-fig, ax = plt.subplots(figsize=(12, 8), facecolor='#1a1a1a') # Increased height slightly
-ax.set_facecolor('#1a1a1a')
-
-# Move summary text to a dedicated area below the title (subtitle style)
-# Adjust subplot params to make room at the top
-plt.subplots_adjust(top=0.82)
-
-# Main Title
-fig.suptitle('Cumulative Spending Comparison', fontsize=20, color='#ffffff', fontweight='bold', y=0.96)
-
-# Subtitle (Summary Text)
-fig.text(0.5, 0.89, comparison_summary_text, fontsize=12, ha='center', va='top',
-         color='#e0e0e0', family='monospace', fontweight='bold')
-
-# Colors
-color_last_month = '#00f2fe' # Cyan/Blue
-color_current_month = '#43e97b' # Green/Teal
-color_projected = '#43e97b'
-
-# Calculate days in months for normalization
-days_in_current_month = start_of_this_month.days_in_month
-days_in_prev_month = start_of_previous_month.days_in_month
-
-# Normalize 'day' for plotting
-if not last_month_df.empty:
-    # Scale the previous month's days to match the current month's length
-    last_month_df['normalized_day'] = last_month_df['day'] * (days_in_current_month / days_in_prev_month)
-else:
-    last_month_df['normalized_day'] = None
-
-if not current_month_df.empty:
-    # Current month days are already correct relative to the x-axis
-    current_month_df['normalized_day'] = current_month_df['day']
-else:
-    current_month_df['normalized_day'] = None
-
-# Plot the cumulative spending for last month, if data exists
-if not last_month_df.empty and 'normalized_day' in last_month_df.columns and 'cumulative' in last_month_df.columns:
-    ax.plot(last_month_df['normalized_day'], last_month_df['cumulative'], marker='o', label='Last Month',
-            linestyle='-', color=color_last_month, linewidth=2, markersize=5, markerfacecolor=color_last_month,
-            markeredgecolor='#ffffff', markeredgewidth=0.5, alpha=0.8)
-    # Add fill
-    ax.fill_between(last_month_df['normalized_day'], last_month_df['cumulative'], color=color_last_month, alpha=0.1)
-    
-    # Annotation for last point
-    last_val = last_month_df['cumulative'].iloc[-1]
-    last_day = last_month_df['normalized_day'].iloc[-1]
-    ax.annotate(f'${last_val:,.0f}', xy=(last_day, last_val), xytext=(5, 0), textcoords='offset points',
-                color=color_last_month, fontsize=9, fontweight='bold', va='center')
-
-# Plot the cumulative spending for current month, if data exists
-if not current_month_df.empty and 'normalized_day' in current_month_df.columns and 'cumulative' in current_month_df.columns:
-    # Filter out any invalid days (e.g. day 0 or NaN) that might have crept in
-    plot_df = current_month_df[current_month_df['normalized_day'] >= 1]
-    
-    if not plot_df.empty:
-        ax.plot(plot_df['normalized_day'], plot_df['cumulative'], marker='o', label='Current Month',
-                linestyle='-', color=color_current_month, linewidth=3, markersize=7, markerfacecolor=color_current_month,
-                markeredgecolor='#ffffff', markeredgewidth=1.5, zorder=5) # Higher zorder to stay on top
-        # Add fill
-        ax.fill_between(plot_df['normalized_day'], plot_df['cumulative'], color=color_current_month, alpha=0.2)
-
-        # Annotation for last point
-        last_val = plot_df['cumulative'].iloc[-1]
-        last_day = plot_df['normalized_day'].iloc[-1]
-        ax.annotate(f'${last_val:,.0f}', xy=(last_day, last_val), xytext=(5, 5), textcoords='offset points',
-                    color=color_current_month, fontsize=10, fontweight='bold', va='bottom',
-                    bbox=dict(facecolor='#1a1a1a', edgecolor='none', alpha=0.7, pad=1))
-
-# Determine if we should show future spending (only if looking at a past date)
-# We compare normalized dates to ignore time components
-show_future_spending = input_date.normalize() < pd.Timestamp.now().normalize()
-
-# Plot future spending for the rest of the month (faded line)
-if show_future_spending and not full_current_month_df.empty and 'day' in full_current_month_df.columns and 'cumulative' in full_current_month_df.columns:
-    projected_line_df = full_current_month_df[full_current_month_df['date'] >= input_date.replace(hour=0, minute=0, second=0, microsecond=0)]
-    if not projected_line_df.empty:
-        plot_df_for_projection = projected_line_df
-
-        # Connect lines logic (same as before)
-        if not current_month_df.empty and not current_month_df[current_month_df['date'].dt.date == input_date.date()].empty:
-            last_actual_day_data = current_month_df[current_month_df['date'].dt.date == input_date.date()].iloc[-1]
-            if not projected_line_df[projected_line_df['day'] == input_date.day].empty:
-                 projected_line_df.loc[projected_line_df['day'] == input_date.day, 'cumulative'] = last_actual_day_data['cumulative']
+def format_console_summary(input_date: pd.Timestamp, comparison: dict) -> str:
+    """
+    Formats the comparison as a colored block of text for the terminal.
+    """
+    diff = comparison['diff']
+    diff_color = RED if diff > 0 else GREEN
+    return (
+        f"\n{BOLD}{CYAN}--- Spending Comparison ({input_date.strftime('%Y-%m-%d')}) ---{RESET}\n"
+        f"{BOLD}Current Month:{RESET}         ${comparison['this_month_total']:,.2f}\n"
+        f"{BOLD}Last Month (Same Day):{RESET} ${comparison['cumulative_amount_on_equivalent_day_last_month_val']:,.2f}\n"
+        f"{BOLD}Difference:{RESET}            {diff_color}${diff:+,.2f} ({comparison['percent_diff']:+.1f}%){RESET}\n"
+        f"{BOLD}Last Month Total:{RESET}      ${comparison['last_month_total_end']:,.2f}\n"
+        f"{CYAN}-------------------------------------------{RESET}"
+    )
+
+def format_net_worth_summary(net_worth: dict) -> str:
+    """
+    Formats compute_net_worth() output as a line for the terminal.
+    """
+    count = net_worth['count']
+    return f"{BOLD}Net Worth:{RESET}             ${net_worth['current']:,.2f} ({count} account{'' if count == 1 else 's'})"
+
+def format_baselines_summary(baselines: dict) -> str:
+    """
+    Formats compute_baselines() output as a table for the terminal.
+    """
+    lines = [f"{BOLD}{'Baseline':<20}{'Same Point':>12}{'Month Total':>13}{'Difference':>22}{RESET}"]
+    entries = [*baselines['previous_months'], baselines['same_month_last_year'], baselines['trailing_average']]
+    labels = [b['month'] for b in baselines['previous_months']] + ['Same month last year', baselines['trailing_average']['month']]
+    for label, b in zip(labels, entries):
+        diff_color = RED if b['diff'] > 0 else GREEN
+        change = f"${b['diff']:+,.2f} ({b['percent_diff']:+.1f}%)"
+        lines.append(f"{label:<20}{'$' + format(b['amount'], ',.2f'):>12}{'$' + format(b['total'], ',.2f'):>13}"
+                     f"{diff_color}{change:>22}{RESET}")
+    lines.append(f"{CYAN}{'-' * 67}{RESET}")
+    return '\n'.join(lines)
+
+def format_plot_summary_text(comparison: dict) -> str:
+    """
+    Formats the concise comparison shown as the plot's subtitle.
+    """
+    this_month_total = comparison['this_month_total']
+    diff = comparison['diff']
+    percent_diff = comparison['percent_diff']
+    if (diff > 0):
+        return f"Spending this month: ${this_month_total:,.2f}\n${abs(diff):,.2f} more than last month ({percent_diff:+.1f}%)"
+    elif (diff < 0):
+        return f"Spending this month: ${this_month_total:,.2f}\n${abs(diff):,.2f} less than last month ({percent_diff:+.1f}%)"
+    return f"Spending this month: ${this_month_total:,.2f}\nSame as last month"
+
+def shows_future_spending(input_date: pd.Timestamp) -> bool:
+    """
+    Future spending only makes sense on the chart when looking at a past date (compared without time components).
+    """
+    return input_date.normalize() < pd.Timestamp.now().normalize()
+
+def render_digest(*parts) -> str:
+    """
+    Hashes the inputs of a rendered file: arrays by their values to the cent, anything else as JSON.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.round(np.asarray(part, dtype=np.float64), 2).tobytes())
+        elif isinstance(part, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(part, index=False).values.tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _render_manifest_path(output_dir: str, date_str: str) -> str:
+    return os.path.join(output_dir, RENDER_CACHE_DIR, f"{date_str}.json")
+
+def load_render_manifest(output_dir: str, date_str: str) -> dict:
+    try:
+        with open(_render_manifest_path(output_dir, date_str), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_manifest(output_dir: str, date_str: str, manifest: dict) -> None:
+    path = _render_manifest_path(output_dir, date_str)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+def _is_current(manifest: dict, artifact: str, digest: str, output_dir: str) -> bool:
+    entry = manifest.get(artifact)
+    return (entry is not None and entry.get('digest') == digest
+            and all(os.path.exists(os.path.join(output_dir, name)) for name in entry.get('files', [])))
+
+def render_comparison_chart(
+    path: str,
+    input_date: pd.Timestamp,
+    comparison: dict,
+    series: dict,
+) -> None:
+    """
+    Plots cumulative spending for both months (plus future spending, for past dates) and
+    saves it as a PNG or SVG, depending on path's extension.
+
+    The chart module (and with it matplotlib) is imported here so runs that skip the chart
+    never load it; each thread reuses one styled figure across renders.
+    """
+    from chart import shared_chart
+
+    future_x = future_y = None
+    if shows_future_spending(input_date):
+        # The future series starts at input_date's own total, so it joins the current line
+        future_y = series['future']
+        future_x = _series_x(input_date, series, 'future')
+
+    chart = shared_chart()
+    chart.update(format_plot_summary_text(comparison), series['last_x'], series['last'], series['current'],
+                 future_x, future_y, current_x=_series_x(input_date, series, 'current'))
+    chart.save(path)
+
+def write_report_files(
+    input_date: pd.Timestamp,
+    comparison: dict,
+    current_month_df: pd.DataFrame,
+    series: dict,
+    png: bool = True,
+    html: bool = True,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    categories: list[dict] | None = None,
+    daily_totals: list[dict] | None = None,
+    output_dir: str = '',
+    chart_format: str = 'png',
+    reuse_unchanged: bool = True,
+    html_mode: str = 'inline',
+    precompress: bool = False,
+    max_chart_points: int | None = None,
+    budget: dict | None = None,
+    net_worth: dict | None = None,
+) -> list[str]:
+    """
+    Renders the chart (a PNG, or an SVG with chart_format='svg') and/or HTML dashboard for one report date.
+
+    With html_mode='split', the dashboard is written as write_split_dashboard describes
+    instead of as one self-contained page. precompress also writes .gz (and, when the
+    brotli package is installed, .br) copies of every dashboard file, for static hosting.
+    max_chart_points caps the points drawn per line in both the chart and the dashboard
+    (see downsample_series); the comparison figures are unaffected.
+
+    When the month has more than max_embedded_transactions transactions, the dashboard
+    embeds only the most recent ones and the full list is written to a sidecar
+    '<date>-transactions.json' that the page loads on demand. categories and
+    daily_totals may be passed precomputed, as for dashboard_data, and budget (the
+    month's compute_budget_summary) makes the dashboard's projection budget-aware; net_worth
+    (compute_net_worth's result) adds the accounts' net worth. Files are written
+    to output_dir (the working directory by default).
+
+    With reuse_unchanged, a file whose inputs (series, totals, transactions, ...) hash
+    the same as when it was last written, and which still exists, is left as is;
+    skipping the chart also skips importing matplotlib.
+
+    Returns:
+        The paths of the report's files, whether written now or reused.
+    """
+    date_str = input_date.strftime('%Y-%m-%d')
+    paths = []
+    series = downsample_series(input_date, series, max_chart_points)
+    manifest = load_render_manifest(output_dir, date_str) if reuse_unchanged else {}
+    changed = False
+    if png:
+        chart_name = f"{date_str}-cumulative_spending_comparison.{chart_format}"
+        chart_path = os.path.join(output_dir, chart_name)
+        chart_digest = render_digest('chart', CHART_VERSION, date_str, chart_format, comparison,
+                                     shows_future_spending(input_date), max_chart_points,
+                                     series['current'], series['future'], series['last_x'], series['last'])
+        if not _is_current(manifest, 'chart', chart_digest, output_dir):
+            with stage('plot'):
+                render_comparison_chart(chart_path, input_date, comparison, series)
+            manifest['chart'] = {'digest': chart_digest, 'files': [chart_name]}
+            changed = True
+        paths.append(chart_path)
+
+    html_digest = None
+    if html:
+        html_digest = render_digest('html', hashlib.sha1(_DASHBOARD_HTML.encode('utf-8')).hexdigest(), html_mode,
+                                    precompress, max_chart_points, date_str,
+                                    comparison, max_embedded_transactions, categories, daily_totals, budget,
+                                    net_worth, series['current'], series['future'], series['last_x'], series['last'],
+                                    current_month_df)
+        if _is_current(manifest, 'html', html_digest, output_dir):
+            paths.extend(os.path.join(output_dir, name) for name in manifest['html']['files'])
+            html = False
+
+    if html:
+        with stage('html'):
+            html_files = []
+            transactions = transactions_payload(current_month_df)
+            transactions_url = None
+            if max_embedded_transactions is not None and len(transactions) > max_embedded_transactions:
+                # Relative to the dashboard, which sits next to it
+                transactions_url = f"{date_str}-transactions.json"
+                transactions_path = os.path.join(output_dir, transactions_url)
+                with open(transactions_path, 'w', encoding='utf-8') as f:
+                    json.dump(transactions, f, separators=(',', ':'))
+                html_files.append(transactions_path)
+
+            data = dashboard_data(
+                input_date=input_date,
+                current_month_df=current_month_df,
+                series=series,
+                max_embedded_transactions=max_embedded_transactions,
+                transactions=transactions,
+                transactions_url=transactions_url,
+                categories=categories,
+                daily_totals=daily_totals,
+                budget=budget,
+                net_worth=net_worth,
+                **comparison,
+            )
+            if html_mode == 'split':
+                html_files.extend(write_split_dashboard(output_dir, date_str, data))
             else:
-                point_to_add = pd.DataFrame([{
-                    'date': last_actual_day_data['date'],
-                    'day': last_actual_day_data['day'],
-                    'cumulative': last_actual_day_data['cumulative'],
-                    'amount': 0,
-                    'exclude_from_totals': False,
-                    'is_income': False
-                }])
-                plot_df_for_projection = pd.concat([point_to_add, projected_line_df], ignore_index=True).sort_values(by='day').drop_duplicates(subset=['day'], keep='first')
-
-        # Filter out any invalid days
-        plot_df_for_projection = plot_df_for_projection[plot_df_for_projection['day'] >= 1]
-
-        ax.plot(plot_df_for_projection['day'], plot_df_for_projection['cumulative'], marker='', label='Future Spending',
-            linestyle='--', color=color_projected, alpha=0.5, linewidth=2)
-        
-        # Annotation for projected end
-        last_val = plot_df_for_projection['cumulative'].iloc[-1]
-        last_day = plot_df_for_projection['day'].iloc[-1]
-        ax.annotate(f'Future: ${last_val:,.0f}', xy=(last_day, last_val), xytext=(5, 0), textcoords='offset points',
-                    color=color_projected, fontsize=9, alpha=0.7, va='center')
-
-
-# Professional styling for axes and labels
-ax.set_xlabel('Day of the Month', fontsize=12, color='#cccccc', fontweight='500', labelpad=10)
-ax.set_ylabel('Cumulative Amount Spent ($)', fontsize=12, color='#cccccc', fontweight='500', labelpad=10)
-# ax.set_title removed in favor of fig.suptitle
-
-# Grid styling
-ax.grid(True, linestyle=':', alpha=0.4, color='#666666') # Dotted grid
-ax.set_axisbelow(True)
-
-# Axis styling
-ax.tick_params(colors='#cccccc', labelsize=10)
-ax.spines['top'].set_visible(False)
-ax.spines['right'].set_visible(False)
-ax.spines['bottom'].set_color('#404040')
-ax.spines['left'].set_color('#404040')
-
-# Ensure x-axis covers the full month for context
-ax.set_xlim(1, 31)
-
-# Legend styling
-legend = ax.legend(loc='upper left', frameon=True, facecolor='#2d2d2d',
-                  edgecolor='#404040', labelcolor='#ffffff', fontsize=10)
-legend.get_frame().set_boxstyle('round,pad=0.3')
-
-# Format y-axis to show dollar amounts
-def currency_formatter(x, p):
-    return f'${x:,.0f}'
-ax.yaxis.set_major_formatter(FuncFormatter(currency_formatter))
-
-# plt.tight_layout() # Removed in favor of manual subplots_adjust for title/subtitle control
-
-# Save the plot as a PNG file
-plt.savefig(f"{input_date.strftime('%Y-%m-%d')}-cumulative_spending_comparison.png",
-            facecolor='#1a1a1a', dpi=120, bbox_inches='tight')
-
-# Close the plot
-plt.close()
-
-# Save the HTML dashboard
-html_content = generate_html_dashboard(
-    input_date=input_date,
-    this_month_total=this_month_total,
-    cumulative_amount_on_equivalent_day_last_month_val=cumulative_amount_on_equivalent_day_last_month_val,
-    last_month_total_end=last_month_total_end,
-    diff=diff,
-    percent_diff=percent_diff,
-    current_month_df=current_month_df,
-    last_month_df=last_month_df,
-    full_current_month_df=full_current_month_df,
-)
-html_path = f"{input_date.strftime('%Y-%m-%d')}-dashboard.html"
-with open(html_path, 'w', encoding='utf-8') as f:
-    f.write(html_content)
-print(f"Dashboard saved: {html_path}")
+                # Save the self-contained HTML dashboard
+                html_path = os.path.join(output_dir, f"{date_str}-dashboard.html")
+                with open(html_path, 'w', encoding='utf-8') as f:
+                    f.write(render_dashboard_html(data))
+                html_files.append(html_path)
+            if precompress:
+                shell_name = dashboard_shell_name()
+                html_files.extend(variant for path in list(html_files) for variant in
+                                  write_precompressed(path, keep_existing=os.path.basename(path) == shell_name))
+            paths.extend(html_files)
+            manifest['html'] = {'digest': html_digest, 'files': [os.path.basename(path) for path in html_files]}
+            changed = True
+
+    if reuse_unchanged and changed:
+        save_render_manifest(output_dir, date_str, manifest)
+    return paths
+
+def run_backfill(
+    from_date: pd.Timestamp,
+    to_date: pd.Timestamp,
+    client: 'LunchMoneyClient',
+    cache: TransactionCache | None = None,
+    refresh: bool = False,
+    png: bool = True,
+    html: bool = True,
+    workers: int | None = None,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    chart_format: str = 'png',
+    reuse_unchanged: bool = True,
+    html_mode: str = 'inline',
+    precompress: bool = False,
+    max_chart_points: int | None = None,
+) -> list[str]:
+    """
+    Generates the report for every day from from_date to to_date out of one fetched dataset.
+
+    The covering range is fetched once; every day's comparison is computed from that
+    shared frame, and the PNG/HTML rendering is spread across a process pool.
+
+    Args:
+        from_date: Date of the first report.
+        to_date: Date of the last report (inclusive).
+        client: The shared Lunch Money API client.
+        cache: Optional local transaction cache to serve unchanged months from.
+        refresh: Bypass (and repopulate) the cache.
+        png: Render the PNG charts.
+        html: Write the HTML dashboards.
+        workers: Size of the rendering process pool (defaults to the number of CPUs).
+        max_embedded_transactions: Cap on transactions embedded in each dashboard (None embeds all).
+        chart_format: 'png' or 'svg'.
+        reuse_unchanged: Keep files whose inputs have not changed since they were written.
+        html_mode: 'inline' for self-contained dashboards, 'split' for one shared shell plus a data file per day.
+        precompress: Also write .gz/.br copies of the dashboard files.
+        max_chart_points: Cap on the points drawn per chart line (None draws every day).
+
+    Returns:
+        The paths of every report file, in date order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    all_transactions_df, budgets = fetch_with_budgets(
+        lambda: fetch_transactions_for_ranges([report_fetch_range(from_date, to_date)], client, cache=cache, refresh=refresh),
+        from_date, to_date, client, cache=cache, refresh=refresh,
+    )
+
+    jobs = []
+    for input_date in pd.date_range(from_date.normalize(), to_date.normalize(), freq='D'):
+        with stage('aggregate'):
+            current_month_df, last_month_df, full_current_month_df = build_report_frames(all_transactions_df, input_date)
+            series = build_daily_series(input_date, current_month_df, last_month_df, full_current_month_df)
+            comparison = compute_comparison(input_date, series)
+        print(format_console_summary(input_date, comparison))
+        jobs.append(((input_date, comparison, current_month_df, series), report_budget(budgets, input_date, current_month_df)))
+
+    if not (png or html) or not jobs:
+        return []
+    # Worker processes do not report their plot/html stages, so the pool is timed as a whole
+    with stage('render'), ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(write_report_files, *job, png=png, html=html, max_embedded_transactions=max_embedded_transactions,
+                            chart_format=chart_format, reuse_unchanged=reuse_unchanged,
+                            html_mode=html_mode, precompress=precompress, max_chart_points=max_chart_points,
+                            budget=budget)
+            for job, budget in jobs
+        ]
+        return [path for future in futures for path in future.result()]
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line interface of the report.
+    """
+    from lunchmoney_client import DEFAULT_MAX_RETRIES, DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT
+    from multi_account import DEFAULT_MAX_CONCURRENCY
+
+    # Create an ArgumentParser object
+    parser = argparse.ArgumentParser(description="Compare spending with the previous month.")
+    # Add an optional argument --date (or -d) that accepts a string
+    parser.add_argument("--date", "-d", type=str, help="Specify a date in YYYY-MM-DD format.")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached transactions and refetch every month from the API.")
+    parser.add_argument("--cache-path", type=str, default=DEFAULT_CACHE_PATH, help="Location of the local transaction cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the local transaction cache.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT[1], help="Seconds to wait for an API response.")
+    parser.add_argument("--rate-limit", type=float,
+                        help="Send at most this many API requests per second per account (unlimited by default).")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Retry throttled (429) and transient 5xx/connection failures this many times.")
+    parser.add_argument("--record", type=str, metavar="DIR",
+                        help="Save every API response (gzipped, keyed by endpoint and parameters) to DIR.")
+    parser.add_argument("--replay", type=str, metavar="DIR",
+                        help="Serve API responses from a --record directory instead of the network.")
+    parser.add_argument("--no-png", action="store_true", help="Skip rendering the chart (matplotlib is not loaded).")
+    parser.add_argument("--chart-format", choices=('png', 'svg'), default='png', help="File format of the chart.")
+    parser.add_argument("--html-mode", choices=('inline', 'split'), default='inline',
+                        help="'split' writes one shared dashboard shell and a small JSON data file per report.")
+    parser.add_argument("--precompress", action="store_true",
+                        help="Also write .gz (and .br, with brotli installed) copies of the dashboard files.")
+    parser.add_argument("--max-chart-points", type=int, metavar="N",
+                        help="Draw at most N points per chart line, keeping its shape (every point by default).")
+    parser.add_argument("--force-render", action="store_true",
+                        help="Rewrite the chart and dashboard even when their inputs have not changed since the last run.")
+    parser.add_argument("--no-html", action="store_true", help="Skip writing the HTML dashboard.")
+    parser.add_argument("--max-embedded-transactions", type=int, default=DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+                        help="Embed at most this many transactions in the HTML; the rest go to a sidecar JSON file (-1 embeds all).")
+    parser.add_argument("--from", dest="from_date", type=str, help="Backfill: first report date (YYYY-MM-DD).")
+    parser.add_argument("--to", dest="to_date", type=str, help="Backfill: last report date (YYYY-MM-DD), defaults to today.")
+    parser.add_argument("--workers", type=int, help="Backfill and accounts: number of rendering processes (defaults to the CPU count).")
+    parser.add_argument("--baselines", type=int, default=0, metavar="N",
+                        help="Also compare against each of the last N months, the same month last year and their average.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running, polling for new transactions and re-rendering when the numbers change.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help=f"Watch: seconds between polls (default {DEFAULT_WATCH_INTERVAL}).")
+    parser.add_argument("--accounts", type=str,
+                        help="Run the report for every account in this JSON file (see multi_account.py) instead of .env's.")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Accounts: API requests in flight across all accounts.")
+    parser.add_argument("--per-account-concurrency", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Accounts: API requests in flight for any one account.")
+    parser.add_argument("--summary-out", type=str, help="Accounts: write the per-account timings and errors to this JSON file.")
+    parser.add_argument("--profile", action="store_true", help="Print how long each stage of the run took.")
+    parser.add_argument("--profile-out", type=str, help="Write the stage timings (and cProfile hotspots) to this JSON file.")
+    parser.add_argument("--cprofile", type=str, help="Profile the run with cProfile and dump the stats to this file.")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also track peak memory per stage, the largest allocation sites and DataFrame sizes (slower).")
+    return parser
+
+def parse_input_date(value: str | None) -> pd.Timestamp:
+    """
+    Parses the --date argument, defaulting to today. Exits on an invalid date.
+    """
+    if not value:
+        return pd.to_datetime('today')
+    try:
+        return pd.to_datetime(value)
+    except ValueError:
+        print("Error: Invalid date format. Please use YYYY-MM-DD.")
+        sys.exit(1)
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command line entry point: fetches transactions, prints the comparison and writes the report files.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.from_date and args.date:
+        parser.error("--date cannot be combined with --from/--to")
+    if args.to_date and not args.from_date:
+        parser.error("--to requires --from")
+    if args.watch and (args.date or args.from_date):
+        parser.error("--watch always reports on today and cannot be combined with --date or --from")
+    if args.baselines and (args.watch or args.from_date):
+        parser.error("--baselines only applies to a single --date report and cannot be combined with --watch or --from")
+    if args.accounts and (args.watch or args.from_date or args.baselines):
+        parser.error("--accounts cannot be combined with --watch, --from or --baselines")
+    if args.max_concurrency < 1 or args.per_account_concurrency < 1:
+        parser.error("--max-concurrency and --per-account-concurrency must be at least 1")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+    if (args.rate_limit is not None and args.rate_limit <= 0) or args.max_retries < 0:
+        parser.error("--rate-limit must be positive and --max-retries cannot be negative")
+    if not (args.profile or args.profile_out or args.cprofile or args.profile_memory):
+        run_report(args)
+        return
+
+    from profiling import StageTimer, format_top_functions, top_functions
+
+    timer = StageTimer(track_memory=args.profile_memory)
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    with timer.activate():
+        if profiler is not None:
+            profiler.enable()
+        try:
+            run_report(args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    profile = timer.to_dict()
+    if profiler is not None:
+        profiler.dump_stats(args.cprofile)
+        profile['top_functions'] = top_functions(profiler)
+    if args.profile or args.profile_memory:
+        print(timer.format_report())
+        if profiler is not None:
+            print(format_top_functions(profile['top_functions']))
+    if args.profile_out:
+        with open(args.profile_out, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+        print(f"Profile saved: {args.profile_out}")
+
+def run_report(args: argparse.Namespace) -> None:
+    """
+    Runs the report (or backfill) described by the parsed command line arguments.
+    """
+    from dotenv import load_dotenv
+    from lunchmoney_client import DEFAULT_TIMEOUT, LunchMoneyClient
+
+    input_date = parse_input_date(args.date)
+    max_embedded_transactions = None if args.max_embedded_transactions < 0 else args.max_embedded_transactions
+
+    # Load the .env file
+    load_dotenv()
+
+    # Get the value of the 'LM_API' environmental variable
+    lm_api = os.getenv('LM_API_KEY')
+    lm_hostname = os.getenv('LM_HOSTNAME')
+
+    # A recording has to see every request, and a replay must not write replayed data to the cache
+    use_cache = not (args.no_cache or args.record or args.replay)
+    transaction_cache = TransactionCache(args.cache_path) if use_cache else None
+    try:
+        if args.accounts:
+            run_accounts_report(args, input_date, lm_hostname, transaction_cache, max_embedded_transactions)
+            return
+        # Shared API client: one pooled keep-alive session for every request in the run
+        with LunchMoneyClient(lm_hostname, lm_api, timeout=(DEFAULT_TIMEOUT[0], args.timeout),
+                              rate_limit=args.rate_limit, max_retries=args.max_retries,
+                              record_dir=args.record, replay_dir=args.replay) as client:
+            if args.watch:
+                from watch import run_watch
+                # Watch mode keeps its own in-memory state, so the month cache is not consulted
+                try:
+                    run_watch(client, interval=args.interval, png=not args.no_png, html=not args.no_html,
+                              max_embedded_transactions=max_embedded_transactions,
+                              chart_format=args.chart_format, html_mode=args.html_mode,
+                              precompress=args.precompress, max_chart_points=args.max_chart_points)
+                except KeyboardInterrupt:
+                    print("Stopped watching.")
+                return
+            if args.from_date:
+                from_date = parse_input_date(args.from_date)
+                to_date = parse_input_date(args.to_date)
+                paths = run_backfill(from_date, to_date, client, cache=transaction_cache, refresh=args.refresh,
+                                     png=not args.no_png, html=not args.no_html, workers=args.workers,
+                                     chart_format=args.chart_format, reuse_unchanged=not args.force_render,
+                                     html_mode=args.html_mode, precompress=args.precompress,
+                                     max_chart_points=args.max_chart_points,
+                                     max_embedded_transactions=max_embedded_transactions)
+                print(f"Backfill produced {len(paths)} files for {from_date.strftime('%Y-%m-%d')} to {to_date.strftime('%Y-%m-%d')}.")
+                return
+            baselines = None
+            if args.baselines > 0:
+                # One planned fetch covers both the report and the baseline history
+                (history_df, budgets), net_worth = fetch_with_net_worth(lambda: fetch_with_budgets(
+                    lambda: fetch_transactions_for_ranges(
+                        [report_fetch_range(input_date), (baseline_history_start(input_date, args.baselines), input_date)],
+                        client, cache=transaction_cache, refresh=args.refresh,
+                    ),
+                    input_date, input_date, client, cache=transaction_cache, refresh=args.refresh,
+                ), input_date, client)
+                with stage('aggregate'):
+                    current_month_df, last_month_df, full_current_month_df = build_report_frames(history_df, input_date)
+                    baselines = compute_baselines(input_date, history_df, args.baselines)
+            else:
+                ((current_month_df, last_month_df, full_current_month_df), budgets), net_worth = fetch_with_net_worth(
+                    lambda: fetch_with_budgets(
+                        lambda: load_report_frames(input_date, client, cache=transaction_cache, refresh=args.refresh),
+                        input_date, input_date, client, cache=transaction_cache, refresh=args.refresh,
+                    ),
+                    input_date, client,
+                )
+    finally:
+        if transaction_cache is not None:
+            transaction_cache.close()
+
+    if current_month_df.empty and last_month_df.empty and full_current_month_df.empty:
+        start, end = report_fetch_range(input_date)
+        print(f"No transaction data found between {start.strftime('%Y-%m-%d')} and {end.strftime('%Y-%m-%d')}.")
+        sys.exit()
+
+    record_frames(current_month_df=current_month_df, last_month_df=last_month_df,
+                  full_current_month_df=full_current_month_df)
+    with stage('aggregate'):
+        series = build_daily_series(input_date, current_month_df, last_month_df, full_current_month_df)
+        comparison = compute_comparison(input_date, series)
+    print(format_console_summary(input_date, comparison))
+    if net_worth is not None:
+        print(format_net_worth_summary(net_worth))
+    if baselines is not None:
+        print(format_baselines_summary(baselines))
+
+    paths = write_report_files(input_date, comparison, current_month_df, series,
+                               png=not args.no_png, html=not args.no_html,
+                               max_embedded_transactions=max_embedded_transactions, chart_format=args.chart_format,
+                               reuse_unchanged=not args.force_render, html_mode=args.html_mode,
+                               precompress=args.precompress, max_chart_points=args.max_chart_points,
+                               budget=report_budget(budgets, input_date, current_month_df), net_worth=net_worth)
+    for path in paths:
+        # Not the split mode's shared shell
+        if path.endswith('-dashboard.html'):
+            print(f"Dashboard saved: {path}")
+
+def run_accounts_report(args: argparse.Namespace, input_date: pd.Timestamp, default_hostname: str | None,
+                        cache: TransactionCache | None, max_embedded_transactions: int | None) -> None:
+    """
+    Runs the report for every account in --accounts and prints the combined summary.
+
+    Exits non-zero when the accounts file is invalid or any account failed.
+    """
+    import time
+    from lunchmoney_client import DEFAULT_TIMEOUT
+    from multi_account import format_accounts_summary, load_accounts, results_payload, run_accounts
+
+    try:
+        accounts = load_accounts(args.accounts, default_hostname=default_hostname)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    results = run_accounts(accounts, input_date, cache=cache, refresh=args.refresh,
+                           png=not args.no_png, html=not args.no_html, chart_format=args.chart_format,
+                           reuse_unchanged=not args.force_render, html_mode=args.html_mode,
+                           precompress=args.precompress, max_chart_points=args.max_chart_points,
+                           max_concurrency=args.max_concurrency, per_account_concurrency=args.per_account_concurrency,
+                           render_workers=args.workers, max_embedded_transactions=max_embedded_transactions,
+                           timeout=(DEFAULT_TIMEOUT[0], args.timeout),
+                           rate_limit=args.rate_limit, max_retries=args.max_retries,
+                           record_dir=args.record, replay_dir=args.replay)
+    wall_seconds = time.perf_counter() - started
+    for result in results:
+        if result.summary:
+            print(f"[{result.name}]{result.summary}")
+    print(format_accounts_summary(results, wall_seconds))
+    if args.summary_out:
+        with open(args.summary_out, 'w', encoding='utf-8') as f:
+            json.dump(results_payload(results, wall_seconds), f, indent=2)
+        print(f"Summary saved: {args.summary_out}")
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+"""
+Long-running dashboard service.
+
+Serves the same /api/* routes as server.js, plus the computed comparison report, from an
+in-memory cache: each upstream response (and each parsed month and report) is kept for its
+endpoint's TTL, concurrent identical requests share a single upstream call, and every JSON
+response carries an ETag so unchanged data is answered with 304 Not Modified.
+
+Usage:
+    python dashboard_server.py --port 3001
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypeVar
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pandas as pd
+import requests
+
+from comparison import (
+    build_daily_series,
+    build_report_frames,
+    compute_comparison,
+    concat_transaction_frames,
+    dashboard_data,
+    fetch_budgets_json,
+    fetch_transactions_json,
+    parse_transactions_page,
+    render_dashboard_html,
+    report_budget,
+    report_fetch_range,
+)
+from budgets import Budget
+from lunchmoney_async import fetch_net_worth
+from lunchmoney_client import LunchMoneyClient
+from transaction_cache import (
+    CLOSED_MONTH_SETTLE_PERIOD,
+    CLOSED_MONTH_TTL,
+    DEFAULT_CACHE_PATH,
+    TransactionCache,
+    account_key,
+    month_end,
+    months_in_range,
+)
+
+T = TypeVar('T')
+
+# Seconds each kind of response stays cached
+DEFAULT_TTLS = {
+    'transactions': 300,
+    'budgets': 900,
+    'assets': 900,
+    'plaid_accounts': 900,
+    'dashboard': 300,
+}
+DEFAULT_PORT = 3001
+# Keys come from request parameters, so the response cache is bounded
+DEFAULT_MAX_CACHE_ENTRIES = 1024
+TREND_MONTHS = 12
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    content_type: str = 'application/json'
+    max_age: int = 0
+
+    @classmethod
+    def json(cls, payload: Any, max_age: int = 0) -> 'CachedResponse':
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return cls.from_body(body, 'application/json', max_age)
+
+    @classmethod
+    def from_body(cls, body: bytes, content_type: str, max_age: int = 0) -> 'CachedResponse':
+        return cls(body, f'"{hashlib.sha1(body).hexdigest()}"', content_type, max_age)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a per-entry TTL.
+
+    When several threads miss on the same key at once, only the first computes the
+    value; the others wait for and share its result. Failures are not cached.
+
+    Expired entries are dropped whenever a value is stored, and beyond max_entries
+    the least recently used entry is evicted.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_entries: int = DEFAULT_MAX_CACHE_ENTRIES):
+        self._clock = clock
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Any, ttl: float, compute: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            now = self._clock()
+            for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[expired]
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
+
+
+def parse_date_param(query: dict, name: str) -> date:
+    value = query.get(name)
+    if not value:
+        raise ValueError(f"{name} required")
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD") from None
+
+
+class DashboardService:
+    """
+    Answers dashboard requests from cached upstream data.
+
+    Transactions are fetched and cached one calendar month at a time, so the overlapping
+    ranges the dashboard asks for share months instead of refetching them. Months that
+    closed (plus a settle period) are kept for CLOSED_MONTH_TTL; the open month, budgets,
+    assets and reports expire after their entry in ttls.
+
+    With a store, fetched months are also persisted (and read back on a restart), and the
+    trend, category and day-of-week views are answered from its rollups.
+    """
+
+    def __init__(self, client: LunchMoneyClient, ttls: dict[str, float] | None = None,
+                 cache: TTLCache | None = None, today: Callable[[], date] = date.today,
+                 store: TransactionCache | None = None):
+        self.client = client
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.cache = cache or TTLCache()
+        self.today = today
+        self.store = store
+        self.account = account_key(client.hostname, client.headers)
+
+    def month_is_closed(self, month_start: date) -> bool:
+        return self.today() >= month_end(month_start) + timedelta(days=1) + CLOSED_MONTH_SETTLE_PERIOD
+
+    def month_ttl(self, month_start: date) -> float:
+        if self.month_is_closed(month_start):
+            return CLOSED_MONTH_TTL.total_seconds()
+        return self.ttls['transactions']
+
+    def month_transactions(self, month_start: date) -> list[dict]:
+        def compute():
+            # Open months are only written to the store: its own TTL would override --transactions-ttl
+            if self.store is not None and self.month_is_closed(month_start):
+                stored = self.store.get_month(self.account, month_start)
+                if stored is not None:
+                    return stored
+            transactions = fetch_transactions_json(month_start.isoformat(), month_end(month_start).isoformat(), self.client)
+            if self.store is not None:
+                # Also rewrites the month's rollups
+                self.store.put_month(self.account, month_start, transactions)
+            return transactions
+        return self.cache.get_or_compute(('month', month_start), self.month_ttl(month_start), compute)
+
+    def sync_months(self, start: date, end: date) -> None:
+        """
+        Makes sure every month touching [start, end] is fetched and rolled up.
+        """
+        self.client.map_concurrently(self.month_transactions, months_in_range(start, end))
+
+    def rollup_view(self, name: str, start: date, end: date, query: Callable[[], Any]) -> CachedResponse:
+        ttl = self.ttls['dashboard']
+        def compute():
+            self.sync_months(start, end)
+            return CachedResponse.json(query(), ttl)
+        return self.cache.get_or_compute((name, start, end), ttl, compute)
+
+    def trend(self, as_of: date) -> CachedResponse:
+        start = as_of.replace(day=1)
+        for _ in range(TREND_MONTHS - 1):
+            start = (start - timedelta(days=1)).replace(day=1)
+        return self.rollup_view('trend', start, as_of, lambda: {
+            'months': self.store.monthly_trend(self.account, as_of, TREND_MONTHS),
+        })
+
+    def month_frame(self, month_start: date) -> pd.DataFrame:
+        return self.cache.get_or_compute(('frame', month_start), self.month_ttl(month_start),
+                                         lambda: parse_transactions_page(self.month_transactions(month_start)))
+
+    def transactions(self, start: date, end: date) -> CachedResponse:
+        def compute():
+            months = self.client.map_concurrently(self.month_transactions, months_in_range(start, end))
+            start_str, end_str = start.isoformat(), end.isoformat()
+            page = [t for month in months for t in month if start_str <= t.get('date', '') <= end_str]
+            return CachedResponse.json({'transactions': page, 'has_more': False}, self.ttls['transactions'])
+        return self.cache.get_or_compute(('transactions', start, end), self.ttls['transactions'], compute)
+
+    def upstream(self, endpoint: str, params: dict | None = None) -> CachedResponse:
+        ttl = self.ttls[endpoint]
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        return self.cache.get_or_compute(key, ttl, lambda: CachedResponse.json(
+            self.client.get(f'/v1/{endpoint}', params), ttl
+        ))
+
+    def month_budgets(self, month_start: date) -> dict[date, list[Budget]]:
+        """
+        Returns the month's parsed budgets keyed by month_start, or {} if they cannot be fetched.
+        """
+        ttl = CLOSED_MONTH_TTL.total_seconds() if self.month_is_closed(month_start) else self.ttls['budgets']
+        try:
+            budgets = self.cache.get_or_compute(('month-budgets', month_start), ttl, lambda: [
+                Budget.from_json(b) for b in fetch_budgets_json(month_start, self.client)
+            ])
+        except requests.RequestException:
+            return {}
+        return {month_start: budgets}
+
+    def net_worth(self) -> dict | None:
+        """
+        Returns the accounts' compute_net_worth result, or None if the balances cannot be fetched.
+        """
+        ttl = min(self.ttls['assets'], self.ttls['plaid_accounts'])
+        try:
+            return self.cache.get_or_compute(('net-worth',), ttl, lambda: fetch_net_worth(self.client))
+        except (httpx.HTTPError, requests.RequestException):
+            return None
+
+    def report_data(self, input_date: date) -> dict:
+        def compute():
+            report_date = pd.Timestamp(input_date)
+            start, end = report_fetch_range(report_date)
+            months = months_in_range(start.date(), end.date())
+            # The budgets and balances are fetched alongside the months' transactions; balances
+            # are only known as of now, so only today's report shows them
+            frames, budgets, net_worth = self.client.map_concurrently(lambda load: load(), [
+                lambda: self.client.map_concurrently(self.month_frame, months),
+                lambda: self.month_budgets(input_date.replace(day=1)),
+                lambda: self.net_worth() if input_date == self.today() else None,
+            ])
+            all_transactions_df = concat_transaction_frames(frames)
+            current_month_df, last_month_df, full_current_month_df = build_report_frames(all_transactions_df, report_date)
+            series = build_daily_series(report_date, current_month_df, last_month_df, full_current_month_df)
+            comparison = compute_comparison(report_date, series)
+            return dashboard_data(input_date=report_date, current_month_df=current_month_df, series=series,
+                                  max_embedded_transactions=None,
+                                  budget=report_budget(budgets, report_date, current_month_df, today=self.today()),
+                                  net_worth=net_worth, **comparison)
+        return self.cache.get_or_compute(('report', input_date), self.ttls['dashboard'], compute)
+
+    def report(self, input_date: date) -> CachedResponse:
+        ttl = self.ttls['dashboard']
+        return self.cache.get_or_compute(('report-json', input_date), ttl,
+                                         lambda: CachedResponse.json(self.report_data(input_date), ttl))
+
+    def report_html(self, input_date: date) -> CachedResponse:
+        ttl = self.ttls['dashboard']
+        return self.cache.get_or_compute(('report-html', input_date), ttl, lambda: CachedResponse.from_body(
+            render_dashboard_html(self.report_data(input_date)).encode('utf-8'), 'text/html; charset=utf-8', ttl
+        ))
+
+    def handle(self, path: str, query: dict) -> CachedResponse | None:
+        """
+        Routes a GET request to its cached response; returns None for unknown paths.
+
+        Raises:
+            ValueError: If a required query parameter is missing or malformed.
+        """
+        if path == '/api/transactions':
+            return self.transactions(parse_date_param(query, 'start_date'), parse_date_param(query, 'end_date'))
+        if path == '/api/budgets':
+            params = {name: parse_date_param(query, name).isoformat() for name in ('start_date', 'end_date')}
+            return self.upstream('budgets', params)
+        if path in ('/api/assets', '/api/plaid_accounts'):
+            return self.upstream(path.removeprefix('/api/'))
+        if path in ('/api/dashboard', '/'):
+            input_date = parse_date_param(query, 'date') if query.get('date') else self.today()
+            return self.report(input_date) if path == '/api/dashboard' else self.report_html(input_date)
+        if self.store is not None and path == '/api/trend':
+            return self.trend(parse_date_param(query, 'date') if query.get('date') else self.today())
+        if self.store is not None and path in ('/api/categories', '/api/day_of_week'):
+            start, end = parse_date_param(query, 'start_date'), parse_date_param(query, 'end_date')
+            if path == '/api/categories':
+                return self.rollup_view('categories', start, end, lambda: {
+                    'categories': self.store.category_totals(self.account, start, end),
+                })
+            return self.rollup_view('day_of_week', start, end, lambda: {
+                'days': self.store.day_of_week_totals(self.account, start, end),
+            })
+        if path == '/api/cache':
+            return CachedResponse.json(self.cache.stats())
+        return None
+
+
+def make_handler(service: DashboardService) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                response = service.handle(url.path, query)
+            except ValueError as exc:
+                self.send_json(400, {'error': str(exc)})
+                return
+            except requests.RequestException as exc:
+                status = exc.response.status_code if exc.response is not None else 502
+                self.send_json(status, {'error': str(exc)})
+                return
+            if response is None:
+                self.send_json(404, {'error': 'not found'})
+                return
+
+            if self.headers.get('If-None-Match') == response.etag:
+                self.send_response(304)
+                self.send_header('ETag', response.etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', response.content_type)
+            self.send_header('Content-Length', str(len(response.body)))
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', f'private, max-age={int(response.max_age)}')
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        def send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the spending dashboard from an in-memory cache.")
+    parser.add_argument("--host", default='127.0.0.1', help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=int(os.getenv('PORT', DEFAULT_PORT)), help="Port to listen on.")
+    parser.add_argument("--cache-path", type=str, default=DEFAULT_CACHE_PATH,
+                        help="Transaction cache (with the trend rollups) shared with comparison.py.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Keep everything in memory; the trend, category and day-of-week views are disabled.")
+    parser.add_argument("--rate-limit", type=float,
+                        help="Send at most this many upstream requests per second (unlimited by default).")
+    for endpoint, ttl in DEFAULT_TTLS.items():
+        parser.add_argument(f"--{endpoint.replace('_', '-')}-ttl", type=float, default=ttl,
+                            help=f"Seconds to cache {endpoint} responses (default {ttl}).")
+    parser.add_argument("--max-cache-entries", type=int, default=DEFAULT_MAX_CACHE_ENTRIES,
+                        help="Responses kept in memory before the least recently used is dropped.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    from dotenv import load_dotenv
+
+    args = build_arg_parser().parse_args(argv)
+    load_dotenv()
+    ttls = {endpoint: getattr(args, f"{endpoint}_ttl") for endpoint in DEFAULT_TTLS}
+    store = None if args.no_cache else TransactionCache(args.cache_path)
+    try:
+        with LunchMoneyClient(os.getenv('LM_HOSTNAME'), os.getenv('LM_API_KEY'), rate_limit=args.rate_limit) as client:
+            service = DashboardService(client, ttls, cache=TTLCache(max_entries=args.max_cache_entries), store=store)
+            httpd = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+            print(f"Dashboard server running on http://{args.host}:{args.port}")
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                httpd.server_close()
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
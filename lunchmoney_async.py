@@ -0,0 +1,271 @@
+"""
+asyncio client for the Lunch Money endpoints the dashboard reads: transactions, budgets,
+assets and Plaid accounts, parsed into typed records.
+
+Requests go out over one httpx.AsyncClient connection pool, so fetching all four endpoints
+costs about as long as the slowest of them rather than their sum.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import httpx
+
+from accounts import Asset, PlaidAccount, compute_net_worth
+from budgets import Budget, _to_float
+from lunchmoney_client import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_TIMEOUT,
+    MAX_BACKOFF,
+    RETRY_STATUSES,
+    LunchMoneyClient,
+    TokenBucket,
+    json_loads,
+    record_response,
+    replay_response,
+    retry_after_seconds,
+)
+
+DEFAULT_MAX_CONCURRENCY = DEFAULT_MAX_WORKERS
+TRANSACTIONS_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Transaction:
+    id: int | None
+    date: date
+    amount: float
+    payee: str
+    category_name: str
+    is_income: bool
+    exclude_from_totals: bool
+
+    @classmethod
+    def from_json(cls, raw: dict) -> 'Transaction':
+        return cls(
+            id=raw.get('id'),
+            date=date.fromisoformat(raw['date']),
+            amount=_to_float(raw.get('amount')),
+            payee=raw.get('payee') or '',
+            category_name=raw.get('category_name') or '',
+            is_income=bool(raw.get('is_income')),
+            exclude_from_totals=bool(raw.get('exclude_from_totals')),
+        )
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    transactions: list[Transaction]
+    budgets: list[Budget]
+    assets: list[Asset]
+    plaid_accounts: list[PlaidAccount]
+
+
+class AsyncLunchMoneyClient:
+    """
+    asyncio counterpart of LunchMoneyClient.
+
+    At most max_concurrency requests are in flight at once (an asyncio.Semaphore, and a
+    connection pool of the same size). As in LunchMoneyClient, every request first takes a
+    token from rate_limiter, also takes one of the shared request_slots when given, and
+    429s and transient 5xx/connection errors are retried with the same Retry-After or
+    jittered backoff delays; record_dir and replay_dir record and replay responses in the
+    same format. A client belongs to the event loop it is first used in.
+    """
+
+    def __init__(self, hostname: str, api_key: str | None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 rate_limiter: TokenBucket | None = None,
+                 request_slots=None,
+                 record_dir: str | None = None,
+                 replay_dir: str | None = None,
+                 transport: httpx.AsyncBaseTransport | None = None):
+        self.hostname = hostname
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.request_slots = request_slots
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        self.retries = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self._http = httpx.AsyncClient(
+            base_url=hostname,
+            headers={"Authorization": f"Bearer {api_key}", "Accept": "application/json"},
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_client(cls, client: LunchMoneyClient, **kwargs) -> 'AsyncLunchMoneyClient':
+        """
+        Builds an async client with client's account, timeouts, retries, rate limiter,
+        shared request slots and record/replay directories.
+        """
+        settings = dict(
+            max_concurrency=client.max_workers,
+            timeout=client.timeout,
+            max_retries=client.max_retries,
+            rate_limiter=client.rate_limiter,
+            request_slots=client.request_slots,
+            record_dir=client.record_dir,
+            replay_dir=client.replay_dir,
+        )
+        settings.update(kwargs)
+        return cls(client.hostname, client.api_key, **settings)
+
+    @asynccontextmanager
+    async def _slot(self):
+        async with self._semaphore:
+            if self.request_slots is None:
+                yield
+                return
+            # A threading semaphore shared with synchronous clients; wait for it off the event loop
+            await asyncio.to_thread(self.request_slots.acquire)
+            try:
+                yield
+            finally:
+                self.request_slots.release()
+
+    async def get(self, path: str, params: dict | None = None) -> Any:
+        """
+        Sends a GET request to the API and returns the decoded JSON body.
+
+        Raises:
+            httpx.HTTPError: Once retries are exhausted, or at once for other HTTP errors.
+            RecordingNotFound: In replay mode, for a request that was never recorded.
+        """
+        if self.replay_dir:
+            return replay_response(self.replay_dir, path, params)
+        attempt = 0
+        while True:
+            if self.rate_limiter.rate:
+                await asyncio.to_thread(self.rate_limiter.acquire)
+            try:
+                async with self._slot():
+                    response = await self._http.get(path, params=params)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = LunchMoneyClient.backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    if self.record_dir:
+                        record_response(self.record_dir, path, params, response.content)
+                    return json_loads(response.content)
+                retry_after = retry_after_seconds(response)
+                delay = LunchMoneyClient.backoff(attempt) if retry_after is None else min(retry_after, MAX_BACKOFF)
+                if response.status_code == 429:
+                    self.rate_limiter.pause(delay)
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def fetch_transactions_json(self, start_date: date, end_date: date,
+                                      page_size: int = TRANSACTIONS_PAGE_SIZE) -> list[dict]:
+        """
+        Fetches every raw transaction between start_date and end_date (inclusive), following pagination.
+
+        Requests the same offset/limit pages as iter_transaction_pages, so recordings are interchangeable.
+        """
+        transactions = []
+        offset = 0
+        while True:
+            payload = await self.get('/v1/transactions', {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'offset': offset,
+                'limit': page_size,
+            })
+            page = payload.get('transactions') or []
+            transactions.extend(page)
+            has_more = payload.get('has_more')
+            if has_more is None:
+                has_more = len(page) >= page_size
+            if not has_more or not page:
+                return transactions
+            offset += len(page)
+
+    async def fetch_transactions(self, start_date: date, end_date: date,
+                                 page_size: int = TRANSACTIONS_PAGE_SIZE) -> list[Transaction]:
+        return [Transaction.from_json(t) for t in await self.fetch_transactions_json(start_date, end_date, page_size)]
+
+    async def fetch_budgets(self, start_date: date, end_date: date) -> list[Budget]:
+        payload = await self.get('/v1/budgets', {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        })
+        # /v1/budgets returns a bare list; tolerate an error object by treating it as no budgets
+        return [Budget.from_json(b) for b in payload] if isinstance(payload, list) else []
+
+    async def fetch_assets(self) -> list[Asset]:
+        payload = await self.get('/v1/assets')
+        return [Asset.from_json(a) for a in payload.get('assets') or []]
+
+    async def fetch_plaid_accounts(self) -> list[PlaidAccount]:
+        payload = await self.get('/v1/plaid_accounts')
+        return [PlaidAccount.from_json(a) for a in payload.get('plaid_accounts') or []]
+
+    async def fetch_accounts(self) -> tuple[list[Asset], list[PlaidAccount]]:
+        """
+        Fetches the manual assets and the Plaid accounts concurrently.
+        """
+        assets, plaid_accounts = await asyncio.gather(self.fetch_assets(), self.fetch_plaid_accounts())
+        return assets, plaid_accounts
+
+    async def fetch_dashboard(self, start_date: date, end_date: date,
+                              budget_start: date, budget_end: date) -> DashboardSnapshot:
+        """
+        Fetches transactions, budgets, assets and Plaid accounts concurrently.
+
+        Args:
+            start_date: First day of the transaction range (inclusive).
+            end_date: Last day of the transaction range (inclusive).
+            budget_start: First day of the budget range.
+            budget_end: Last day of the budget range.
+
+        Returns:
+            A DashboardSnapshot with every endpoint's parsed response.
+        """
+        transactions, budgets, assets, plaid_accounts = await asyncio.gather(
+            self.fetch_transactions(start_date, end_date),
+            self.fetch_budgets(budget_start, budget_end),
+            self.fetch_assets(),
+            self.fetch_plaid_accounts(),
+        )
+        return DashboardSnapshot(transactions, budgets, assets, plaid_accounts)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> 'AsyncLunchMoneyClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def fetch_net_worth(client: LunchMoneyClient) -> dict | None:
+    """
+    Fetches every account's balance concurrently and returns compute_net_worth's result.
+
+    Runs its own event loop, with an AsyncLunchMoneyClient sharing client's settings, so it
+    can be called from synchronous code (and from worker threads).
+
+    Raises:
+        httpx.HTTPError: If either endpoint fails.
+        RecordingNotFound: In replay mode, if the balances were not recorded.
+    """
+    async def fetch():
+        async with AsyncLunchMoneyClient.from_client(client) as async_client:
+            return await async_client.fetch_accounts()
+
+    assets, plaid_accounts = asyncio.run(fetch())
+    return compute_net_worth(assets, plaid_accounts)
@@ -0,0 +1,294 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    # Optional: orjson decodes large transaction pages several times faster than the stdlib
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5.0, 30.0)
+DEFAULT_MAX_WORKERS = 4
+# Throttling and transient server errors are retried; anything else fails at once
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_MAX_RETRIES = 5
+# Exponential backoff: a random delay up to BACKOFF_BASE * 2**attempt, capped at MAX_BACKOFF
+BACKOFF_BASE = 0.5
+MAX_BACKOFF = 60.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a request may be sent.
+
+    Tokens refill at rate per second up to capacity (the largest burst). With no rate
+    every acquire() passes immediately, except while the bucket is paused, as it is
+    when the API answers 429 Too Many Requests.
+    """
+
+    def __init__(self, rate: float | None = None, capacity: float | None = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds every acquire() back for seconds, then resumes at rate without a burst.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class RecordingNotFound(requests.RequestException):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def recording_path(directory: str, path: str, params: dict | None) -> str:
+    """
+    Returns where the response to GET path?params is recorded: one gzipped body per
+    endpoint and parameter set, e.g. 'v1_transactions-3f2a9c0d1e4b5a67.json.gz'.
+    """
+    canonical = json.dumps(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, f"{path.strip('/').replace('/', '_')}-{digest}.json.gz")
+
+
+def record_response(directory: str, path: str, params: dict | None, body: bytes) -> None:
+    """
+    Saves a response body where recording_path says, for replay_response to serve later.
+    """
+    target = recording_path(directory, path, params)
+    # mtime=0 keeps re-recordings of the same response byte-identical
+    data = gzip.compress(body, mtime=0)
+    # Written under a temporary name so a concurrent replay never sees half a file
+    tmp = f"{target}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, target)
+
+
+def replay_response(directory: str, path: str, params: dict | None) -> Any:
+    """
+    Returns the decoded body recorded for GET path?params.
+
+    Raises:
+        RecordingNotFound: If that request was never recorded.
+    """
+    source = recording_path(directory, path, params)
+    try:
+        with gzip.open(source, 'rb') as f:
+            return json_loads(f.read())
+    except FileNotFoundError:
+        raise RecordingNotFound(f"no recorded response for {path} {params or {}} in {directory}") from None
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LunchMoneyClient:
+    """
+    Shared HTTP client for the Lunch Money API.
+
+    Keeps one keep-alive connection pool for every request, negotiates gzip
+    responses, applies a default timeout, and can run independent requests
+    in parallel on a small thread pool.
+
+    A client never has more than max_workers requests in flight, even when
+    map_concurrently calls nest. Clients for different accounts can also share
+    request_slots, a semaphore that caps how many requests they have in flight between them.
+
+    Every request first takes a token from the client's rate limiter (rate_limit
+    requests per second, unlimited by default). 429s and transient 5xx/connection
+    errors are retried up to max_retries times, waiting for the Retry-After header
+    when there is one (and pausing the limiter, so other threads back off too) or a
+    jittered exponential backoff otherwise. Identical GETs already in flight are
+    coalesced: the later callers wait for, and share, the first one's decoded body.
+
+    With record_dir, every successful response body is also saved there; with
+    replay_dir, responses are served from such a recording and nothing is sent.
+    """
+
+    def __init__(self, hostname: str, api_key: str | None,
+                 timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 request_slots: threading.Semaphore | None = None,
+                 rate_limit: float | None = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 record_dir: str | None = None,
+                 replay_dir: str | None = None):
+        self.hostname = hostname
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.request_slots = request_slots
+        # One per pooled connection, so nested thread pools cannot overflow the adapter
+        self.connection_slots = threading.BoundedSemaphore(max_workers)
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.max_retries = max_retries
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+        self.retries = 0
+        self.coalesced = 0
+        self._inflight: dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Size the pool so every worker thread can hold its own connection
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, path: str, params: dict | None = None) -> Any:
+        """
+        Sends a GET request to the API and returns the decoded JSON body.
+
+        Args:
+            path: API path, e.g. '/v1/transactions'.
+            params: Optional query parameters.
+
+        Returns:
+            The parsed JSON response (shared with any identical request that was in flight).
+
+        Raises:
+            requests.RequestException: Once retries are exhausted, or at once for other HTTP errors.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            payload = self._get_with_retries(path, params)
+        except BaseException as exc:
+            with self._inflight_lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._inflight_lock:
+            del self._inflight[key]
+        future.set_result(payload)
+        return payload
+
+    def _get_with_retries(self, path: str, params: dict | None) -> Any:
+        if self.replay_dir:
+            return replay_response(self.replay_dir, path, params)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                # The client's own slot first, so waiting on it never holds a shared one
+                with self.connection_slots, self.request_slots or nullcontext():
+                    response = self.session.get(f"{self.hostname}{path}", params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status() # Raises an exception for HTTP errors (4xx or 5xx)
+                    if self.record_dir:
+                        record_response(self.record_dir, path, params, response.content)
+                    return json_loads(response.content)
+                retry_after = retry_after_seconds(response)
+                delay = self.backoff(attempt) if retry_after is None else min(retry_after, MAX_BACKOFF)
+                if response.status_code == 429:
+                    self.rate_limiter.pause(delay)
+            attempt += 1
+            self.retries += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        """
+        Full-jitter exponential backoff for the given (0-based) retry.
+        """
+        return random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** attempt))
+
+    def map_concurrently(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """
+        Applies fn to every item on the client's thread pool, preserving order.
+
+        A single item is run inline, so callers do not pay for a pool they do not need.
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'LunchMoneyClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,246 @@
+"""
+Runs the comparison report for several Lunch Money accounts at once.
+
+Accounts are listed in a JSON file:
+
+    [
+        {"name": "household", "api_key_env": "LM_HOUSEHOLD_KEY", "output_dir": "reports/household"},
+        {"name": "client-a", "api_key": "...", "hostname": "https://dev.lunchmoney.app"}
+    ]
+
+Each account gets its own API client; every client shares one pool of request slots, so
+the whole run never has more than max_concurrency requests in flight, and each account
+has at most per_account_concurrency. Reports are rendered on a process pool as soon as
+their account's data is in, so the run takes about as long as the slowest account.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from comparison import (
+    DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    build_daily_series,
+    compute_comparison,
+    fetch_with_budgets,
+    fetch_with_net_worth,
+    format_console_summary,
+    format_net_worth_summary,
+    load_report_frames,
+    report_budget,
+    write_report_files,
+)
+from lunchmoney_client import DEFAULT_MAX_RETRIES, DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT, LunchMoneyClient
+from transaction_cache import TransactionCache
+
+# Requests in flight across every account at once
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+@dataclass(frozen=True)
+class Account:
+    name: str
+    hostname: str
+    api_key: str
+    output_dir: str
+
+
+@dataclass
+class AccountResult:
+    name: str
+    output_dir: str
+    fetch_seconds: float = 0.0
+    render_seconds: float = 0.0
+    paths: list[str] = field(default_factory=list)
+    summary: str = ''
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_accounts(path: str, default_hostname: str | None = None) -> list[Account]:
+    """
+    Reads the accounts file.
+
+    Each entry needs a name and either api_key or api_key_env (the name of an environment
+    variable holding the key). hostname defaults to default_hostname and output_dir to
+    the account's name.
+
+    Raises:
+        ValueError: If the file is not a list of valid account entries.
+    """
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty list of accounts")
+
+    accounts = []
+    for i, entry in enumerate(entries):
+        name = entry.get('name') if isinstance(entry, dict) else None
+        if not name:
+            raise ValueError(f"account {i} in {path} has no name")
+        api_key = entry.get('api_key') or os.getenv(entry.get('api_key_env') or '')
+        if not api_key:
+            raise ValueError(f"account {name!r} has no api_key (or its api_key_env is not set)")
+        hostname = entry.get('hostname') or default_hostname
+        if not hostname:
+            raise ValueError(f"account {name!r} has no hostname")
+        accounts.append(Account(name, hostname, api_key, entry.get('output_dir') or name))
+    if len({a.name for a in accounts}) != len(accounts):
+        raise ValueError(f"account names in {path} must be unique")
+    return accounts
+
+
+def _render(output_dir: str, *job, **kwargs) -> tuple[list[str], float]:
+    # Runs in a worker process, so it times itself
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    paths = write_report_files(*job, output_dir=output_dir, **kwargs)
+    return paths, time.perf_counter() - started
+
+
+def run_accounts(
+    accounts: list[Account],
+    input_date: pd.Timestamp,
+    cache: TransactionCache | None = None,
+    refresh: bool = False,
+    png: bool = True,
+    html: bool = True,
+    chart_format: str = 'png',
+    reuse_unchanged: bool = True,
+    html_mode: str = 'inline',
+    precompress: bool = False,
+    max_chart_points: int | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_account_concurrency: int = DEFAULT_MAX_WORKERS,
+    render_workers: int | None = None,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+    rate_limit: float | None = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    record_dir: str | None = None,
+    replay_dir: str | None = None,
+) -> list[AccountResult]:
+    """
+    Fetches, computes and renders the report for input_date for every account.
+
+    An account that fails is recorded in its result and does not stop the others.
+
+    Args:
+        accounts: The accounts to report on.
+        input_date: The reference date of every report.
+        cache: Optional local transaction cache (months are keyed per account).
+        refresh: Bypass (and repopulate) the cache.
+        png: Render the PNG charts.
+        html: Write the HTML dashboards.
+        chart_format: 'png' or 'svg'.
+        reuse_unchanged: Keep files whose inputs have not changed since they were written.
+        html_mode: 'inline' or 'split' (see write_report_files).
+        precompress: Also write .gz/.br copies of the dashboard files.
+        max_chart_points: Cap on the points drawn per chart line (None draws every day).
+        max_concurrency: Requests in flight across all accounts.
+        per_account_concurrency: Requests in flight for any one account.
+        render_workers: Size of the rendering process pool (defaults to the number of CPUs).
+        max_embedded_transactions: Cap on transactions embedded in each dashboard (None embeds all).
+        timeout: Timeout for each API request.
+        rate_limit: Requests per second for each account (unlimited when None).
+        max_retries: Retries for throttled and transient failures.
+        record_dir: Record each account's API responses under record_dir/<name>.
+        replay_dir: Serve each account's API responses from replay_dir/<name>.
+
+    Returns:
+        One result per account, in the order given.
+    """
+    request_slots = threading.BoundedSemaphore(max_concurrency)
+    results = {account.name: AccountResult(account.name, account.output_dir) for account in accounts}
+
+    def fetch(account: Account) -> tuple:
+        started = time.perf_counter()
+        try:
+            with LunchMoneyClient(account.hostname, account.api_key, timeout=timeout,
+                                  max_workers=per_account_concurrency, request_slots=request_slots,
+                                  rate_limit=rate_limit, max_retries=max_retries,
+                                  record_dir=record_dir and os.path.join(record_dir, account.name),
+                                  replay_dir=replay_dir and os.path.join(replay_dir, account.name)) as client:
+                ((current_month_df, last_month_df, full_current_month_df), budgets), net_worth = fetch_with_net_worth(
+                    lambda: fetch_with_budgets(
+                        lambda: load_report_frames(input_date, client, cache=cache, refresh=refresh),
+                        input_date, input_date, client, cache=cache, refresh=refresh,
+                    ),
+                    input_date, client,
+                )
+            series = build_daily_series(input_date, current_month_df, last_month_df, full_current_month_df)
+            job = input_date, compute_comparison(input_date, series), current_month_df, series
+            return job, report_budget(budgets, input_date, current_month_df), net_worth
+        finally:
+            results[account.name].fetch_seconds = time.perf_counter() - started
+
+    render = png or html
+    renders = {}
+    with ProcessPoolExecutor(max_workers=render_workers) if render else nullcontext() as renderers:
+        if render:
+            # Under fork, the first submit starts every worker: do it before any fetch thread exists
+            renderers.submit(os.getpid)
+        # Accounts beyond max_concurrency could only wait for a request slot
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(accounts))) as fetchers:
+            fetches = {fetchers.submit(fetch, account): account for account in accounts}
+            for future in as_completed(fetches):
+                account = fetches[future]
+                result = results[account.name]
+                try:
+                    job, budget, net_worth = future.result()
+                except Exception as exc:
+                    result.error = f"fetch failed: {exc}"
+                    continue
+                result.summary = format_console_summary(input_date, job[1])
+                if net_worth is not None:
+                    result.summary += '\n' + format_net_worth_summary(net_worth)
+                if render:
+                    renders[renderers.submit(_render, account.output_dir, *job, png=png, html=html,
+                                             max_embedded_transactions=max_embedded_transactions,
+                                             chart_format=chart_format, reuse_unchanged=reuse_unchanged,
+                                             html_mode=html_mode, precompress=precompress,
+                                             max_chart_points=max_chart_points, budget=budget,
+                                             net_worth=net_worth)] = result
+        for future in as_completed(renders):
+            result = renders[future]
+            try:
+                result.paths, result.render_seconds = future.result()
+            except Exception as exc:
+                result.error = f"render failed: {exc}"
+    return [results[account.name] for account in accounts]
+
+
+def format_accounts_summary(results: list[AccountResult], wall_seconds: float) -> str:
+    """
+    Formats the per-account timings and errors, with the run's wall time against the sum of its accounts.
+    """
+    width = max(len('account'), *(len(r.name) for r in results))
+    lines = [f"{'account':<{width}}  {'fetch':>8}  {'render':>8}  status"]
+    for r in results:
+        status = f"ok ({len(r.paths)} files)" if r.ok else f"FAILED: {r.error}"
+        lines.append(f"{r.name:<{width}}  {r.fetch_seconds:>7.2f}s  {r.render_seconds:>7.2f}s  {status}")
+    per_account = [r.fetch_seconds + r.render_seconds for r in results]
+    failed = sum(not r.ok for r in results)
+    lines.append(f"{len(results)} accounts ({failed} failed) in {wall_seconds:.2f}s wall "
+                 f"(slowest account {max(per_account):.2f}s, {sum(per_account):.2f}s summed)")
+    return '\n'.join(lines)
+
+
+def results_payload(results: list[AccountResult], wall_seconds: float) -> dict:
+    return {
+        'wall_seconds': round(wall_seconds, 4),
+        'accounts': [
+            {'name': r.name, 'output_dir': r.output_dir, 'ok': r.ok, 'error': r.error,
+             'fetch_seconds': round(r.fetch_seconds, 4), 'render_seconds': round(r.render_seconds, 4),
+             'paths': r.paths}
+            for r in results
+        ],
+    }
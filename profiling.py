@@ -0,0 +1,270 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+# Order stages are reported in; anything else is listed after them
+STAGES = ('cache', 'fetch', 'parse', 'aggregate', 'plot', 'html')
+DEFAULT_TOP_FUNCTIONS = 20
+DEFAULT_TOP_ALLOCATIONS = 10
+RSS_SAMPLE_INTERVAL = 0.01
+
+_active_timer: 'StageTimer | None' = None
+
+
+def current_rss() -> int | None:
+    """
+    Returns the resident set size of this process in bytes, or None where it cannot be read.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss() -> int | None:
+    """
+    Returns the peak resident set size of this process in bytes, or None where it is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time per named pipeline stage.
+
+    Stages may be entered many times (once per API page, say) and from several
+    threads at once; each entry adds to the stage's total and call count. Time spent
+    in concurrent fetches is therefore summed, and can exceed the run's elapsed time.
+
+    With track_memory, the timer also records each stage's peak traced (tracemalloc)
+    and resident (RSS, sampled on a background thread) memory, the largest allocation
+    sites at the run's high-water mark, and the sizes of frames passed to record_frames().
+    tracemalloc slows Python allocations down, so timings taken with it are inflated.
+    Peaks are attributed to every stage open at the time, so overlapping stages share them.
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.totals: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.track_memory = track_memory
+        self.traced_peaks: dict[str, int] = {}
+        self.rss_peaks: dict[str, int] = {}
+        self.frames: dict[str, dict] = {}
+        self.top_allocations: list[dict] = []
+        self._open: dict[str, int] = {}
+        self._snapshot_size = 0
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.elapsed: float | None = None
+        self.peak_rss: int | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self.track_memory:
+            self._enter_memory_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.totals[name] = self.totals.get(name, 0.0) + duration
+                self.calls[name] = self.calls.get(name, 0) + 1
+            if self.track_memory:
+                self._exit_memory_stage(name)
+
+    def _fold_traced_peak(self) -> int:
+        # Credit the peak so far to every open stage before it is reset, so nested stages keep theirs
+        current, peak = tracemalloc.get_traced_memory()
+        for open_name in self._open:
+            self.traced_peaks[open_name] = max(self.traced_peaks.get(open_name, 0), peak)
+        return current
+
+    def _enter_memory_stage(self, name: str) -> None:
+        with self._lock:
+            self._fold_traced_peak()
+            self._open[name] = self._open.get(name, 0) + 1
+            tracemalloc.reset_peak()
+        self._sample_rss()
+
+    def _exit_memory_stage(self, name: str) -> None:
+        self._sample_rss()
+        with self._lock:
+            current = self._fold_traced_peak()
+            self._open[name] -= 1
+            if not self._open[name]:
+                del self._open[name]
+            take_snapshot = current > self._snapshot_size
+            if take_snapshot:
+                self._snapshot_size = current
+        if take_snapshot:
+            top = top_allocations(tracemalloc.take_snapshot())
+            with self._lock:
+                self.top_allocations = top
+
+    def _sample_rss(self) -> None:
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            for name in self._open:
+                self.rss_peaks[name] = max(self.rss_peaks.get(name, 0), rss)
+
+    def _sample_rss_until(self, stop: threading.Event) -> None:
+        while not stop.wait(RSS_SAMPLE_INTERVAL):
+            self._sample_rss()
+
+    def record_frames(self, frames: dict) -> None:
+        for name, df in frames.items():
+            self.frames[name] = {
+                'rows': len(df),
+                'bytes': int(df.memory_usage(index=True, deep=True).sum()),
+            }
+
+    @contextmanager
+    def activate(self) -> Iterator['StageTimer']:
+        """
+        Makes this the timer that profiling.stage() records into, for the duration of the block.
+        """
+        global _active_timer
+        previous, _active_timer = _active_timer, self
+        started_tracing = False
+        stop_sampling = threading.Event()
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            threading.Thread(target=self._sample_rss_until, args=(stop_sampling,), daemon=True).start()
+        try:
+            yield self
+        finally:
+            _active_timer = previous
+            self.elapsed = time.perf_counter() - self._started
+            if self.track_memory:
+                stop_sampling.set()
+                self.peak_rss = max_rss()
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def ordered_stages(self) -> list[str]:
+        return [s for s in STAGES if s in self.totals] + sorted(s for s in self.totals if s not in STAGES)
+
+    def to_dict(self) -> dict:
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self._started
+        stages = {}
+        for name in self.ordered_stages():
+            stages[name] = {'seconds': self.totals[name], 'calls': self.calls[name]}
+            if self.track_memory:
+                stages[name]['peak_traced_bytes'] = self.traced_peaks.get(name)
+                stages[name]['peak_rss_bytes'] = self.rss_peaks.get(name)
+        data = {'elapsed': elapsed, 'stages': stages}
+        if self.track_memory:
+            data['memory'] = {
+                'peak_traced_bytes': max(self.traced_peaks.values(), default=0),
+                'peak_rss_bytes': self.peak_rss,
+                'frames': self.frames,
+                'top_allocations': self.top_allocations,
+            }
+        return data
+
+    def format_report(self) -> str:
+        data = self.to_dict()
+        elapsed = data['elapsed']
+        lines = ['Stage timings:']
+        for name, stats in data['stages'].items():
+            share = stats['seconds'] / elapsed * 100 if elapsed else 0.0
+            line = f"  {name:<10} {stats['seconds'] * 1000:9.1f} ms {share:5.1f}%  ({stats['calls']} calls)"
+            if self.track_memory:
+                line += f"  peak {format_bytes(stats['peak_traced_bytes'])} traced, {format_bytes(stats['peak_rss_bytes'])} RSS"
+            lines.append(line)
+        lines.append(f"  {'total':<10} {elapsed * 1000:9.1f} ms")
+        if self.track_memory:
+            memory = data['memory']
+            lines.append(f"Peak memory: {format_bytes(memory['peak_traced_bytes'])} traced, "
+                         f"{format_bytes(memory['peak_rss_bytes'])} RSS")
+            for name, frame in memory['frames'].items():
+                lines.append(f"  {name:<24} {frame['rows']:>9,} rows  {format_bytes(frame['bytes'])}")
+            if memory['top_allocations']:
+                lines.append('Largest allocation sites:')
+                for site in memory['top_allocations']:
+                    lines.append(f"  {format_bytes(site['bytes']):>10}  {site['count']:>8} blocks  {site['location']}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Times the block as the named stage on the active StageTimer; a no-op when none is active.
+    """
+    timer = _active_timer
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_frames(**frames) -> None:
+    """
+    Records the row count and deep memory size of each DataFrame on the active
+    memory-tracking StageTimer; a no-op otherwise.
+    """
+    timer = _active_timer
+    if timer is not None and timer.track_memory:
+        timer.record_frames(frames)
+
+
+def format_bytes(size: int | None) -> str:
+    if size is None:
+        return 'n/a'
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = DEFAULT_TOP_ALLOCATIONS) -> list[dict]:
+    """
+    Lists the source lines holding the most traced memory in a tracemalloc snapshot.
+    """
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return [
+        {'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", 'bytes': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def top_functions(profiler, limit: int = DEFAULT_TOP_FUNCTIONS) -> list[dict]:
+    """
+    Lists the functions with the highest cumulative time in a finished cProfile.Profile.
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{filename}:{line}({func})",
+            'calls': ncalls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:limit]
+
+
+def format_top_functions(rows: list[dict]) -> str:
+    lines = ['Hottest functions (cumulative):']
+    for row in rows:
+        lines.append(f"  {row['cumtime'] * 1000:9.1f} ms  {row['tottime'] * 1000:9.1f} ms self  {row['calls']:>8}  {row['function']}")
+    return '\n'.join(lines)
@@ -11,6 +11,7 @@ app.use(cors());
 
 const LM_API_KEY = process.env.LM_API_KEY;
 const LM_HOSTNAME = process.env.LM_HOSTNAME;
+const ROLLUP_URL = process.env.ROLLUP_URL;
 
 if (!LM_API_KEY || !LM_HOSTNAME) {
   console.error('Missing LM_API_KEY or LM_HOSTNAME in .env');
@@ -25,12 +26,16 @@ async function proxyLM(res, path, params = {}) {
     });
     res.json(response.data);
   } catch (err) {
-    const status = err.response?.status || 500;
-    const msg = err.response?.data?.error || err.message;
-    res.status(status).json({ error: msg });
+    sendError(res, err);
   }
 }
 
+function sendError(res, err) {
+  const status = err.response?.status || 500;
+  const msg = err.response?.data?.error || err.message;
+  res.status(status).json({ error: msg });
+}
+
 app.get('/api/transactions', async (req, res) => {
   const { start_date, end_date } = req.query;
   if (!start_date || !end_date) {
@@ -55,6 +60,21 @@ app.get('/api/budgets', async (req, res) => {
   await proxyLM(res, '/v1/budgets', { start_date, end_date });
 });
 
+// The trend, category and day-of-week views are aggregated once, from dashboard_server.py's
+// rollups. Point ROLLUP_URL at it (e.g. http://localhost:3002) to forward them; without it
+// they answer 404 and the frontend sums the month's transactions itself.
+app.get(['/api/trend', '/api/categories', '/api/day_of_week'], async (req, res) => {
+  if (!ROLLUP_URL) {
+    return res.status(404).json({ error: 'ROLLUP_URL is not set' });
+  }
+  try {
+    const response = await axios.get(`${ROLLUP_URL}${req.path}`, { params: req.query });
+    res.json(response.data);
+  } catch (err) {
+    sendError(res, err);
+  }
+});
+
 if (process.env.NODE_ENV === 'production') {
   app.use(express.static(path.join(__dirname, 'dist')));
   app.get('*', (req, res) => {
@@ -169,6 +169,19 @@ function processTransactions(txns) {
 
 const DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
 
+// Category and weekday totals from the rollup endpoints, or null when they are unavailable
+async function fetchRollups(startDate, endDate) {
+  const params = new URLSearchParams({ start_date: startDate, end_date: endDate });
+  const [cats, dow] = await Promise.all([
+    fetchJSONSafe(`/api/categories?${params}`),
+    fetchJSONSafe(`/api/day_of_week?${params}`),
+  ]);
+  return {
+    categories: cats && Array.isArray(cats.categories) ? cats.categories : null,
+    days: dow && Array.isArray(dow.days) ? dow.days : null,
+  };
+}
+
 function computeDayOfWeek(txns) {
   const dow = {};
   txns.forEach(t => {
@@ -187,6 +200,12 @@ function findNearestAvailableDay(df, targetDay) {
 }
 
 async function computeMonthlyTrend(inputDate) {
+  // /api/trend is answered from dashboard_server.py's rollups (directly, or through server.js
+  // with ROLLUP_URL set); the client-side sum below only runs when it is unavailable
+  const rolled = await fetchJSONSafe(`/api/trend?date=${fmtYMD(inputDate)}`);
+  if (rolled && Array.isArray(rolled.months)) {
+    return rolled.months.map(m => ({ label: m.label, spending: m.spending, income: m.income }));
+  }
   const startDate = new Date(inputDate.getFullYear() - 1, inputDate.getMonth(), 1);
   const endDate = new Date(inputDate.getFullYear(), inputDate.getMonth() + 1, 0);
   const raw = await fetchTransactions(fmtYMD(startDate), fmtYMD(addDays(endDate, 1)));
@@ -853,11 +872,12 @@ async function loadData() {
     end_date: fmtYMD(endOfCurrentMonth),
   });
 
-  const [currentRaw, lastRaw, fullRaw, trend, budgetsRaw, assetsRes, plaidRes] = await Promise.all([
+  const [currentRaw, lastRaw, fullRaw, trend, rollups, budgetsRaw, assetsRes, plaidRes] = await Promise.all([
     fetchTransactions(currentMonthStart, currentMonthEnd),
     fetchTransactions(prevMonthStart, prevMonthEnd),
     fetchTransactions(currentMonthStart, fullCurrentMonthEnd),
     computeMonthlyTrend(inputDate),
+    fetchRollups(currentMonthStart, fmtYMD(inputDate)),
     fetchJSONSafe(`/api/budgets?${budgetParams}`),
     fetchJSONSafe('/api/assets'),
     fetchJSONSafe('/api/plaid_accounts'),
@@ -872,6 +892,7 @@ async function loadData() {
   fullCurrentMonth = fullCurrentMonth.filter(t => t.date <= endOfCurrentMonth);
 
   const D = buildDashboardData(currentMonth, lastMonth, fullCurrentMonth, inputDate, boundaries);
+  if (rollups.categories) D.categories = rollups.categories;
 
   // budget-aware projection: actuals so far + remaining budgeted expenses
   const budget = computeBudgetSummary(budgetsRaw, inputDate);
@@ -904,7 +925,7 @@ async function loadData() {
   );
   renderTxns(D.recentTransactions);
 
-  renderDow(computeDayOfWeek(currentMonth));
+  renderDow(rollups.days || computeDayOfWeek(currentMonth));
 
   const totalSpent = trend.reduce((s, m) => s + m.spending, 0);
   const totalEarned = trend.reduce((s, m) => s + m.income, 0);
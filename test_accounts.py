@@ -0,0 +1,29 @@
+import unittest
+from accounts import Asset, PlaidAccount, compute_net_worth
+
+ASSETS = [
+    {'id': 1, 'name': 'Savings', 'type_name': 'cash', 'balance': '1000.00'},
+    {'id': 2, 'name': 'Card', 'type_name': 'Credit', 'balance': '250.00'},
+    {'id': 3, 'name': 'Old', 'type_name': 'cash', 'balance': '99.00', 'closed_on': '2023-01-01'},
+]
+PLAID_ACCOUNTS = [
+    {'id': 4, 'name': 'Checking', 'type': 'depository', 'balance': '500.00', 'to_base': 480.0},
+    {'id': 5, 'name': 'Visa', 'type': 'credit', 'balance': '100.00'},
+]
+
+class TestNetWorth(unittest.TestCase):
+
+    def test_parses_balances(self):
+        asset = Asset.from_json(ASSETS[1])
+        self.assertEqual((asset.type_name, asset.balance), ('credit', 250.0))
+        # Converted to the primary currency when the API provides it
+        self.assertEqual(PlaidAccount.from_json(PLAID_ACCOUNTS[0]).balance, 480.0)
+
+    def test_counts_liabilities_as_debt_and_skips_closed_assets(self):
+        assets = [Asset.from_json(a) for a in ASSETS]
+        plaid = [PlaidAccount.from_json(a) for a in PLAID_ACCOUNTS]
+        self.assertEqual(compute_net_worth(assets, plaid), {'current': 1130.0, 'count': 4})
+        self.assertIsNone(compute_net_worth([], []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.run import check_memory_budget, compare_to_baseline, run_report_stages
+from benchmarks.synthetic import generate_transactions
+from comparison import fetch_transactions_json, get_transactions_df
+from lunchmoney_client import LunchMoneyClient
+
+class TestSyntheticTransactions(unittest.TestCase):
+
+    def test_shape_and_mix(self):
+        transactions = generate_transactions(2000, '2024-02-01', '2024-03-31', seed=1)
+        self.assertEqual(len(transactions), 2000)
+        dates = [t['date'] for t in transactions]
+        self.assertEqual(dates, sorted(dates))
+        self.assertGreaterEqual(dates[0], '2024-02-01')
+        self.assertLessEqual(dates[-1], '2024-03-31')
+        self.assertTrue(any(t['is_income'] for t in transactions))
+        self.assertTrue(any(t['exclude_from_totals'] for t in transactions))
+        self.assertTrue(any(t['category_name'] is None for t in transactions))
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(generate_transactions(50, '2024-03-01', '2024-03-31', seed=3),
+                         generate_transactions(50, '2024-03-01', '2024-03-31', seed=3))
+
+class TestFakeServer(unittest.TestCase):
+
+    def test_paginates_and_filters_by_date(self):
+        transactions = generate_transactions(2500, '2024-02-01', '2024-03-31', seed=2)
+        expected = [t['id'] for t in transactions if '2024-03-01' <= t['date'] <= '2024-03-31']
+        with FakeLunchMoneyServer(transactions) as server, LunchMoneyClient(server.url, 'key') as client:
+            fetched = fetch_transactions_json('2024-03-01', '2024-03-31', client)
+            self.assertEqual(sorted(t['id'] for t in fetched), sorted(expected))
+            df = get_transactions_df('2024-02-01', '2024-03-31', client)
+        self.assertEqual(len(df), sum(not t['is_income'] and not t['exclude_from_totals'] for t in transactions))
+
+class TestReportStages(unittest.TestCase):
+
+    def test_writes_to_output_dir_without_changing_directory(self):
+        cwd = os.getcwd()
+        transactions = generate_transactions(200, '2024-02-01', '2024-03-31', seed=3)
+        with FakeLunchMoneyServer(transactions) as server, LunchMoneyClient(server.url, 'key') as client, \
+                tempfile.TemporaryDirectory() as out_dir:
+            timings = {}
+            run_report_stages(client, pd.Timestamp('2024-03-15'), timings, out_dir)
+            self.assertIn('2024-03-15-dashboard.html', os.listdir(out_dir))
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(len(timings['render']), 1)
+
+class TestBaselineComparison(unittest.TestCase):
+
+    def results(self, **medians):
+        return {'sizes': {'1000': {'stages': {stage: {'median': m} for stage, m in medians.items()}}}}
+
+    def test_flags_only_slow_stages(self):
+        baseline = self.results(parse=0.100, render=0.300, fetch=0.001)
+        current = self.results(parse=0.200, render=0.310, fetch=0.004)
+        regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('parse', regressions[0])
+
+class TestMemoryBudget(unittest.TestCase):
+
+    def test_flags_sizes_over_budget(self):
+        results = {'sizes': {
+            '1000': {'memory': {'peak_traced_bytes': 10, 'peak_rss_bytes': 100}},
+            '10000': {'memory': {'peak_traced_bytes': 50, 'peak_rss_bytes': 500}},
+            '100000': {},
+        }}
+        self.assertEqual(check_memory_budget(results), [])
+        violations = check_memory_budget(results, traced_budget=20, rss_budget=1000)
+        self.assertEqual(len(violations), 1)
+        self.assertIn('10000 rows: peak traced', violations[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from datetime import date
+from budgets import Budget, compute_budget_summary
+
+BUDGETS = [
+    {'category_id': 7, 'category_name': 'Food', 'is_income': False, 'exclude_from_budget': False,
+     'data': {'2024-03-01': {'budget_to_base': 400, 'spending_to_base': 150}}},
+    {'category_id': 8, 'category_name': 'Salary', 'is_income': True,
+     'data': {'2024-03-01': {'budget_to_base': 5000, 'spending_to_base': 0}}},
+    {'category_id': 9, 'category_name': 'Rent', 'is_income': False,
+     'data': {'2024-03-01': {'budget_amount': '-1200', 'spending_to_base': 1200}}},
+]
+
+class TestBudgetSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.budgets = [Budget.from_json(b) for b in BUDGETS]
+
+    def test_skips_income_and_fully_spent_categories(self):
+        summary = compute_budget_summary(self.budgets, date(2024, 3, 15))
+        self.assertEqual(summary, {'remainingTotal': 250.0, 'remainingCount': 1, 'totalBudget': 1600.0})
+        self.assertIsNone(compute_budget_summary(self.budgets, date(2024, 4, 1)))
+
+    def test_spending_override(self):
+        summary = compute_budget_summary(self.budgets, date(2024, 3, 1), spending={'Food': 100.0})
+        self.assertEqual(summary, {'remainingTotal': 1500.0, 'remainingCount': 2, 'totalBudget': 1600.0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from chart import ComparisonChart
+
+LAST_X = np.arange(1, 30)
+LAST_Y = np.cumsum(np.full(29, 40.0))
+
+class TestComparisonChart(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.chart = ComparisonChart()
+
+    def tearDown(self):
+        self.chart.close()
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_reuses_artists_across_reports(self):
+        self.chart.update('first', LAST_X, LAST_Y, np.cumsum(np.full(10, 50.0)), np.arange(10, 32), np.linspace(500, 900, 22))
+        self.chart.save(self.path('first.png'))
+        lines = list(self.chart.ax.lines)
+        self.assertEqual(len(self.chart.ax.get_legend().get_texts()), 3)
+
+        self.chart.update('second', LAST_X, LAST_Y * 10, np.cumsum(np.full(31, 5.0)))
+        self.chart.save(self.path('second.png'))
+        self.assertEqual(list(self.chart.ax.lines), lines)
+        self.assertEqual(len(self.chart.ax.collections), 2)
+        self.assertFalse(self.chart.future_line.get_visible())
+        self.assertEqual([t.get_text() for t in self.chart.ax.get_legend().get_texts()], ['Last Month', 'Current Month'])
+        self.assertEqual(self.chart.current_label.get_text(), '$155')
+        # The y-axis follows the new data
+        self.assertGreater(self.chart.ax.get_ylim()[1], LAST_Y[-1] * 10)
+
+    def test_fixed_bbox_is_measured_once(self):
+        with mock.patch.object(self.chart.figure, 'get_tightbbox', wraps=self.chart.figure.get_tightbbox) as tightbbox:
+            for i in range(3):
+                self.chart.update(str(i), LAST_X, LAST_Y * (i + 1), np.cumsum(np.full(12, 30.0)))
+                self.chart.save(self.path(f'{i}.png'))
+        self.assertEqual(tightbbox.call_count, 1)
+
+    def test_svg_output_is_deterministic(self):
+        self.chart.update('svg', LAST_X, LAST_Y, np.cumsum(np.full(12, 30.0)))
+        self.chart.save(self.path('a.svg'))
+        self.chart.save(self.path('b.svg'))
+        with open(self.path('a.svg'), 'rb') as a, open(self.path('b.svg'), 'rb') as b:
+            first = a.read()
+            self.assertTrue(first.lstrip().startswith(b'<?xml'))
+            self.assertEqual(first, b.read())
+        with self.assertRaises(ValueError):
+            self.chart.save(self.path('chart.gif'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,25 @@
+import gzip
+from datetime import date
+import json
 import unittest
 import pandas as pd
-from comparison import calculate_date_boundaries
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+import numpy as np
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from comparison import (build_daily_series, build_report_frames, calculate_date_boundaries, compute_baselines,
+                        compute_comparison, category_totals_payload, concat_transaction_frames, daily_cumulative,
+                        dashboard_data, downsample_series, equivalent_days, iter_cached_transaction_pages, load_net_worth,
+                        load_report_frames, lttb, main, month_day_matrix, write_report_files,
+                        parse_transactions_page, plan_fetch_ranges, prepare_month_df, report_budget, report_fetch_range,
+                        transactions_payload, MONTH_LOOKAHEAD)
+from budgets import Budget
+from lunchmoney_client import LunchMoneyClient
+from transaction_cache import TransactionCache, account_key
 
 class TestDateCalculations(unittest.TestCase):
 
@@ -44,5 +63,448 @@ class TestDateCalculations(unittest.TestCase):
         _, eopm, _ = calculate_date_boundaries(input_dt)
         self.assertEqual(eopm, pd.Timestamp("2024-02-29"))
 
+class TestFetchPlanning(unittest.TestCase):
+
+    def test_adjacent_months_merge_into_one_range(self):
+        ranges = plan_fetch_ranges([
+            (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31")),
+            (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29")),
+        ])
+        self.assertEqual(ranges, [(pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-31"))])
+
+    def test_overlapping_ranges_merge(self):
+        ranges = plan_fetch_ranges([
+            (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-16")),
+            (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31")),
+        ])
+        self.assertEqual(ranges, [(pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31"))])
+
+    def test_report_fetch_range_single_date(self):
+        start, end = report_fetch_range(pd.Timestamp("2024-03-15"))
+        self.assertEqual((start, end), (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-31")))
+
+    def test_report_fetch_range_backfill(self):
+        start, end = report_fetch_range(pd.Timestamp("2024-01-10"), pd.Timestamp("2024-03-05"))
+        self.assertEqual((start, end), (pd.Timestamp("2023-12-01"), pd.Timestamp("2024-03-31")))
+
+    def test_disjoint_ranges_stay_separate(self):
+        ranges = plan_fetch_ranges([
+            (pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-31")),
+            (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31")),
+        ])
+        self.assertEqual(len(ranges), 2)
+
+    def test_cached_months_stream_with_bounded_lookahead(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        cache = TransactionCache(os.path.join(tmpdir.name, 'cache.sqlite'))
+        self.addCleanup(cache.close)
+        with FakeLunchMoneyServer(generate_transactions(2000, '2022-01-01', '2023-12-31', seed=8)) as server, \
+                LunchMoneyClient(server.url, 'key') as client:
+            cache.put_month(account_key(client.hostname, client.headers), date(2022, 3, 1), [raw_transaction(1, '2022-03-04', '1.00')])
+            pages = iter_cached_transaction_pages('2022-01-01', '2023-12-31', client, cache)
+            first = next(pages)
+            self.assertEqual(first[0]['date'][:7], '2022-01')
+            # One request per month: the consumed month plus at most MONTH_LOOKAHEAD ahead of it
+            self.assertLessEqual(server.request_count, 1 + MONTH_LOOKAHEAD)
+            months = [first[0]['date'][:7]] + [page[0]['date'][:7] for page in pages]
+        self.assertEqual(len(months), 24)
+        self.assertEqual(months, sorted(months))
+        self.assertEqual(server.request_count, 23)
+
+def raw_transaction(id, date, amount, payee="Cafe", category="Food", **flags):
+    return {'id': id, 'date': date, 'amount': amount, 'payee': payee, 'category_name': category,
+            'notes': 'dropped', 'plaid_metadata': {'x': 1}, 'tags': [],
+            'is_income': flags.get('is_income', False), 'exclude_from_totals': flags.get('exclude_from_totals', False)}
+
+class TestParsing(unittest.TestCase):
+
+    def test_schema_projection_and_dtypes(self):
+        df = parse_transactions_page([
+            raw_transaction(1, "2024-03-01", "12.3400"),
+            raw_transaction(2, "2024-03-02", "1500.0000", is_income=True),
+            raw_transaction(3, "2024-03-03", "7.5000", exclude_from_totals=True),
+        ])
+        self.assertEqual(list(df.columns), ['id', 'date', 'amount', 'payee', 'category_name', 'is_income', 'exclude_from_totals'])
+        self.assertEqual(list(df['id']), [1])
+        self.assertEqual(df['amount'].dtype, np.float32)
+        self.assertEqual(df['category_name'].dtype, 'category')
+        self.assertEqual(df['is_income'].dtype, bool)
+
+    def test_concat_keeps_categoricals(self):
+        first = parse_transactions_page([raw_transaction(1, "2024-03-01", "1.00", category="Food")])
+        second = parse_transactions_page([raw_transaction(2, "2024-03-02", "2.00", category="Rent", payee=None)])
+        df = concat_transaction_frames([first, second])
+        self.assertEqual(df['category_name'].dtype, 'category')
+        self.assertEqual(list(df['category_name']), ['Food', 'Rent'])
+        self.assertTrue(pd.isna(df['payee'].iloc[1]))
+
+def make_month_df(rows):
+    return pd.DataFrame({
+        'date': pd.to_datetime([d for d, _ in rows]),
+        'amount': [a for _, a in rows],
+    })
+
+class TestDailySeries(unittest.TestCase):
+
+    def test_daily_cumulative_forward_fills(self):
+        df = make_month_df([("2024-02-03", 5.0), ("2024-02-03", 1.0), ("2024-02-10", 4.0)])
+        cumulative = daily_cumulative(df, pd.Timestamp("2024-02-01"))
+        self.assertEqual(len(cumulative), 29)
+        self.assertEqual(cumulative[1], 0.0)
+        self.assertEqual(cumulative[2], 6.0)
+        self.assertEqual(cumulative[8], 6.0)
+        self.assertEqual(cumulative[-1], 10.0)
+
+    def test_series_slices_current_and_future(self):
+        all_txns = make_month_df([("2024-02-10", 5.0), ("2024-03-02", 10.0), ("2024-03-20", 7.0)])
+        input_dt = pd.Timestamp("2024-03-15")
+        series = build_daily_series(input_dt, *build_report_frames(all_txns, input_dt))
+        self.assertEqual(len(series['current']), 15)
+        self.assertEqual(series['current'][-1], 10.0)
+        self.assertEqual(len(series['future']), 17)
+        self.assertEqual(series['future'][0], 10.0)
+        self.assertEqual(series['future'][-1], 17.0)
+        self.assertAlmostEqual(series['last_x'][-1], 31.0)
+
+    def test_no_future_on_last_day_of_month(self):
+        all_txns = make_month_df([("2024-02-10", 5.0), ("2024-03-02", 10.0)])
+        input_dt = pd.Timestamp("2024-03-31")
+        series = build_daily_series(input_dt, *build_report_frames(all_txns, input_dt))
+        self.assertEqual(len(series['future']), 0)
+
+class TestComparison(unittest.TestCase):
+
+    def compare(self, input_dt, rows):
+        return compute_comparison(input_dt, build_daily_series(input_dt, *build_report_frames(make_month_df(rows), input_dt)))
+
+    def test_compare_against_equivalent_day(self):
+        comparison = self.compare(pd.Timestamp("2024-03-15"), [
+            ("2024-02-03", 5.0), ("2024-02-14", 15.0), ("2024-02-25", 100.0),
+            ("2024-03-02", 10.0), ("2024-03-10", 20.0),
+        ])
+        # 15/31 of February (29 days) rounds up to day 15, whose end-of-day total carries over from the 14th
+        self.assertEqual(comparison['equivalent_day_last_month'], 15)
+        self.assertEqual(comparison['cumulative_amount_on_equivalent_day_last_month_val'], 20.0)
+        self.assertEqual(comparison['this_month_total'], 30.0)
+        self.assertEqual(comparison['diff'], 10.0)
+        self.assertAlmostEqual(comparison['percent_diff'], 50.0)
+        self.assertEqual(comparison['last_month_total_end'], 120.0)
+
+    def test_empty_previous_month(self):
+        comparison = self.compare(pd.Timestamp("2024-03-15"), [("2024-03-02", 10.0)])
+        self.assertEqual(comparison['cumulative_amount_on_equivalent_day_last_month_val'], 0.0)
+        self.assertEqual(comparison['percent_diff'], 0.0)
+
+class TestBaselines(unittest.TestCase):
+
+    ROWS = [
+        ("2023-03-05", 40.0), ("2023-03-20", 60.0),
+        ("2024-01-10", 30.0), ("2024-01-31", 5.0),
+        ("2024-02-03", 5.0), ("2024-02-14", 15.0), ("2024-02-25", 100.0),
+        ("2024-03-02", 10.0), ("2024-03-10", 20.0), ("2024-03-20", 50.0),
+    ]
+
+    def test_matrix_rows_match_daily_cumulative(self):
+        df = make_month_df(self.ROWS)
+        matrix = month_day_matrix(df, pd.Timestamp("2024-01-01"), 3)
+        self.assertEqual(matrix.shape, (3, 31))
+        feb = df[df['date'].dt.month == 2]
+        np.testing.assert_array_equal(matrix[1, :29], daily_cumulative(feb, pd.Timestamp("2024-02-01")))
+        self.assertTrue(np.isnan(matrix[1, 29:]).all())
+        self.assertFalse(np.isnan(matrix[0]).any())
+
+    def test_equivalent_days_per_month_length(self):
+        np.testing.assert_array_equal(equivalent_days(pd.Timestamp("2024-03-15"), np.array([29, 30, 31])), [15, 15, 15])
+        np.testing.assert_array_equal(equivalent_days(pd.Timestamp("2024-02-29"), np.array([28, 31])), [28, 31])
+
+    def test_previous_month_matches_single_comparison(self):
+        input_dt = pd.Timestamp("2024-03-15")
+        df = make_month_df(self.ROWS)
+        baselines = compute_baselines(input_dt, df, 2)
+        comparison = compute_comparison(input_dt, build_daily_series(input_dt, *build_report_frames(df, input_dt)))
+        previous = baselines['previous_months'][0]
+        self.assertEqual(previous['month'], '2024-02')
+        self.assertEqual(previous['equivalent_day'], comparison['equivalent_day_last_month'])
+        self.assertEqual(previous['amount'], comparison['cumulative_amount_on_equivalent_day_last_month_val'])
+        self.assertEqual(baselines['current'], comparison['this_month_total'])
+
+    def test_last_year_and_trailing_average(self):
+        baselines = compute_baselines(pd.Timestamp("2024-03-15"), make_month_df(self.ROWS), 2)
+        self.assertEqual([b['month'] for b in baselines['previous_months']], ['2024-02', '2024-01'])
+        self.assertEqual(baselines['same_month_last_year']['month'], '2023-03')
+        self.assertEqual(baselines['same_month_last_year']['amount'], 40.0)
+        self.assertEqual(baselines['same_month_last_year']['total'], 100.0)
+        # February has 20.0 and January 30.0 by their equivalent days
+        self.assertEqual(baselines['trailing_average']['amount'], 25.0)
+        self.assertEqual(baselines['trailing_average']['diff'], 5.0)
+
+class TestDashboardPayload(unittest.TestCase):
+
+    def setUp(self):
+        self.df = prepare_month_df(pd.DataFrame({
+            'date': pd.to_datetime(["2024-03-02", "2024-03-05", "2024-03-05"]),
+            'amount': [10.0, 20.0, 5.0],
+            'payee': ["Cafe", None, "Shop"],
+            'category_name': ["Food", None, "nan"],
+        }))
+
+    def test_transactions_newest_first_with_blank_labels(self):
+        rows = transactions_payload(self.df)
+        self.assertEqual([r['date'] for r in rows], ['Mar 05', 'Mar 05', 'Mar 02'])
+        self.assertEqual(rows[0], {'date': 'Mar 05', 'amount': 20.0, 'payee': '', 'category': ''})
+        self.assertEqual(rows[1]['category'], '')
+
+    def test_missing_categories_grouped_as_uncategorized(self):
+        self.assertEqual(category_totals_payload(self.df), [
+            {'name': 'uncategorized', 'amount': 25.0},
+            {'name': 'Food', 'amount': 10.0},
+        ])
+
+    def test_empty_month(self):
+        empty = prepare_month_df(make_month_df([]))
+        self.assertEqual(transactions_payload(empty), [])
+        self.assertEqual(category_totals_payload(empty), [])
+
+class TestNoTransactions(unittest.TestCase):
+
+    def test_library_returns_empty_frame_and_cli_exits(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmpdir.name)
+        with FakeLunchMoneyServer([]) as server, \
+                mock.patch.dict(os.environ, {'LM_HOSTNAME': server.url, 'LM_API_KEY': 'key'}), \
+                mock.patch('builtins.print') as printed:
+            with LunchMoneyClient(server.url, 'key') as client:
+                current, last, _ = load_report_frames(pd.Timestamp('2024-03-15'), client)
+            self.assertTrue(current.empty and last.empty)
+            with self.assertRaises(SystemExit):
+                main(['--date', '2024-03-15', '--no-cache'])
+        printed.assert_any_call("No transaction data found between 2024-02-01 and 2024-03-31.")
+
+class TestArguments(unittest.TestCase):
+
+    def test_baselines_rejected_with_backfill(self):
+        with mock.patch('sys.stderr'), self.assertRaises(SystemExit) as ctx:
+            main(['--from', '2024-03-01', '--to', '2024-03-05', '--baselines', '3'])
+        self.assertEqual(ctx.exception.code, 2)
+
+class TestBudgetProjection(unittest.TestCase):
+
+    BUDGETS = [
+        # The API reports the whole month's spending: fully spent by the time it is fetched
+        {'category_name': 'Rent', 'is_income': False, 'data': {'2024-03-01': {'budget_to_base': 100000, 'spending_to_base': 100000}}},
+        {'category_name': 'Pets', 'is_income': False, 'data': {'2024-03-01': {'budget_to_base': 50000, 'spending_to_base': 0}}},
+        {'category_name': 'Salary', 'is_income': True, 'data': {'2024-03-01': {'budget_to_base': 5000}}},
+    ]
+
+    def test_budgets_fetched_once_per_closed_month_and_used_for_projection(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmpdir.name)
+        transactions = generate_transactions(300, '2024-02-01', '2024-03-31', seed=4)
+        argv = ['--date', '2024-03-15', '--no-png', '--html-mode', 'split', '--cache-path', 'cache.sqlite']
+        with FakeLunchMoneyServer(transactions, budgets=self.BUDGETS) as server, \
+                mock.patch.dict(os.environ, {'LM_HOSTNAME': server.url, 'LM_API_KEY': 'key'}), \
+                mock.patch('builtins.print'):
+            main(argv)
+            requests_after_first = server.request_count
+            main(argv + ['--force-render'])
+            # Every month is closed by now, budgets included, so nothing is refetched
+            self.assertEqual(server.request_count, requests_after_first)
+        with open('2024-03-15-dashboard.json', encoding='utf-8') as f:
+            summary = json.load(f)['summary']
+        # A past month: what was left on March 15th, not what the API reports now
+        spent = {category: sum(float(t['amount']) for t in transactions
+                               if t['category_name'] == category and '2024-03-01' <= t['date'] <= '2024-03-15'
+                               and not t['is_income'] and not t['exclude_from_totals'])
+                 for category in ('Rent', 'Pets')}
+        remaining = (100000 - spent['Rent']) + (50000 - spent['Pets'])
+        self.assertTrue(summary['hasBudget'])
+        self.assertAlmostEqual(summary['budgetRemainingTotal'], remaining, places=1)
+        self.assertEqual(summary['budgetRemainingCount'], 2)
+        self.assertAlmostEqual(summary['projectedTotal'], summary['currentMonthTotal'] + remaining, places=1)
+
+    def test_only_a_report_dated_today_uses_the_reported_spending(self):
+        budgets = {date(2024, 3, 1): [Budget.from_json(b) for b in self.BUDGETS]}
+        current = prepare_month_df(parse_transactions_page([raw_transaction(1, '2024-03-02', '10.00', category='Pets')]))
+        self.assertEqual(report_budget(budgets, pd.Timestamp('2024-03-15'), current, today=date(2024, 3, 15))['remainingTotal'], 50000.0)
+        self.assertEqual(report_budget(budgets, pd.Timestamp('2024-03-15'), current, today=date(2024, 5, 1))['remainingTotal'], 149990.0)
+        # Earlier this month: the API's figure would count spending after the report's date
+        self.assertEqual(report_budget(budgets, pd.Timestamp('2024-03-15'), current, today=date(2024, 3, 16))['remainingTotal'], 149990.0)
+        self.assertIsNone(report_budget(budgets, pd.Timestamp('2024-04-15'), current))
+
+    def test_falls_back_to_daily_average_without_budgets(self):
+        df = concat_transaction_frames([parse_transactions_page(generate_transactions(200, '2024-02-01', '2024-03-31', seed=5))])
+        input_date = pd.Timestamp('2024-03-10')
+        current, last, full = build_report_frames(df, input_date)
+        series = build_daily_series(input_date, current, last, full)
+        summary = dashboard_data(input_date=input_date, current_month_df=current, series=series,
+                                 **compute_comparison(input_date, series))['summary']
+        self.assertFalse(summary['hasBudget'])
+        self.assertEqual(summary['projectedTotal'], round(summary['currentMonthTotal'] / 10 * 31, 2))
+
+class TestNetWorth(unittest.TestCase):
+
+    ASSETS = [{'id': 1, 'name': 'Savings', 'type_name': 'cash', 'balance': '2500.00'}]
+    PLAID_ACCOUNTS = [{'id': 2, 'name': 'Visa', 'type': 'credit', 'balance': '300.00'}]
+
+    def test_only_a_report_dated_today_fetches_balances(self):
+        with FakeLunchMoneyServer([], assets=self.ASSETS, plaid_accounts=self.PLAID_ACCOUNTS) as server, \
+                LunchMoneyClient(server.url, 'key') as client:
+            self.assertIsNone(load_net_worth(client, pd.Timestamp('2024-03-14'), today=date(2024, 3, 15)))
+            self.assertEqual(server.request_count, 0)
+            net_worth = load_net_worth(client, pd.Timestamp('2024-03-15'), today=date(2024, 3, 15))
+        self.assertEqual(net_worth, {'current': 2200.0, 'count': 2})
+
+    def test_dashboard_shows_net_worth(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        input_date = pd.Timestamp('2024-03-10')
+        df = concat_transaction_frames([parse_transactions_page(generate_transactions(50, '2024-02-01', '2024-03-31', seed=6))])
+        current, last, full = build_report_frames(df, input_date)
+        series = build_daily_series(input_date, current, last, full)
+        comparison = compute_comparison(input_date, series)
+        write_report_files(input_date, comparison, current, series, png=False, html_mode='split',
+                           output_dir=tmpdir.name, net_worth={'current': 2200.0, 'count': 2})
+        with open(os.path.join(tmpdir.name, '2024-03-10-dashboard.json'), encoding='utf-8') as f:
+            summary = json.load(f)['summary']
+        self.assertTrue(summary['hasNetWorth'])
+        self.assertEqual((summary['netWorth'], summary['netWorthCount']), (2200.0, 2))
+        self.assertFalse(dashboard_data(input_date=input_date, current_month_df=current, series=series,
+                                        **comparison)['summary']['hasNetWorth'])
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.output_dir = tmpdir.name
+        df = concat_transaction_frames([parse_transactions_page(generate_transactions(200, '2024-02-01', '2024-03-31', seed=4))])
+        self.input_date = pd.Timestamp('2024-03-15')
+        self.current, last, full = build_report_frames(df, self.input_date)
+        self.series = build_daily_series(self.input_date, self.current, last, full)
+        self.comparison = compute_comparison(self.input_date, self.series)
+
+    def write(self, series=None, **kwargs):
+        # Stands in for matplotlib; the file only has to exist
+        touch = lambda path, *args: open(path, 'wb').close()
+        with mock.patch('comparison.render_comparison_chart', side_effect=touch) as render:
+            paths = write_report_files(self.input_date, self.comparison, self.current, series or self.series,
+                                       max_embedded_transactions=50, output_dir=self.output_dir, **kwargs)
+        return paths, render.call_count
+
+    def test_unchanged_inputs_reuse_existing_files(self):
+        paths, renders = self.write()
+        self.assertEqual(renders, 1)
+        self.assertEqual(len(paths), 3)
+        html_path = paths[-1]
+        mtime = os.stat(html_path).st_mtime_ns
+        self.assertEqual(self.write(), (paths, 0))
+        self.assertEqual(os.stat(html_path).st_mtime_ns, mtime)
+        self.assertEqual(self.write(reuse_unchanged=False)[1], 1)
+
+    def test_changed_or_missing_files_are_rewritten(self):
+        paths, _ = self.write()
+        changed = dict(self.series, current=self.series['current'] + 1)
+        self.assertEqual(self.write(series=changed)[1], 1)
+        os.remove(paths[-1])
+        self.write(series=changed)
+        self.assertTrue(os.path.exists(paths[-1]))
+
+class TestSplitDashboard(unittest.TestCase):
+
+    def test_shared_shell_and_compressed_data_files(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        df = concat_transaction_frames([parse_transactions_page(generate_transactions(400, '2024-02-01', '2024-03-31', seed=6))])
+        for day in ('2024-03-14', '2024-03-15'):
+            input_date = pd.Timestamp(day)
+            current, last, full = build_report_frames(df, input_date)
+            series = build_daily_series(input_date, current, last, full)
+            paths = write_report_files(input_date, compute_comparison(input_date, series), current, series, png=False,
+                                       output_dir=tmpdir.name, html_mode='split', precompress=True)
+
+        files = sorted(os.listdir(tmpdir.name))
+        shells = [name for name in files if name.startswith('dashboard-') and name.endswith('.html')]
+        self.assertEqual(len(shells), 1)
+        with open(os.path.join(tmpdir.name, shells[0]), encoding='utf-8') as f:
+            shell = f.read()
+        self.assertNotIn('__DATA_JSON__', shell)
+        self.assertIn("-dashboard.json'", shell)
+        with open(os.path.join(tmpdir.name, '2024-03-15-dashboard.json'), encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['summary']['date'], '2024-03-15')
+        with gzip.open(os.path.join(tmpdir.name, '2024-03-15-dashboard.json.gz'), 'rt', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), data)
+        with open(os.path.join(tmpdir.name, '2024-03-15-dashboard.html'), encoding='utf-8') as f:
+            self.assertIn(f'{shells[0]}?date=2024-03-15', f.read())
+        self.assertIn(os.path.join(tmpdir.name, '2024-03-15-dashboard.json.gz'), paths)
+
+class TestDownsampling(unittest.TestCase):
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+        y[437] = 25.0
+        sampled_x, sampled_y = lttb(x, y, 40)
+        self.assertEqual(len(sampled_x), 40)
+        self.assertEqual((sampled_x[0], sampled_x[-1]), (0, 999))
+        self.assertTrue(np.all(np.diff(sampled_x) > 0))
+        self.assertIn(437, sampled_x)
+        short_x, short_y = x[:30], y[:30]
+        self.assertIs(lttb(short_x, short_y, 40)[0], short_x)
+
+    def test_report_respects_point_budget(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        df = concat_transaction_frames([parse_transactions_page(generate_transactions(400, '2024-02-01', '2024-03-31', seed=7))])
+        input_date = pd.Timestamp('2024-03-20')
+        current, last, full = build_report_frames(df, input_date)
+        series = build_daily_series(input_date, current, last, full)
+        sampled = downsample_series(input_date, series, 8)
+        self.assertEqual(sampled['current_x'][-1], len(series['current']))
+        self.assertEqual(sampled['current'][-1], series['current'][-1])
+        self.assertIs(downsample_series(input_date, series, None), series)
+
+        write_report_files(input_date, compute_comparison(input_date, series), current, series, png=False,
+                           output_dir=tmpdir.name, html_mode='split', max_chart_points=8)
+        with open(os.path.join(tmpdir.name, '2024-03-20-dashboard.json'), encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(len(data['currentMonthChart']), 8)
+        self.assertLessEqual(len(data['lastMonthChart']), 8)
+        self.assertEqual(data['summary']['currentMonthTotal'], round(float(series['current'][-1]), 2))
+
+class TestRecordReplay(unittest.TestCase):
+
+    def test_replay_reproduces_the_recorded_run_offline(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmpdir.name)
+        argv = ['--date', '2024-03-15', '--no-png']
+        with FakeLunchMoneyServer(generate_transactions(300, '2024-02-01', '2024-03-31', seed=3)) as server, \
+                mock.patch.dict(os.environ, {'LM_HOSTNAME': server.url, 'LM_API_KEY': 'key'}), \
+                mock.patch('builtins.print'):
+            main(argv + ['--record', 'recording'])
+        with open('2024-03-15-dashboard.html', encoding='utf-8') as f:
+            recorded = f.read()
+        os.remove('2024-03-15-dashboard.html')
+        # The server is gone: everything comes from the recording
+        with mock.patch.dict(os.environ, {'LM_HOSTNAME': 'http://127.0.0.1:1'}), mock.patch('builtins.print'):
+            main(argv + ['--replay', 'recording'])
+        with open('2024-03-15-dashboard.html', encoding='utf-8') as f:
+            self.assertEqual(f.read(), recorded)
+
+class TestImport(unittest.TestCase):
+
+    def test_import_does_not_load_plotting_or_http(self):
+        code = "import sys, comparison; print('matplotlib' in sys.modules, 'requests' in sys.modules or 'httpx' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip(), "False False")
+
 if __name__ == '__main__':
     unittest.main()
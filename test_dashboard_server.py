@@ -0,0 +1,201 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import date
+from http.server import ThreadingHTTPServer
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from dashboard_server import DashboardService, TTLCache, make_handler
+from lunchmoney_client import LunchMoneyClient
+from transaction_cache import TransactionCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(clock)
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(cache.get_or_compute('k', 10, compute), 1)
+        clock.now = 9
+        self.assertEqual(cache.get_or_compute('k', 10, compute), 1)
+        clock.now = 10
+        self.assertEqual(cache.get_or_compute('k', 10, compute), 2)
+
+    def test_coalesces_concurrent_misses(self):
+        cache = TTLCache()
+        calls = []
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', 60, slow))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(cache.stats()['coalesced'], 4)
+
+    def test_prunes_expired_entries_and_evicts_least_recently_used(self):
+        clock = FakeClock()
+        cache = TTLCache(clock, max_entries=3)
+        for key in 'abc':
+            cache.get_or_compute(key, 100, lambda: key)
+        cache.get_or_compute('a', 100, lambda: 'recomputed')
+        cache.get_or_compute('d', 100, lambda: 'd')
+        # 'b' was the least recently used
+        self.assertEqual(cache.get_or_compute('a', 100, lambda: 'recomputed'), 'a')
+        self.assertEqual(cache.get_or_compute('b', 100, lambda: 'again'), 'again')
+        self.assertEqual(cache.stats()['entries'], 3)
+        cache.get_or_compute('short', 5, lambda: 'x')
+        clock.now = 200
+        cache.get_or_compute('e', 100, lambda: 'e')
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_failures_are_not_cached(self):
+        cache = TTLCache()
+        def fail():
+            raise RuntimeError('upstream down')
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute('k', 60, fail)
+        self.assertEqual(cache.get_or_compute('k', 60, lambda: 'ok'), 'ok')
+
+class TestDashboardService(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = generate_transactions(500, '2024-01-01', '2024-03-31', seed=4)
+        self.upstream = FakeLunchMoneyServer(self.transactions).start()
+        self.client = LunchMoneyClient(self.upstream.url, 'key')
+        self.service = DashboardService(self.client, today=lambda: date(2024, 3, 20))
+
+    def tearDown(self):
+        self.client.close()
+        self.upstream.stop()
+
+    def test_overlapping_ranges_share_cached_months(self):
+        self.service.transactions(date(2024, 2, 1), date(2024, 3, 20))
+        requests_after_first = self.upstream.request_count
+        response = self.service.transactions(date(2024, 1, 15), date(2024, 3, 31))
+        # Only January is new
+        self.assertEqual(self.upstream.request_count, requests_after_first + 1)
+        self.assertIn(b'"has_more":false', response.body)
+
+    def test_closed_months_outlive_the_open_month(self):
+        self.assertGreater(self.service.month_ttl(date(2024, 1, 1)), self.service.month_ttl(date(2024, 3, 1)))
+
+    def test_report_is_served_from_cache(self):
+        first = self.service.report(date(2024, 3, 15))
+        requests = self.upstream.request_count
+        self.assertIs(self.service.report(date(2024, 3, 15)), first)
+        self.assertEqual(self.upstream.request_count, requests)
+        self.assertEqual(self.service.report_data(date(2024, 3, 15))['summary']['date'], '2024-03-15')
+
+    def test_report_projection_uses_budgets(self):
+        self.upstream.budgets = [{'category_name': 'Rent', 'data': {'2024-03-01': {'budget_to_base': 3000, 'spending_to_base': 1000}}}]
+        # Dated today, so the API's spending so far applies
+        summary = self.service.report_data(date(2024, 3, 20))['summary']
+        self.assertTrue(summary['hasBudget'])
+        self.assertEqual(summary['budgetRemainingTotal'], 2000.0)
+        self.assertAlmostEqual(summary['projectedTotal'], summary['currentMonthTotal'] + 2000.0, places=1)
+
+    def test_todays_report_shows_net_worth(self):
+        self.upstream.assets = [{'id': 1, 'name': 'Savings', 'type_name': 'cash', 'balance': '1000.00'}]
+        summary = self.service.report_data(date(2024, 3, 20))['summary']
+        self.assertEqual((summary['netWorth'], summary['netWorthCount']), (1000.0, 1))
+        # Balances are only known as of now
+        self.assertFalse(self.service.report_data(date(2024, 3, 15))['summary']['hasNetWorth'])
+
+    def test_http_etag_round_trip(self):
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(self.service))
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        try:
+            url = f"{base}/api/dashboard?date=2024-03-15"
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers['ETag']
+                self.assertTrue(etag)
+            request = urllib.request.Request(url, headers={'If-None-Match': etag})
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(request)
+            self.assertEqual(ctx.exception.code, 304)
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"{base}/api/transactions?start_date=2024-03-01")
+            self.assertEqual(ctx.exception.code, 400)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+class TestRollupViews(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite')
+        self.transactions = generate_transactions(500, '2023-06-01', '2024-03-31', seed=8)
+        self.upstream = FakeLunchMoneyServer(self.transactions).start()
+        self.client = LunchMoneyClient(self.upstream.url, 'key')
+
+    def tearDown(self):
+        self.client.close()
+        self.upstream.stop()
+        self.tmpdir.cleanup()
+
+    def open_store(self):
+        store = TransactionCache(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def service(self, store):
+        return DashboardService(self.client, store=store, today=lambda: date(2024, 3, 20))
+
+    def test_trend_matches_raw_sums(self):
+        body = json.loads(self.service(self.open_store()).handle('/api/trend', {'date': '2024-03-15'}).body)
+        months = {m['month']: m for m in body['months']}
+        self.assertEqual(min(months), '2023-06')
+        for key in ('2023-09', '2024-03'):
+            expected = sum(float(t['amount']) for t in self.transactions
+                           if t['date'][:7] == key and t['date'] <= '2024-03-15'
+                           and not t.get('is_income') and not t.get('exclude_from_totals'))
+            self.assertAlmostEqual(months[key]['spending'], expected, places=1)
+
+    def test_open_month_follows_the_service_ttl_not_the_store(self):
+        store = self.open_store()
+        service = DashboardService(self.client, ttls={'transactions': 0}, store=store, today=lambda: date(2024, 3, 20))
+        # Fresh by the store's 15-minute open-month TTL, expired by the service's
+        store.put_month(service.account, date(2024, 3, 1), [])
+        requests = self.upstream.request_count
+        self.assertTrue(service.month_transactions(date(2024, 3, 1)))
+        self.assertEqual(self.upstream.request_count, requests + 1)
+
+    def test_views_are_served_from_the_store_after_a_restart(self):
+        self.service(self.open_store()).handle('/api/trend', {'date': '2024-03-15'})
+        requests = self.upstream.request_count
+        service = self.service(self.open_store())
+        query = {'start_date': '2023-10-01', 'end_date': '2023-12-31'}
+        categories = json.loads(service.handle('/api/categories', query).body)
+        days = json.loads(service.handle('/api/day_of_week', query).body)
+        # Closed months were read back from disk
+        self.assertEqual(self.upstream.request_count, requests)
+        self.assertTrue(categories['categories'])
+        self.assertEqual(len(days['days']), 7)
+
+    def test_rollup_routes_need_a_store(self):
+        self.assertIsNone(self.service(None).handle('/api/trend', {}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+
+import httpx
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from lunchmoney_async import AsyncLunchMoneyClient, fetch_net_worth
+from lunchmoney_client import LunchMoneyClient, RecordingNotFound
+
+BUDGETS = [
+    {'category_id': 7, 'category_name': 'Food', 'is_income': False,
+     'data': {'2024-03-01': {'budget_to_base': 400, 'spending_to_base': 150}}},
+]
+ASSETS = [{'id': 1, 'name': 'Savings', 'type_name': 'cash', 'balance': '1000.00'}]
+PLAID_ACCOUNTS = [{'id': 5, 'name': 'Visa', 'type': 'credit', 'balance': '100.00'}]
+
+def counting_transport(max_in_flight: list[int], status=200, body=None):
+    """A MockTransport whose requests overlap for a moment, recording the most in flight at once."""
+    in_flight = [0]
+
+    async def handler(request):
+        in_flight[0] += 1
+        max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return httpx.Response(status, json=body if body is not None else {})
+
+    return httpx.MockTransport(handler)
+
+class TestAsyncLunchMoneyClient(unittest.TestCase):
+
+    def test_fetches_all_endpoints_concurrently_with_typed_results(self):
+        transactions = generate_transactions(2500, '2024-03-01', '2024-03-31', seed=3)
+        with FakeLunchMoneyServer(transactions, budgets=BUDGETS, assets=ASSETS, plaid_accounts=PLAID_ACCOUNTS) as server:
+            async def fetch():
+                async with AsyncLunchMoneyClient(server.url, 'key') as client:
+                    return await client.fetch_dashboard(date(2024, 3, 1), date(2024, 3, 31),
+                                                        date(2024, 3, 1), date(2024, 3, 31))
+            snapshot = asyncio.run(fetch())
+        # Three pages of transactions
+        self.assertEqual(len(snapshot.transactions), 2500)
+        self.assertIsInstance(snapshot.transactions[0].date, date)
+        self.assertEqual(snapshot.budgets[0].months['2024-03-01'].budget, 400.0)
+        self.assertEqual(snapshot.assets[0].balance, 1000.0)
+        self.assertEqual(snapshot.plaid_accounts[0].type, 'credit')
+
+    def test_concurrency_is_bounded(self):
+        for max_concurrency, request_slots, expected in ((4, None, 4), (2, None, 2), (4, threading.BoundedSemaphore(1), 1)):
+            max_in_flight = [0]
+            async def fetch():
+                async with AsyncLunchMoneyClient('http://lm.test', 'key', max_concurrency=max_concurrency,
+                                                 request_slots=request_slots,
+                                                 transport=counting_transport(max_in_flight)) as client:
+                    await asyncio.gather(*(client.get(f'/v1/assets/{i}') for i in range(6)))
+            asyncio.run(fetch())
+            self.assertEqual(max_in_flight[0], expected)
+
+    def test_retries_throttled_requests(self):
+        responses = [httpx.Response(429, headers={'Retry-After': '0'}), httpx.Response(200, json={'assets': ASSETS})]
+        transport = httpx.MockTransport(lambda request: responses.pop(0))
+        async def fetch():
+            async with AsyncLunchMoneyClient('http://lm.test', 'key', transport=transport) as client:
+                return await client.fetch_assets(), client.retries
+        assets, retries = asyncio.run(fetch())
+        self.assertEqual((assets[0].name, retries), ('Savings', 1))
+
+    def test_recordings_are_shared_with_the_sync_client(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with FakeLunchMoneyServer([], assets=ASSETS, plaid_accounts=PLAID_ACCOUNTS) as server, \
+                    LunchMoneyClient(server.url, 'key', record_dir=directory) as client:
+                self.assertEqual(fetch_net_worth(client), {'current': 900.0, 'count': 2})
+            with LunchMoneyClient('http://127.0.0.1:1', 'key', replay_dir=directory) as client:
+                client.session.get = mock.Mock(side_effect=AssertionError('network used'))
+                self.assertEqual(client.get('/v1/assets'), {'assets': ASSETS})
+                async def fetch():
+                    async with AsyncLunchMoneyClient.from_client(client) as async_client:
+                        return await async_client.fetch_budgets(date(2024, 3, 1), date(2024, 3, 31))
+                with self.assertRaises(RecordingNotFound):
+                    asyncio.run(fetch())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from lunchmoney_client import LunchMoneyClient, RecordingNotFound, TokenBucket, recording_path, retry_after_seconds
+
+class TestLunchMoneyClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = LunchMoneyClient("http://localhost", "key", max_workers=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_headers(self):
+        self.assertEqual(self.client.session.headers["Authorization"], "Bearer key")
+        self.assertIn("gzip", self.client.session.headers["Accept-Encoding"])
+
+    def test_map_concurrently_preserves_order(self):
+        def slow_square(n):
+            time.sleep(0.01 * (5 - n))
+            return n * n
+        self.assertEqual(self.client.map_concurrently(slow_square, range(5)), [0, 1, 4, 9, 16])
+
+    def test_map_concurrently_overlaps_requests(self):
+        barrier = threading.Barrier(3, timeout=2)
+        # Would time out (BrokenBarrierError) if the calls ran one after another
+        self.client.map_concurrently(lambda _: barrier.wait(), range(3))
+
+    def test_single_item_runs_inline(self):
+        self.assertEqual(self.client.map_concurrently(lambda _: threading.current_thread(), [1]),
+                         [threading.current_thread()])
+
+    def test_nested_pools_stay_within_max_workers(self):
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        def fake_get(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return fake_response(200)
+        self.client.session.get = fake_get
+        # Two outer tasks, each fanning out on its own pool (as fetch_with_budgets does)
+        self.client.map_concurrently(
+            lambda outer: self.client.map_concurrently(lambda i: self.client.get('/v1/x', {'o': outer, 'i': i}), range(4)),
+            range(2),
+        )
+        self.assertEqual(peak[0], 4)
+
+def fake_response(status, body=b'{}', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.client = LunchMoneyClient("http://localhost", "key", max_retries=3)
+        self.sleep = mock.patch('lunchmoney_client.time.sleep').start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(self.client.close)
+
+    def respond(self, *responses):
+        self.client.session.get = mock.Mock(side_effect=list(responses))
+
+    def test_honours_retry_after_on_429(self):
+        self.respond(fake_response(429, headers={'Retry-After': '2'}), fake_response(200, b'{"ok":true}'))
+        self.assertEqual(self.client.get('/v1/assets'), {'ok': True})
+        self.sleep.assert_called_once_with(2.0)
+        self.assertEqual(self.client.retries, 1)
+
+    def test_backs_off_on_5xx_then_gives_up(self):
+        self.respond(*[fake_response(503)] * 4)
+        with self.assertRaises(requests.HTTPError):
+            self.client.get('/v1/assets')
+        self.assertEqual(self.client.session.get.call_count, 4)
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        self.assertTrue(all(0 <= d <= 0.5 * 2 ** i for i, d in enumerate(delays)))
+
+    def test_retries_connection_errors(self):
+        self.respond(requests.ConnectionError('reset'), fake_response(200))
+        self.assertEqual(self.client.get('/v1/assets'), {})
+
+    def test_client_errors_are_not_retried(self):
+        self.respond(fake_response(404))
+        with self.assertRaises(requests.HTTPError):
+            self.client.get('/v1/assets')
+        self.sleep.assert_not_called()
+
+    def test_retry_after_http_date(self):
+        response = fake_response(429, headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(retry_after_seconds(response), 0.0)
+
+class TestCoalescing(unittest.TestCase):
+
+    def test_identical_requests_in_flight_share_one_call(self):
+        client = LunchMoneyClient("http://localhost", "key", max_workers=4)
+        self.addCleanup(client.close)
+        release = threading.Event()
+        def slow_get(*args, **kwargs):
+            release.wait(2)
+            return fake_response(200, b'[1]')
+        client.session.get = mock.Mock(side_effect=slow_get)
+        threading.Timer(0.1, release.set).start()
+        results = client.map_concurrently(lambda _: client.get('/v1/budgets', {'start_date': '2024-01-01'}), range(4))
+        self.assertEqual(results, [[1]] * 4)
+        self.assertEqual(client.session.get.call_count, 1)
+        self.assertEqual(client.coalesced, 3)
+
+class TestRecordReplay(unittest.TestCase):
+
+    def test_replays_recorded_responses_offline(self):
+        params = {'start_date': '2024-03-01', 'end_date': '2024-03-31', 'offset': 0, 'limit': 1000}
+        with tempfile.TemporaryDirectory() as directory:
+            with FakeLunchMoneyServer(generate_transactions(50, '2024-03-01', '2024-03-31', seed=2)) as server, \
+                    LunchMoneyClient(server.url, 'key', record_dir=directory) as client:
+                recorded = client.get('/v1/transactions', params)
+            self.assertTrue(os.path.exists(recording_path(directory, '/v1/transactions', params)))
+            with LunchMoneyClient('http://127.0.0.1:1', 'key', replay_dir=directory) as client:
+                client.session.get = mock.Mock(side_effect=AssertionError('network used'))
+                # Parameter order and types do not change the key
+                self.assertEqual(client.get('/v1/transactions', dict(reversed(list(params.items())))), recorded)
+                with self.assertRaises(RecordingNotFound):
+                    client.get('/v1/assets')
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+        self.sleep = sleep
+
+    def test_limits_to_rate_after_burst(self):
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: self.now, sleep=self.sleep)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(self.sleeps, [0.5, 0.5])
+
+    def test_pause_holds_back_unlimited_bucket(self):
+        bucket = TokenBucket(clock=lambda: self.now, sleep=self.sleep)
+        bucket.pause(3)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.sleeps, [3])
+
+if __name__ == '__main__':
+    unittest.main()
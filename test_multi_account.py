@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from lunchmoney_client import LunchMoneyClient
+from multi_account import Account, format_accounts_summary, load_accounts, run_accounts
+
+class TestLoadAccounts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'accounts.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, entries):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+
+    def test_defaults_and_env_keys(self):
+        self.write([{'name': 'home', 'api_key_env': 'TEST_LM_KEY'}, {'name': 'work', 'api_key': 'k2', 'output_dir': 'out'}])
+        with mock.patch.dict(os.environ, {'TEST_LM_KEY': 'k1'}):
+            accounts = load_accounts(self.path, default_hostname='https://example')
+        self.assertEqual(accounts, [Account('home', 'https://example', 'k1', 'home'),
+                                    Account('work', 'https://example', 'k2', 'out')])
+
+    def test_rejects_missing_keys_and_duplicates(self):
+        self.write([{'name': 'home', 'api_key_env': 'TEST_LM_UNSET_KEY'}])
+        with self.assertRaises(ValueError):
+            load_accounts(self.path, default_hostname='https://example')
+        self.write([{'name': 'home', 'api_key': 'k'}, {'name': 'home', 'api_key': 'k'}])
+        with self.assertRaises(ValueError):
+            load_accounts(self.path, default_hostname='https://example')
+
+class TestRequestSlots(unittest.TestCase):
+
+    def test_shared_slots_cap_requests_across_clients(self):
+        slots = threading.BoundedSemaphore(2)
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        def fake_get(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return mock.Mock(content=b'{}')
+        clients = [LunchMoneyClient('http://localhost', f'key{i}', request_slots=slots) for i in range(3)]
+        for client in clients:
+            client.session.get = fake_get
+        threads = [threading.Thread(target=client.map_concurrently, args=(lambda _, c=client: c.get('/v1/assets'), range(4)))
+                   for client in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+
+class TestRunAccounts(unittest.TestCase):
+
+    def test_reports_every_account_and_isolates_failures(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                FakeLunchMoneyServer(generate_transactions(300, '2024-02-01', '2024-03-31', seed=1)) as first, \
+                FakeLunchMoneyServer(generate_transactions(200, '2024-02-01', '2024-03-31', seed=2)) as second, \
+                FakeLunchMoneyServer([]) as empty, \
+                mock.patch('builtins.print'):
+            accounts = [
+                Account('first', first.url, 'k1', os.path.join(tmpdir, 'first')),
+                Account('broken', 'http://127.0.0.1:1', 'k2', os.path.join(tmpdir, 'broken')),
+                Account('second', second.url, 'k3', os.path.join(tmpdir, 'second')),
+                Account('empty', empty.url, 'k4', os.path.join(tmpdir, 'empty')),
+            ]
+            results = run_accounts(accounts, pd.Timestamp('2024-03-15'), png=False, render_workers=1, timeout=(1, 5),
+                                   max_retries=0)
+            self.assertEqual([r.name for r in results], ['first', 'broken', 'second', 'empty'])
+            self.assertTrue(results[0].ok and results[2].ok and results[3].ok)
+            self.assertIn('fetch failed', results[1].error)
+            # An account without transactions still gets its (zero-spending) report
+            self.assertIn('$0.00', results[3].summary)
+            for result in (results[0], results[2], results[3]):
+                self.assertEqual(result.paths, [os.path.join(result.output_dir, '2024-03-15-dashboard.html')])
+                self.assertTrue(os.path.exists(result.paths[0]))
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'broken')))
+        summary = format_accounts_summary(results, 1.0)
+        self.assertIn('4 accounts (1 failed)', summary)
+
+if __name__ == '__main__':
+    unittest.main()
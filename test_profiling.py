@@ -0,0 +1,106 @@
+import cProfile
+import threading
+import tracemalloc
+import unittest
+
+import pandas as pd
+
+import profiling
+from profiling import StageTimer, format_bytes, record_frames, stage, top_functions
+
+class TestStageTimer(unittest.TestCase):
+
+    def test_stage_is_noop_without_active_timer(self):
+        with stage('fetch'):
+            pass
+        self.assertIsNone(profiling._active_timer)
+
+    def test_accumulates_calls_per_stage(self):
+        timer = StageTimer()
+        with timer.activate():
+            for _ in range(3):
+                with stage('parse'):
+                    pass
+            with stage('fetch'):
+                pass
+        self.assertIsNone(profiling._active_timer)
+        report = timer.to_dict()
+        self.assertEqual(list(report['stages']), ['fetch', 'parse'])
+        self.assertEqual(report['stages']['parse']['calls'], 3)
+        self.assertGreaterEqual(report['elapsed'], report['stages']['parse']['seconds'])
+
+    def test_records_from_worker_threads(self):
+        timer = StageTimer()
+        with timer.activate():
+            def work():
+                with stage('fetch'):
+                    pass
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(timer.calls['fetch'], 4)
+
+    def test_format_report_lists_stages(self):
+        timer = StageTimer()
+        with timer.activate(), stage('html'):
+            pass
+        self.assertIn('html', timer.format_report())
+
+class TestMemoryTracking(unittest.TestCase):
+
+    def test_peak_per_stage(self):
+        timer = StageTimer(track_memory=True)
+        with timer.activate():
+            with stage('small'):
+                bytearray(1024)
+            with stage('large'):
+                bytearray(8 * 1024 * 1024)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(timer.traced_peaks['large'], 8 * 1024 * 1024)
+        self.assertLess(timer.traced_peaks['small'], timer.traced_peaks['large'])
+        memory = timer.to_dict()['memory']
+        self.assertEqual(memory['peak_traced_bytes'], timer.traced_peaks['large'])
+        self.assertTrue(memory['top_allocations'])
+
+    def test_nested_stage_keeps_outer_peak(self):
+        timer = StageTimer(track_memory=True)
+        with timer.activate(), stage('outer'):
+            data = bytearray(4 * 1024 * 1024)
+            del data
+            with stage('inner'):
+                pass
+        self.assertGreaterEqual(timer.traced_peaks['outer'], 4 * 1024 * 1024)
+        self.assertLess(timer.traced_peaks['inner'], 4 * 1024 * 1024)
+
+    def test_record_frames_only_when_tracking(self):
+        df = pd.DataFrame({'amount': [1.0, 2.0, 3.0]})
+        timer = StageTimer()
+        with timer.activate():
+            record_frames(current_month_df=df)
+        self.assertEqual(timer.frames, {})
+        timer = StageTimer(track_memory=True)
+        with timer.activate():
+            record_frames(current_month_df=df)
+        self.assertEqual(timer.frames['current_month_df']['rows'], 3)
+        self.assertGreater(timer.frames['current_month_df']['bytes'], 0)
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(None), 'n/a')
+        self.assertEqual(format_bytes(2048), '2.0 KiB')
+        self.assertEqual(format_bytes(3 * 1024 * 1024), '3.0 MiB')
+
+class TestTopFunctions(unittest.TestCase):
+
+    def test_sorted_by_cumulative_time(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        sorted(range(1000), key=lambda n: -n)
+        profiler.disable()
+        rows = top_functions(profiler, limit=5)
+        self.assertLessEqual(len(rows), 5)
+        self.assertEqual(rows, sorted(rows, key=lambda row: row['cumtime'], reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
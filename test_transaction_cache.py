@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+import sqlite3
+from transaction_cache import TransactionCache, months_in_range, month_end, rollup_month
+
+class TestTransactionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = TransactionCache(os.path.join(self.tmpdir.name, 'cache.sqlite'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_months_in_range(self):
+        months = months_in_range(date(2023, 12, 15), date(2024, 2, 1))
+        self.assertEqual(months, [date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1)])
+
+    def test_month_end_leap_year(self):
+        self.assertEqual(month_end(date(2024, 2, 1)), date(2024, 2, 29))
+
+    def test_round_trip(self):
+        txns = [{'id': 1, 'date': '2024-01-05', 'amount': '12.50'}]
+        self.cache.put_month('acct', date(2024, 1, 1), txns)
+        self.assertEqual(self.cache.get_month('acct', date(2024, 1, 1)), txns)
+        self.assertIsNone(self.cache.get_month('other', date(2024, 1, 1)))
+
+    def test_open_month_expires_quickly(self):
+        fetched_at = datetime(2024, 1, 20).timestamp()
+        self.assertTrue(self.cache.is_fresh(date(2024, 1, 1), fetched_at, fetched_at + 60))
+        self.assertFalse(self.cache.is_fresh(date(2024, 1, 1), fetched_at, fetched_at + 3600))
+
+    def test_closed_month_kept_until_long_ttl(self):
+        fetched_at = datetime(2024, 2, 20).timestamp()
+        self.assertTrue(self.cache.is_fresh(date(2024, 1, 1), fetched_at, fetched_at + timedelta(days=7).total_seconds()))
+        self.assertFalse(self.cache.is_fresh(date(2024, 1, 1), fetched_at, fetched_at + timedelta(days=45).total_seconds()))
+
+    def test_month_fetched_before_settling_is_not_closed(self):
+        fetched_at = datetime(2024, 2, 1).timestamp()
+        self.assertFalse(self.cache.is_fresh(date(2024, 1, 1), fetched_at, fetched_at + 3600))
+
+    def test_closed_month_budgets_never_expire(self):
+        budgets = [{'category_name': 'Rent', 'data': {'2024-01-01': {'budget_to_base': 1200}}}]
+        closed_at = datetime(2024, 2, 20).timestamp()
+        self.cache.put_budgets('acct', date(2024, 1, 1), budgets, now=closed_at)
+        self.assertEqual(self.cache.get_budgets('acct', date(2024, 1, 1), now=closed_at + timedelta(days=400).total_seconds()), budgets)
+        open_at = datetime(2024, 2, 20).timestamp()
+        self.cache.put_budgets('acct', date(2024, 2, 1), budgets, now=open_at)
+        self.assertEqual(self.cache.get_budgets('acct', date(2024, 2, 1), now=open_at + 60), budgets)
+        self.assertIsNone(self.cache.get_budgets('acct', date(2024, 2, 1), now=open_at + 3600))
+        self.assertIsNone(self.cache.get_budgets('other', date(2024, 1, 1)))
+
+class TestRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite')
+        self.cache = TransactionCache(self.path)
+        self.cache.put_month('acct', date(2024, 2, 1), [
+            {'id': 1, 'date': '2024-02-03', 'amount': '10.00', 'category_name': 'Food'},
+            {'id': 2, 'date': '2024-02-10', 'amount': '-500.00', 'category_name': 'Salary', 'is_income': True},
+        ])
+        self.cache.put_month('acct', date(2024, 3, 1), [
+            {'id': 3, 'date': '2024-03-02', 'amount': '20.00', 'category_name': 'Food'},
+            {'id': 4, 'date': '2024-03-03', 'amount': '5.00', 'category_name': None},
+            {'id': 5, 'date': '2024-03-20', 'amount': '99.00', 'category_name': 'Travel'},
+            {'id': 6, 'date': '2024-03-04', 'amount': '70.00', 'category_name': 'Food', 'exclude_from_totals': True},
+        ])
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_rollup_month(self):
+        totals = rollup_month([
+            {'date': '2024-03-02', 'amount': '20.00', 'category_name': 'Food'},
+            {'date': '2024-03-02', 'amount': '-2.50', 'category_name': 'Food'},
+            {'date': '2024-03-02', 'amount': '-100.00', 'category_name': 'Food', 'is_income': True},
+            {'date': '2024-03-02', 'amount': '9.00', 'exclude_from_totals': True},
+        ])
+        self.assertEqual(totals, {('2024-03-02', 'Food'): [17.5, 100.0, 3]})
+
+    def test_monthly_trend_sums_current_month_up_to_as_of(self):
+        trend = self.cache.monthly_trend('acct', date(2024, 3, 15))
+        # Leading months without data are trimmed
+        self.assertEqual(trend, [
+            {'month': '2024-02', 'label': 'Feb 24', 'spending': 10.0, 'income': 500.0},
+            {'month': '2024-03', 'label': 'Mar 24', 'spending': 25.0, 'income': 0.0},
+        ])
+        self.assertEqual(self.cache.monthly_trend('other', date(2024, 3, 15)), [])
+
+    def test_put_month_replaces_rollups(self):
+        self.cache.put_month('acct', date(2024, 3, 1), [
+            {'id': 3, 'date': '2024-03-02', 'amount': '1.00', 'category_name': 'Food'},
+        ])
+        self.assertEqual(self.cache.category_totals('acct', date(2024, 3, 1), date(2024, 3, 31)),
+                         [{'name': 'Food', 'amount': 1.0}])
+        self.assertEqual(self.cache.monthly_trend('acct', date(2024, 4, 10))[-2]['spending'], 1.0)
+
+    def test_category_and_day_of_week_totals(self):
+        self.assertEqual(self.cache.category_totals('acct', date(2024, 2, 1), date(2024, 3, 15)), [
+            {'name': 'Food', 'amount': 30.0},
+            {'name': 'uncategorized', 'amount': 5.0},
+        ])
+        days = self.cache.day_of_week_totals('acct', date(2024, 3, 1), date(2024, 3, 31))
+        self.assertEqual([d['label'] for d in days], ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'])
+        # 2024-03-02 is a Saturday, 03-03 a Sunday and 03-20 a Wednesday
+        self.assertEqual([d['amount'] for d in days], [5.0, 0.0, 0.0, 99.0, 0.0, 0.0, 20.0])
+
+    def test_existing_months_are_rolled_up_on_open(self):
+        self.cache.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript('DELETE FROM monthly_rollups; DELETE FROM daily_category_rollups;')
+        conn.close()
+        self.cache = TransactionCache(self.path)
+        self.assertEqual(self.cache.monthly_trend('acct', date(2024, 3, 31))[-1]['spending'], 124.0)
+
+if __name__ == '__main__':
+    unittest.main()
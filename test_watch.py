@@ -0,0 +1,99 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_server import FakeLunchMoneyServer
+from benchmarks.synthetic import generate_transactions
+from comparison import (build_daily_series, build_report_frames, category_totals_payload, concat_transaction_frames,
+                        daily_totals_payload, parse_transactions_page)
+from lunchmoney_client import LunchMoneyClient
+from watch import IncrementalReport, run_watch
+
+AS_OF = date(2024, 3, 15)
+
+def batch_report(transactions, as_of=AS_OF):
+    input_date = pd.Timestamp(as_of)
+    df = concat_transaction_frames([parse_transactions_page(transactions)])
+    current, last, full = build_report_frames(df, input_date)
+    return build_daily_series(input_date, current, last, full), current
+
+class TestIncrementalReport(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = generate_transactions(400, '2024-02-01', '2024-03-31', seed=5)
+        self.report = IncrementalReport(AS_OF)
+        self.report.apply(self.transactions, date(2024, 2, 1), date(2024, 3, 31))
+
+    def assertMatchesBatch(self, transactions):
+        series, current = batch_report(transactions)
+        incremental = self.report.series(AS_OF)
+        for name in ('current', 'future', 'last', 'last_x'):
+            np.testing.assert_allclose(incremental[name], series[name], atol=0.01)
+        self.assertEqual(self.report.category_totals(AS_OF), category_totals_payload(current))
+        self.assertEqual(self.report.daily_totals(AS_OF), daily_totals_payload(current))
+
+    def test_initial_load_matches_batch(self):
+        self.assertMatchesBatch(self.transactions)
+
+    def test_folds_in_new_changed_and_deleted_transactions(self):
+        window = [t for t in self.transactions if t['date'] >= '2024-03-10']
+        changed = dict(window[0], amount='999.0000', category_name='Travel')
+        new = dict(window[1], id=10_000, date='2024-03-14')
+        refetch = [changed, new] + window[3:]
+        self.assertEqual(self.report.apply(refetch, date(2024, 3, 10), date(2024, 3, 31)), 4)
+        expected = [t for t in self.transactions if t['date'] < '2024-03-10'] + refetch
+        self.assertMatchesBatch(expected)
+
+    def test_unchanged_refetch_keeps_fingerprint(self):
+        fingerprint = self.report.fingerprint(AS_OF)
+        window = [t for t in self.transactions if t['date'] >= '2024-03-12']
+        self.assertEqual(self.report.apply(window, date(2024, 3, 12), date(2024, 3, 31)), 0)
+        self.assertEqual(self.report.fingerprint(AS_OF), fingerprint)
+
+class TestRunWatch(unittest.TestCase):
+
+    def test_only_rerenders_on_change(self):
+        transactions = generate_transactions(300, '2024-02-01', '2024-03-31', seed=6)
+        with FakeLunchMoneyServer(transactions) as server, LunchMoneyClient(server.url, 'key') as client:
+            def add_transaction(_interval):
+                if len(server.transactions) == len(transactions):
+                    server.transactions.append(dict(transactions[-1], id=99_999, date='2024-03-31', amount='5.0000'))
+                    server._dates.append('2024-03-31')
+            with mock.patch('watch.write_report_files') as write, mock.patch('builtins.print'):
+                run_watch(client, interval=0, max_polls=3, today=lambda: AS_OF, sleep=lambda _: None)
+                self.assertEqual(write.call_count, 1)
+                run_watch(client, interval=0, max_polls=2, today=lambda: AS_OF, sleep=add_transaction)
+                # First poll renders; the second sees the new transaction and renders again
+                self.assertEqual(write.call_count, 3)
+
+    def test_passes_render_options_through(self):
+        transactions = generate_transactions(100, '2024-02-01', '2024-03-31', seed=7)
+        with FakeLunchMoneyServer(transactions) as server, LunchMoneyClient(server.url, 'key') as client:
+            with mock.patch('watch.write_report_files') as write, mock.patch('builtins.print'):
+                run_watch(client, interval=0, max_polls=1, today=lambda: AS_OF, chart_format='svg',
+                          html_mode='split', precompress=True, max_chart_points=10)
+        kwargs = write.call_args.kwargs
+        self.assertEqual((kwargs['chart_format'], kwargs['html_mode']), ('svg', 'split'))
+        self.assertTrue(kwargs['precompress'])
+        self.assertEqual(kwargs['max_chart_points'], 10)
+
+    def test_projects_from_the_month_budgets(self):
+        transactions = generate_transactions(100, '2024-02-01', '2024-03-31', seed=8)
+        budgets = [{'category_name': 'Rent', 'is_income': False,
+                    'data': {'2024-03-01': {'budget_to_base': 100000, 'spending_to_base': 100000}}}]
+        with FakeLunchMoneyServer(transactions, budgets=budgets) as server, LunchMoneyClient(server.url, 'key') as client:
+            with mock.patch('watch.write_report_files') as write, mock.patch('builtins.print'):
+                run_watch(client, interval=0, max_polls=2, today=lambda: AS_OF, sleep=lambda _: None)
+            budget_requests = [path for path in server.paths if path.startswith('/v1/budgets')]
+        # Fetched once for the month, not on every poll
+        self.assertEqual(len(budget_requests), 1)
+        spent = sum(float(t['amount']) for t in transactions
+                    if t['category_name'] == 'Rent' and '2024-03-01' <= t['date'] <= AS_OF.isoformat()
+                    and not t['is_income'] and not t['exclude_from_totals'])
+        self.assertAlmostEqual(write.call_args.kwargs['budget']['remainingTotal'], 100000 - spent, places=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+try:
+    # Optional: orjson decodes cached months several times faster than the stdlib
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# How long a cached month stays fresh before it is fetched again.
+OPEN_MONTH_TTL = timedelta(minutes=15)
+CLOSED_MONTH_TTL = timedelta(days=30)
+# Transactions keep settling (pending -> cleared) for a few days after a month ends,
+# so a month only counts as closed once it was fetched this long after its last day.
+CLOSED_MONTH_SETTLE_PERIOD = timedelta(days=3)
+
+DEFAULT_CACHE_PATH = '.lunchmoney_cache.sqlite'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS month_transactions (
+    account TEXT NOT NULL,
+    month TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (account, month)
+);
+-- Rollups derived from month_transactions, rewritten whenever a month is stored
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    account TEXT NOT NULL,
+    month TEXT NOT NULL,
+    spending REAL NOT NULL,
+    income REAL NOT NULL,
+    transactions INTEGER NOT NULL,
+    PRIMARY KEY (account, month)
+);
+CREATE TABLE IF NOT EXISTS daily_category_rollups (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    spending REAL NOT NULL,
+    income REAL NOT NULL,
+    transactions INTEGER NOT NULL,
+    PRIMARY KEY (account, day, category)
+);
+-- Raw /v1/budgets responses, one calendar month per row
+CREATE TABLE IF NOT EXISTS month_budgets (
+    account TEXT NOT NULL,
+    month TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (account, month)
+);
+'''
+
+UNCATEGORIZED = 'uncategorized'
+DAY_NAMES = ('Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat')
+
+
+def account_key(hostname: str, request_headers: dict) -> str:
+    """
+    Derives a stable cache key for an account without storing its API key.
+
+    Args:
+        hostname: The base URL of the API.
+        request_headers: Headers sent with API requests (including Authorization).
+
+    Returns:
+        A short hex digest identifying the hostname and credentials.
+    """
+    auth = request_headers.get('Authorization', '')
+    return hashlib.sha256(f"{hostname}|{auth}".encode('utf-8')).hexdigest()[:16]
+
+
+def rollup_month(transactions: list[dict]) -> dict[tuple[str, str], list]:
+    """
+    Sums a month's raw transactions per (day, category).
+
+    Spending is the signed amount of every transaction that is neither income nor
+    excluded from totals; income is the absolute amount of income that is not excluded
+    (the same split as computeMonthlyTrend in the JS dashboard).
+
+    Returns:
+        A dict mapping (day, category) to [spending, income, transaction count].
+    """
+    totals: dict[tuple[str, str], list] = {}
+    for t in transactions:
+        if t.get('exclude_from_totals') or not t.get('date'):
+            continue
+        try:
+            amount = float(t.get('amount'))
+        except (TypeError, ValueError):
+            amount = 0.0
+        key = (t['date'], t.get('category_name') or UNCATEGORIZED)
+        row = totals.setdefault(key, [0.0, 0.0, 0])
+        if t.get('is_income'):
+            row[1] += abs(amount)
+        else:
+            row[0] += amount
+        row[2] += 1
+    return totals
+
+
+def month_end(month_start: date) -> date:
+    """Returns the last day of the month starting at month_start."""
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def months_in_range(start: date, end: date) -> list[date]:
+    """
+    Lists the first day of every calendar month touched by [start, end].
+
+    Args:
+        start: First day of the range (inclusive).
+        end: Last day of the range (inclusive).
+
+    Returns:
+        A list of month-start dates in ascending order.
+    """
+    months = []
+    current = start.replace(day=1)
+    while current <= end:
+        months.append(current)
+        current = month_end(current) + timedelta(days=1)
+    return months
+
+
+class TransactionCache:
+    """
+    On-disk SQLite cache of raw API transactions, stored one calendar month per row.
+
+    Months that ended before they were fetched (plus a settle period) are treated as
+    closed and revalidated only after closed_month_ttl; every other month, including
+    the one currently in progress, expires after open_month_ttl.
+
+    Budgets are cached per month too; a closed month's budget no longer changes, so it
+    is kept until refreshed.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 open_month_ttl: timedelta = OPEN_MONTH_TTL,
+                 closed_month_ttl: timedelta | None = CLOSED_MONTH_TTL):
+        self.path = path
+        self.open_month_ttl = open_month_ttl
+        self.closed_month_ttl = closed_month_ttl
+        # Shared across the API client's worker threads; every access goes through _lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._backfill_rollups()
+        self._conn.commit()
+
+    def _backfill_rollups(self) -> None:
+        # Months cached before the rollup tables existed
+        rows = self._conn.execute(
+            'SELECT account, month, payload FROM month_transactions m WHERE NOT EXISTS '
+            '(SELECT 1 FROM monthly_rollups r WHERE r.account = m.account AND r.month = m.month)'
+        ).fetchall()
+        for account, month, payload in rows:
+            self._write_rollups(account, month, json_loads(payload))
+
+    def _write_rollups(self, account: str, month: str, transactions: list[dict]) -> None:
+        totals = rollup_month(transactions)
+        self._conn.execute('DELETE FROM daily_category_rollups WHERE account = ? AND day BETWEEN ? AND ?',
+                           (account, f"{month}-01", f"{month}-31"))
+        self._conn.executemany(
+            'INSERT INTO daily_category_rollups (account, day, category, spending, income, transactions) VALUES (?, ?, ?, ?, ?, ?)',
+            [(account, day, category, *row) for (day, category), row in totals.items()],
+        )
+        self._conn.execute(
+            'INSERT OR REPLACE INTO monthly_rollups (account, month, spending, income, transactions) VALUES (?, ?, ?, ?, ?)',
+            (account, month, sum(r[0] for r in totals.values()), sum(r[1] for r in totals.values()),
+             sum(r[2] for r in totals.values())),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def is_fresh(self, month_start: date, fetched_at: float, now: float | None = None) -> bool:
+        """
+        Decides whether a month fetched at fetched_at can still be served from the cache.
+
+        Args:
+            month_start: First day of the cached month.
+            fetched_at: Unix timestamp of when the month was fetched.
+            now: Current Unix timestamp (defaults to time.time()).
+
+        Returns:
+            True if the cached month does not need to be refetched.
+        """
+        now = time.time() if now is None else now
+        age = now - fetched_at
+        if self.is_closed(month_start, fetched_at):
+            return self.closed_month_ttl is None or age < self.closed_month_ttl.total_seconds()
+        return age < self.open_month_ttl.total_seconds()
+
+    @staticmethod
+    def is_closed(month_start: date, fetched_at: float) -> bool:
+        """
+        Tells whether the month had ended (and settled) by the time it was fetched.
+        """
+        settled_from = month_end(month_start) + timedelta(days=1) + CLOSED_MONTH_SETTLE_PERIOD
+        return date.fromtimestamp(fetched_at) >= settled_from
+
+    def get_month(self, account: str, month_start: date, now: float | None = None) -> list[dict] | None:
+        """
+        Returns the cached transactions for a month, or None if missing or stale.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fetched_at, payload FROM month_transactions WHERE account = ? AND month = ?',
+                (account, month_start.strftime('%Y-%m')),
+            ).fetchone()
+        if row is None or not self.is_fresh(month_start, row[0], now):
+            return None
+        return json_loads(row[1])
+
+    def fresh_months(self, account: str, months: list[date], now: float | None = None) -> set[date]:
+        """
+        Returns which of the months are cached and fresh, without loading their transactions.
+        """
+        by_key = {month_start.strftime('%Y-%m'): month_start for month_start in months}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT month, fetched_at FROM month_transactions WHERE account = ? AND month IN ({', '.join('?' * len(by_key))})",
+                (account, *by_key),
+            ).fetchall()
+        return {by_key[month] for month, fetched_at in rows if self.is_fresh(by_key[month], fetched_at, now)}
+
+    def put_month(self, account: str, month_start: date, transactions: list[dict], now: float | None = None) -> None:
+        """
+        Stores the complete list of transactions for a month, replacing any previous entry
+        and its rollups.
+        """
+        fetched_at = time.time() if now is None else now
+        payload = json.dumps(transactions)
+        month = month_start.strftime('%Y-%m')
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO month_transactions (account, month, fetched_at, payload) VALUES (?, ?, ?, ?)',
+                (account, month, fetched_at, payload),
+            )
+            self._write_rollups(account, month, transactions)
+            self._conn.commit()
+
+    def get_budgets(self, account: str, month_start: date, now: float | None = None) -> list[dict] | None:
+        """
+        Returns the cached budgets for a month, or None if missing or stale.
+
+        Budgets fetched after their month closed never go stale; the others expire
+        after open_month_ttl.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fetched_at, payload FROM month_budgets WHERE account = ? AND month = ?',
+                (account, month_start.strftime('%Y-%m')),
+            ).fetchone()
+        if row is None:
+            return None
+        now = time.time() if now is None else now
+        if not self.is_closed(month_start, row[0]) and now - row[0] >= self.open_month_ttl.total_seconds():
+            return None
+        return json_loads(row[1])
+
+    def put_budgets(self, account: str, month_start: date, budgets: list[dict], now: float | None = None) -> None:
+        """
+        Stores the raw /v1/budgets response for a month, replacing any previous entry.
+        """
+        fetched_at = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO month_budgets (account, month, fetched_at, payload) VALUES (?, ?, ?, ?)',
+                (account, month_start.strftime('%Y-%m'), fetched_at, json.dumps(budgets)),
+            )
+            self._conn.commit()
+
+    def monthly_trend(self, account: str, as_of: date, months: int = 12) -> list[dict]:
+        """
+        Returns spending and income for the months up to as_of's, read from the rollups.
+
+        Earlier months come from monthly_rollups; as_of's month is summed from the daily
+        rollups up to as_of. Leading months without any data are dropped.
+
+        Returns:
+            Dicts with month ('YYYY-MM'), label ('Mar 24'), spending and income, oldest first.
+        """
+        month_starts = [as_of.replace(day=1)]
+        for _ in range(months - 1):
+            month_starts.insert(0, (month_starts[0] - timedelta(days=1)).replace(day=1))
+        keys = [m.strftime('%Y-%m') for m in month_starts]
+        with self._lock:
+            rows = dict((month, (spending, income)) for month, spending, income in self._conn.execute(
+                'SELECT month, spending, income FROM monthly_rollups WHERE account = ? AND month >= ? AND month < ?',
+                (account, keys[0], keys[-1]),
+            ))
+            current = self._conn.execute(
+                'SELECT COALESCE(SUM(spending), 0), COALESCE(SUM(income), 0) FROM daily_category_rollups '
+                'WHERE account = ? AND day BETWEEN ? AND ?',
+                (account, month_starts[-1].isoformat(), as_of.isoformat()),
+            ).fetchone()
+        rows[keys[-1]] = current
+        trend = [
+            {'month': key, 'label': m.strftime('%b %y'),
+             'spending': round(rows.get(key, (0.0, 0.0))[0], 2), 'income': round(rows.get(key, (0.0, 0.0))[1], 2)}
+            for key, m in zip(keys, month_starts)
+        ]
+        first = next((i for i, m in enumerate(trend) if m['spending'] or m['income']), len(trend))
+        return trend[first:]
+
+    def category_totals(self, account: str, start: date, end: date) -> list[dict]:
+        """
+        Returns spending per category between start and end (inclusive), largest first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT category, SUM(spending) AS total FROM daily_category_rollups '
+                'WHERE account = ? AND day BETWEEN ? AND ? GROUP BY category ORDER BY total DESC, category',
+                (account, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        # Income-only categories have no spending to show
+        return [{'name': category, 'amount': round(total, 2)} for category, total in rows if total]
+
+    def day_of_week_totals(self, account: str, start: date, end: date) -> list[dict]:
+        """
+        Returns spending per weekday between start and end (inclusive), Sunday first.
+        """
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT CAST(strftime('%w', day) AS INTEGER), SUM(spending) FROM daily_category_rollups "
+                'WHERE account = ? AND day BETWEEN ? AND ? GROUP BY 1',
+                (account, start.isoformat(), end.isoformat()),
+            ).fetchall())
+        return [{'label': name, 'amount': round(rows.get(i, 0.0), 2)} for i, name in enumerate(DAY_NAMES)]
@@ -0,0 +1,279 @@
+"""
+Incremental watch mode for the comparison report.
+
+The report's two months of transactions are kept in memory between polls, together
+with their per-day spend and this month's per-day, per-category spend. Each poll only
+refetches from the newest transaction seen (less a lookback window for late edits), folds
+the changes into those totals, and re-renders the outputs only when the numbers changed.
+"""
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from comparison import (
+    DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    DEFAULT_WATCH_INTERVAL,
+    compute_comparison,
+    fetch_transactions_json,
+    fetch_with_budgets,
+    fetch_with_net_worth,
+    format_console_summary,
+    parse_transactions_page,
+    prepare_month_df,
+    series_from_cumulative,
+    write_report_files,
+)
+from budgets import Budget, compute_budget_summary
+from lunchmoney_client import LunchMoneyClient
+from transaction_cache import CLOSED_MONTH_SETTLE_PERIOD, month_end
+
+# The v1 API has no "updated since" filter, so each poll refetches this far behind the
+# newest transaction seen to pick up recent edits (pending -> cleared, recategorised, ...)
+WATCH_LOOKBACK = CLOSED_MONTH_SETTLE_PERIOD
+# Edits older than the lookback are picked up by a full refetch every this many polls
+DEFAULT_FULL_RESYNC_POLLS = 12
+UNCATEGORIZED = 'uncategorized'
+
+
+def _category(raw: dict) -> str:
+    name = raw.get('category_name')
+    if name is None or str(name) in ('', 'nan', 'None'):
+        return UNCATEGORIZED
+    return str(name)
+
+
+class IncrementalReport:
+    """
+    Running totals for the report on any day of month_start's month.
+
+    Holds every spending transaction of that month and the previous one, keyed by id,
+    plus the per-day totals derived from them; apply() updates the totals by the
+    difference each changed transaction makes. budgets holds the month's budgets and
+    net_worth the accounts' balances (both fetched by poll when it starts over), empty or
+    None when there are none or they were unavailable.
+    """
+
+    def __init__(self, month_start: date):
+        self.month_start = month_start.replace(day=1)
+        self.previous_month_start = (self.month_start - timedelta(days=1)).replace(day=1)
+        self.end = month_end(self.month_start)
+        self.transactions: dict[int, dict] = {}
+        self.daily = {
+            self.month_start: np.zeros(self.end.day),
+            self.previous_month_start: np.zeros(month_end(self.previous_month_start).day),
+        }
+        # This month only: transactions per day, and (day, category) -> spend
+        self.day_counts = np.zeros(self.end.day, dtype=np.int64)
+        self.day_categories: dict[tuple[int, str], float] = {}
+        self.high_water: date | None = None
+        self.budgets: list[Budget] = []
+        self.net_worth: dict | None = None
+
+    def _contribution(self, raw: dict) -> tuple[date, float] | None:
+        if raw.get('is_income') or raw.get('exclude_from_totals'):
+            return None
+        try:
+            day = date.fromisoformat(raw['date'])
+            amount = float(raw.get('amount'))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if day.replace(day=1) not in self.daily:
+            return None
+        return day, amount
+
+    def _fold(self, raw: dict, sign: int) -> None:
+        day, amount = self._contribution(raw)
+        self.daily[day.replace(day=1)][day.day - 1] += sign * amount
+        if day.replace(day=1) == self.month_start:
+            self.day_counts[day.day - 1] += sign
+            key = (day.day, _category(raw))
+            self.day_categories[key] = self.day_categories.get(key, 0.0) + sign * amount
+
+    def apply(self, transactions: list[dict], window_start: date, window_end: date) -> int:
+        """
+        Folds a fetch of every transaction dated within [window_start, window_end] into the totals.
+
+        Transactions that are new or differ from the stored copy are applied, and stored
+        transactions in the window that the fetch no longer returns are removed.
+
+        Returns:
+            The number of transactions added, changed or removed.
+        """
+        changes = 0
+        seen = set()
+        for raw in transactions:
+            if self._contribution(raw) is None:
+                continue
+            seen.add(raw['id'])
+            old = self.transactions.get(raw['id'])
+            if old == raw:
+                continue
+            if old is not None:
+                self._fold(old, -1)
+            self._fold(raw, 1)
+            self.transactions[raw['id']] = raw
+            changes += 1
+            day = date.fromisoformat(raw['date'])
+            if self.high_water is None or day > self.high_water:
+                self.high_water = day
+
+        window = (window_start.isoformat(), window_end.isoformat())
+        removed = [tid for tid, raw in self.transactions.items()
+                   if tid not in seen and window[0] <= raw['date'] <= window[1]]
+        for tid in removed:
+            self._fold(self.transactions.pop(tid), -1)
+        return changes + len(removed)
+
+    def series(self, as_of: date) -> dict:
+        this_month = np.cumsum(self.daily[self.month_start])
+        last = np.cumsum(self.daily[self.previous_month_start])
+        # As in build_daily_series: no future line on the last day or for a month without spending
+        return series_from_cumulative(pd.Timestamp(as_of), this_month, last,
+                                      include_future=as_of < self.end and bool(self.day_counts.any()))
+
+    def category_totals(self, as_of: date) -> list[dict]:
+        totals: dict[str, float] = {}
+        for (day, name), amount in self.day_categories.items():
+            if day <= as_of.day:
+                totals[name] = totals.get(name, 0.0) + amount
+        ordered = sorted(sorted(totals.items()), key=lambda item: -item[1])
+        return [{'name': name, 'amount': round(amount, 2)} for name, amount in ordered]
+
+    def daily_totals(self, as_of: date) -> list[dict]:
+        daily = self.daily[self.month_start]
+        days = [day for day in range(1, as_of.day + 1) if self.day_counts[day - 1]]
+        ordered = sorted(days, key=lambda day: -daily[day - 1])
+        return [{'day': day, 'amount': round(float(daily[day - 1]), 2)} for day in ordered]
+
+    def budget_summary(self, as_of: date) -> dict | None:
+        """
+        Summarises the unspent budget as of as_of, from this month's own per-category spend.
+
+        The API's spending figures date from when the budgets were fetched, while the
+        running totals are current as of the last poll.
+        """
+        if not self.budgets:
+            return None
+        spending: dict[str, float] = {}
+        for (day, name), amount in self.day_categories.items():
+            if day <= as_of.day:
+                spending[name] = spending.get(name, 0.0) + amount
+        return compute_budget_summary(self.budgets, self.month_start, spending=spending)
+
+    def fingerprint(self, as_of: date) -> str:
+        """
+        Hashes the numbers the outputs show, so a poll can tell whether anything changed.
+        """
+        series = self.series(as_of)
+        numbers = {
+            'date': as_of.isoformat(),
+            'series': {name: np.round(values, 2).tolist() for name, values in series.items()},
+            'categories': self.category_totals(as_of),
+            'daily': self.daily_totals(as_of),
+            'budget': self.budget_summary(as_of),
+            'net_worth': self.net_worth,
+        }
+        return hashlib.sha1(json.dumps(numbers, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def current_month_df(self, as_of: date) -> pd.DataFrame:
+        as_of_str = as_of.isoformat()
+        month_str = self.month_start.isoformat()
+        rows = [raw for raw in self.transactions.values() if month_str <= raw['date'] <= as_of_str]
+        return prepare_month_df(parse_transactions_page(rows))
+
+
+def poll(report: IncrementalReport | None, client: LunchMoneyClient, as_of: date,
+         full_resync: bool = False) -> tuple[IncrementalReport, int]:
+    """
+    Brings the report for as_of's month up to date, starting over on a new month or full_resync.
+
+    Starting over also fetches the month's budgets and the accounts' balances, alongside
+    the transactions.
+
+    Returns:
+        The (possibly new) report and the number of transactions that changed.
+    """
+    if report is None or full_resync or report.month_start != as_of.replace(day=1):
+        report = IncrementalReport(as_of)
+        window_start = report.previous_month_start
+        input_date = pd.Timestamp(as_of)
+        (transactions, budgets), report.net_worth = fetch_with_net_worth(lambda: fetch_with_budgets(
+            lambda: fetch_transactions_json(window_start.isoformat(), report.end.isoformat(), client),
+            input_date, input_date, client,
+        ), input_date, client, today=as_of)
+        report.budgets = budgets.get(report.month_start, [])
+        return report, report.apply(transactions, window_start, report.end)
+    # Scheduled transactions can be dated ahead of today; new ones still arrive from today on
+    high_water = min(report.high_water or report.previous_month_start, as_of)
+    window_start = max(report.previous_month_start, high_water - WATCH_LOOKBACK)
+    transactions = fetch_transactions_json(window_start.isoformat(), report.end.isoformat(), client)
+    return report, report.apply(transactions, window_start, report.end)
+
+
+def run_watch(
+    client: LunchMoneyClient,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    png: bool = True,
+    html: bool = True,
+    max_embedded_transactions: int | None = DEFAULT_MAX_EMBEDDED_TRANSACTIONS,
+    chart_format: str = 'png',
+    html_mode: str = 'inline',
+    precompress: bool = False,
+    max_chart_points: int | None = None,
+    full_resync_polls: int = DEFAULT_FULL_RESYNC_POLLS,
+    max_polls: int | None = None,
+    today: Callable[[], date] = date.today,
+    sleep: Callable[[float], None] = time.sleep,
+) -> None:
+    """
+    Polls for new transactions every interval seconds, re-rendering the report when its numbers change.
+
+    Args:
+        client: The shared Lunch Money API client.
+        interval: Seconds between polls.
+        png: Render the chart on change.
+        html: Write the HTML dashboard on change.
+        max_embedded_transactions: Cap on transactions embedded in the dashboard (None embeds all).
+        chart_format, html_mode, precompress, max_chart_points: As for write_report_files.
+        full_resync_polls: Refetch both months from scratch every this many polls (0 never does).
+        max_polls: Stop after this many polls (runs until interrupted when None).
+    """
+    import requests
+
+    report = None
+    last_fingerprint = None
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        if polls:
+            sleep(interval)
+        as_of = today()
+        full_resync = bool(full_resync_polls) and polls > 0 and polls % full_resync_polls == 0
+        polls += 1
+        try:
+            report, changes = poll(report, client, as_of, full_resync=full_resync)
+        except requests.RequestException as exc:
+            # Keep the state we have and try again on the next poll
+            print(f"{time.strftime('%H:%M:%S')} poll failed: {exc}")
+            continue
+
+        fingerprint = report.fingerprint(as_of)
+        if fingerprint == last_fingerprint:
+            print(f"{time.strftime('%H:%M:%S')} report unchanged ({changes} transactions updated)")
+            continue
+        last_fingerprint = fingerprint
+        input_date = pd.Timestamp(as_of)
+        series = report.series(as_of)
+        comparison = compute_comparison(input_date, series)
+        print(format_console_summary(input_date, comparison))
+        if png or html:
+            write_report_files(input_date, comparison, report.current_month_df(as_of), series,
+                               png=png, html=html, max_embedded_transactions=max_embedded_transactions,
+                               categories=report.category_totals(as_of), daily_totals=report.daily_totals(as_of),
+                               chart_format=chart_format, html_mode=html_mode, precompress=precompress,
+                               max_chart_points=max_chart_points, budget=report.budget_summary(as_of),
+                               net_worth=report.net_worth)